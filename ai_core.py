@@ -1,8 +1,25 @@
 import pandas as pd
+import numpy as np
 import joblib
-from sklearn.ensemble import RandomForestRegressor
 from datetime import datetime
+from importlib.metadata import version
+import hashlib
+import json
 import os
+import threading
+import time
+import itertools
+import shutil
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from model_registry import ModelRegistry, file_sha256
+from model_store import ModelStore
+from partitioned_models import PartitionedModels
+from training_set import TrainingSet
+from flat_forest import FlatForest
+import data_store
+import metrics
+import worker_processes
 
 # --- Define Paths ---
 MODEL_DIR = 'models'
@@ -10,98 +27,574 @@ DATA_DIR = 'data'
 
 STOCK_MODEL_FILE = os.path.join(MODEL_DIR, 'stock_model.joblib')
 WASTE_MODEL_FILE = os.path.join(MODEL_DIR, 'waste_model.joblib')
+STRATEGIC_MODEL_FILE = os.path.join(MODEL_DIR, 'strategic_model.joblib')
 SELL_THROUGH_MODEL_FILE = os.path.join(MODEL_DIR, 'sell_through_model.joblib')
+SELL_THROUGH_GRID_FILE = os.path.join(MODEL_DIR, 'sell_through_grid.joblib')
+REGISTRY_DIR = os.path.join(MODEL_DIR, 'registry')
+PARTITION_DIR = os.path.join(MODEL_DIR, 'partitions')
+STRATEGIC_TRAINING_SET_DIR = os.path.join(DATA_DIR, 'strategic_training')
+
+# sklearn itself is imported only when training, so importing this module stays cheap.
+SKLEARN_VERSION = version('scikit-learn')
+
+# Flattened copies of each forest (see flat_forest.py), saved next to the joblib files.
+FOREST_FILES = {
+    "stock": STOCK_MODEL_FILE,
+    "waste": WASTE_MODEL_FILE,
+    "strategic": STRATEGIC_MODEL_FILE,
+    "sell_through": SELL_THROUGH_MODEL_FILE,
+}
+FLAT_FOREST_FILES = {f"{name}_flat": path.replace('.joblib', '.flat.joblib') for name, path in FOREST_FILES.items()}
+
+# --- Model Hyperparameters ---
+STRATEGIC_PARAMS = {"n_estimators": 100, "random_state": 42, "max_depth": 10}
+TACTICAL_PARAMS = {"n_estimators": 100, "random_state": 42, "max_depth": 5}
+
+# --- Strategic Training Settings ---
+TRAINING_N_JOBS = -1  # build trees on all cores; does not change the fitted models
+# When True, one multi-output forest predicts stock and waste together (one pass per
+# prediction instead of two). Its trees split on both targets, so forecasts differ
+# slightly from the separate stock/waste forests.
+STRATEGIC_MULTI_OUTPUT = False
+STRATEGIC_TARGETS = ("stock", "waste", "strategic", "stock_flat", "waste_flat", "strategic_flat")
+
+# --- Incremental Strategic Training Settings ---
+# Each update_strategic_models call adds this many trees per forest, fitted on the
+# most recent months of the training set.
+INCREMENTAL_TREES = 20
+INCREMENTAL_RECENT_MONTHS = 12
+# The oldest trees are dropped beyond this, so prediction cost stays bounded.
+INCREMENTAL_MAX_TREES = 200
+# Every Nth update refits from the whole training set instead (0 = never).
+INCREMENTAL_FULL_REFIT_EVERY = 12
+# A product's month is only learned once: update rows with a known key are skipped.
+STRATEGIC_ROW_KEY = ('product_name', 'year', 'month')
+
+# --- Inference Settings ---
+# Set to False to predict with the sklearn forests instead of their flattened copies.
+USE_FLAT_FOREST = True
+# sklearn's compiled tree walk wins on large batches; flat forests win on small ones.
+FLAT_FOREST_MAX_ROWS = 1000
+# Memory-map the flat forests and lookup grid read-only so worker processes share one
+# copy through the page cache, and skip loading the sklearn forests (which cannot be
+# mapped). All predictions then use the flat forests, whatever the batch size.
+MMAP_MODELS = True
+
+# --- Training Cache Settings ---
+REGISTRY_MAX_ENTRIES = 20
+REGISTRY_MAX_BYTES = 2 * 1024 ** 3
+
+# --- Tactical Lookup Grid Settings ---
+# The grid holds the forest's prediction for every cell between its split thresholds, so
+# lookups give exactly the forest's discounts. Set to False to always score with the forest.
+USE_SELL_THROUGH_GRID = True
+# Forests with more threshold cells than this are not tabulated and score directly.
+GRID_MAX_CELLS = 5_000_000
+
+# --- Partitioned Model Settings ---
+# When partitioned models are trained (see train_partitioned_models), rows carrying the
+# partition columns are scored with their own partition's models; rows of partitions
+# without models fall back to the global ones. Set to False to always use the global models.
+USE_PARTITIONED_MODELS = True
+# Columns rows may be partitioned by. They route rows to models and are never features:
+# a partition's models see one constant value, and the global models must serve any.
+PARTITION_COLUMNS = ('store_id', 'category')
+PARTITION_WORKERS = os.cpu_count() or 1
+# Each worker process fits one partition at a time, single-threaded, so the pool alone
+# decides how many cores training uses.
+PARTITION_TRAINING_N_JOBS = 1
+# Partitions whose models stay loaded; the least recently used one is dropped beyond this.
+PARTITION_MAX_LOADED = 32
+
+# --- Model Reload Settings ---
+# current_models() stats the model files at most this often and reloads any that changed,
+# so retrains by other worker processes or the trainer scripts are picked up. 0 = never.
+MODEL_REFRESH_SECONDS = 5.0
+
+# --- Inventory Ingestion Settings ---
+INVENTORY_CHUNK_ROWS = 50_000
+
+# --- Strategic Forecast Defaults ---
+DEFAULT_SCENARIO = {"promotions": 0, "local_event": 0, "seasonality_indicator": 1.1}
 
 # --- Global Model Storage ---
+# MODELS always points at the latest snapshot's models; it is rebound, never mutated.
 MODELS = { "stock": None, "waste": None, "sell_through": None }
 MODELS_LOADED = False
+MODEL_STORE = ModelStore({
+    **FOREST_FILES,
+    **FLAT_FOREST_FILES,
+    "sell_through_grid": SELL_THROUGH_GRID_FILE,
+})
+REGISTRY = ModelRegistry(REGISTRY_DIR, max_entries=REGISTRY_MAX_ENTRIES, max_bytes=REGISTRY_MAX_BYTES)
+STRATEGIC_TRAINING_SET = TrainingSet(STRATEGIC_TRAINING_SET_DIR)
+TACTICAL_TARGETS = ("sell_through", "sell_through_flat", "sell_through_grid")
+PARTITIONS = {
+    kind: PartitionedModels(os.path.join(PARTITION_DIR, kind), {name: os.path.basename(MODEL_STORE.files[name]) for name in targets},
+                            max_loaded=PARTITION_MAX_LOADED)
+    for kind, targets in (('strategic', STRATEGIC_TARGETS), ('tactical', TACTICAL_TARGETS))
+}
+_LOAD_LOCK = threading.Lock()
+_INITIAL_LOAD_DONE = False
+_LAST_REFRESH = 0.0
 
+@metrics.instrument('ai_core.load_models')
 def load_models():
-    """Loads all available models into memory and updates status."""
+    """Reloads model files that changed on disk and atomically publishes a new snapshot."""
     global MODELS, MODELS_LOADED
-    
-    try:
-        MODELS['stock'] = joblib.load(STOCK_MODEL_FILE)
-        MODELS['waste'] = joblib.load(WASTE_MODEL_FILE)
-    except FileNotFoundError:
+
+    mmap_names, skip_names = _load_options()
+    snapshot, changed = MODEL_STORE.refresh(mmap_names, skip_names)
+    metrics.cache_lookup('model_store', not changed)
+    # Models trained outside train_* (e.g. by the standalone trainer scripts) lack their derived files.
+    stale = _stale_derived_artifacts(snapshot)
+    if stale:
+        with MODEL_STORE.writing():
+            for name, build in stale:
+                _atomic_dump(build(), MODEL_STORE.files[name])
+            snapshot, derived_changed = MODEL_STORE.refresh(mmap_names, skip_names)
+        changed += derived_changed
+    if not changed:
+        return snapshot
+
+    if not has_strategic_models(snapshot):
         print("🟡 Strategic model files not found. They may need to be trained.")
-        MODELS['stock'], MODELS['waste'] = None, None
-    
-    try:
-        MODELS['sell_through'] = joblib.load(SELL_THROUGH_MODEL_FILE)
-    except FileNotFoundError:
+    if not snapshot.has('sell_through'):
         print("🟡 Tactical model file not found. It may need to be trained.")
-        MODELS['sell_through'] = None
 
+    MODELS = snapshot
     # Update global status if all models are present
-    MODELS_LOADED = all(model is not None for model in MODELS.values())
+    MODELS_LOADED = has_strategic_models(snapshot) and snapshot.has('sell_through')
     if MODELS_LOADED:
-        print("✅ All AI models loaded successfully.")
+        print(f"✅ All AI models loaded successfully (version {snapshot.version}).")
     else:
-        print("✅ Model loading complete. Some models may be pending training.")
+        print(f"✅ Model loading complete (version {snapshot.version}). Some models may be pending training.")
+    return snapshot
+
+def _load_options():
+    """Returns the (mmap_names, skip_names) to load model files with (see MMAP_MODELS)."""
+    if MMAP_MODELS and USE_FLAT_FOREST:
+        return (*FLAT_FOREST_FILES, 'sell_through_grid'), tuple(FOREST_FILES)
+    return (), ()
+
+def has_strategic_models(models):
+    """True if either the multi-output forest or both stock and waste forests are available."""
+    return models.has('strategic') or (models.has('stock') and models.has('waste'))
+
+def current_models():
+    """Returns the active model snapshot, loading models on first use and reloading
+    changed files every MODEL_REFRESH_SECONDS. Use one snapshot for a whole request."""
+    global _INITIAL_LOAD_DONE, _LAST_REFRESH
+    if not _INITIAL_LOAD_DONE:
+        with _LOAD_LOCK:
+            if not _INITIAL_LOAD_DONE:
+                load_models()
+                _LAST_REFRESH = time.monotonic()
+                _INITIAL_LOAD_DONE = True
+    elif MODEL_REFRESH_SECONDS and time.monotonic() - _LAST_REFRESH >= MODEL_REFRESH_SECONDS \
+            and _LOAD_LOCK.acquire(blocking=False):  # one thread checks; the others keep serving
+        try:
+            _LAST_REFRESH = time.monotonic()
+            load_models()
+        finally:
+            _LOAD_LOCK.release()
+    return MODEL_STORE.snapshot()
+
+def _stale_derived_artifacts(snapshot):
+    """Returns (name, build) pairs for derived files that are missing or older than their model."""
+    derived = {f"{name}_flat": (name, USE_FLAT_FOREST, FlatForest.from_sklearn) for name in FOREST_FILES}
+    derived['sell_through_grid'] = ('sell_through', USE_SELL_THROUGH_GRID, build_sell_through_grid)
+    stale = []
+    for name, (source, enabled, build) in derived.items():
+        if not enabled or not snapshot.has(source):
+            continue
+        stamp, source_stamp = snapshot.stamps[name], snapshot.stamps[source]
+        # Grids in the old interpolated format (no split edges) are rebuilt as exact step grids.
+        if stamp is None or stamp[0] < source_stamp[0] or (name == 'sell_through_grid' and not _is_step_grid(snapshot[name], True)):
+            stale.append((name, lambda build=build, source=source: build(_load_forest(snapshot, source))))
+    return stale
+
+def _load_forest(snapshot, name):
+    """Returns a snapshot's sklearn forest, reading it from disk if it was skipped (see MMAP_MODELS)."""
+    model = snapshot[name]
+    return model if model is not None else joblib.load(MODEL_STORE.files[name])
+
+def _atomic_dump(obj, path):
+    # Other processes may have the old file memory-mapped; replace it instead of truncating it.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+def export_flat_forests(trained):
+    """Flattens each trained forest for fast inference: {"stock": rf} -> {"stock_flat": FlatForest}."""
+    return {f"{name}_flat": FlatForest.from_sklearn(model) for name, model in trained.items()}
+
+def _forest(models, name, n_rows):
+    """Returns the model to predict n_rows with: the flattened copy for small batches."""
+    flat = models[f"{name}_flat"]
+    if USE_FLAT_FOREST and flat is not None and (n_rows <= FLAT_FOREST_MAX_ROWS or models[name] is None):
+        return flat
+    return models[name]
+
+def _forest_predict(model, X):
+    """Predicts from a 2-D array with either a FlatForest or a fitted sklearn forest."""
+    if isinstance(model, FlatForest):
+        return model.predict(X)
+    return model.predict(pd.DataFrame(X, columns=model.feature_names_in_))
 
 # --- 1. STRATEGIC AI FUNCTIONS ---
-def train_strategic_models():
-    """Trains and saves the stock and waste prediction models."""
+@metrics.instrument('ai_core.train_strategic_models')
+def train_strategic_models(data_path=None):
+    """Trains and saves the stock and waste prediction models, reusing cached models for unchanged data."""
     try:
-        df = pd.read_csv(os.path.join(DATA_DIR, 'historical_data.csv'))
-        df = pd.get_dummies(df, columns=['product_name'], drop_first=True)
-        features = [col for col in df.columns if col not in ['historical_stock', 'historical_waste']]
-        X = df[features]
-        
-        stock_model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
-        stock_model.fit(X, df['historical_stock'])
-        joblib.dump(stock_model, STOCK_MODEL_FILE)
-
-        waste_model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
-        waste_model.fit(X, df['historical_waste'])
-        joblib.dump(waste_model, WASTE_MODEL_FILE)
-        
-        return True, "Strategic models trained."
+        data_path = data_path or os.path.join(DATA_DIR, 'historical_data.csv')
+        targets = {name: MODEL_STORE.files[name] for name in STRATEGIC_TARGETS}
+        cache_params = {**STRATEGIC_PARAMS, "multi_output": STRATEGIC_MULTI_OUTPUT, "sklearn": SKLEARN_VERSION}
+        cache_key = REGISTRY.key('strategic', data_path, cache_params)
+        with MODEL_STORE.writing():
+            restored = REGISTRY.restore('strategic', cache_key, targets)
+        metrics.cache_lookup('model_registry', restored)
+        if restored:
+            _reset_strategic_training_set(cache_key, lambda: data_store.read_table(data_path, 'historical'))
+            return True, "Strategic models restored from cache (cache hit)."
+
+        df = data_store.read_table(data_path, 'historical')
+        metrics.count_rows('ai_core.train_strategic_models', len(df))
+        start = time.perf_counter()
+        trained = _fit_strategic_frame(df)
+        fit_seconds = time.perf_counter() - start
+
+        with MODEL_STORE.writing():
+            _save_models(trained, targets)
+            REGISTRY.store('strategic', cache_key, targets)
+        _reset_strategic_training_set(cache_key, lambda: df)
+        return True, f"Strategic models trained in {fit_seconds:.1f}s (cache miss)."
     except Exception as e:
         return False, str(e)
 
-def run_strategic_prediction(products, target_month, target_year):
-    if not MODELS['stock'] or not MODELS['waste']:
-        return pd.DataFrame()
+@metrics.instrument('ai_core.update_strategic_models')
+def update_strategic_models(data_path):
+    """Appends new months of history and updates the strategic forests without a full refit.
 
-    data_to_predict = [{"month": target_month, "year": target_year, "promotions": 0, "local_event": 0, "seasonality_indicator": 1.1, "product_name": p} for p in products]
-    df_predict = pd.DataFrame(data_to_predict)
-    df_predict_encoded = pd.get_dummies(df_predict, columns=['product_name'])
-    
-    training_cols = MODELS['stock'].feature_names_in_
-    df_predict_encoded = df_predict_encoded.reindex(columns=training_cols, fill_value=0)
+    The rows join the persisted training set, except those whose (product_name,
+    year, month) it already holds, which are skipped. Each forest then gains
+    INCREMENTAL_TREES trees fitted on the last INCREMENTAL_RECENT_MONTHS months,
+    and products seen for the first time get new dummy columns that the older
+    trees simply never split on. Every INCREMENTAL_FULL_REFIT_EVERY updates the
+    forests are refit from the whole training set instead.
+    """
+    try:
+        if not STRATEGIC_TRAINING_SET.exists():
+            return False, "No strategic training set found. Train on the full history first."
+        new_rows = data_store.read_table(data_path, 'historical')
+        metrics.count_rows('ai_core.update_strategic_models', len(new_rows))
+        known = _strategic_row_keys(STRATEGIC_TRAINING_SET.read(columns=list(STRATEGIC_ROW_KEY)))
+        duplicate = _strategic_row_keys(new_rows).isin(known)
+        skipped = f" {int(duplicate.sum()):,} rows already in the training set were skipped." if duplicate.any() else ""
+        new_rows = new_rows[~duplicate]
+        if new_rows.empty:
+            return True, f"All {len(duplicate):,} rows are already in the training set; the models are unchanged."
+        STRATEGIC_TRAINING_SET.append(new_rows)
+        manifest = STRATEGIC_TRAINING_SET.manifest
+        updates_since_refit = manifest.get('updates_since_refit', 0) + 1
+        names = ["strategic"] if STRATEGIC_MULTI_OUTPUT else ["stock", "waste"]
+        targets = {name: MODEL_STORE.files[name] for name in STRATEGIC_TARGETS}
+        start = time.perf_counter()
+
+        if (INCREMENTAL_FULL_REFIT_EVERY and updates_since_refit >= INCREMENTAL_FULL_REFIT_EVERY) \
+                or not all(os.path.exists(MODEL_STORE.files[name]) for name in names):
+            history = _read_strategic_training_set()
+            trained = _fit_strategic_frame(history)
+            with MODEL_STORE.writing():
+                _save_models(trained, targets)
+            STRATEGIC_TRAINING_SET.update_manifest(updates_since_refit=0, source=None, baseline_product=min(history['product_name']))
+            return True, f"Strategic models refit on all {manifest['rows']:,} training rows in {time.perf_counter() - start:.1f}s.{skipped}"
+
+        import pyarrow.dataset as ds
+        latest = int((new_rows['year'].astype(int) * 12 + new_rows['month'] - 1).max())
+        recent = _read_strategic_training_set(where=ds.field('year') * 12 + ds.field('month') - 1 > latest - INCREMENTAL_RECENT_MONTHS)
+        # Load fresh copies: the forests in the live snapshot may be serving requests.
+        forests = {name: joblib.load(MODEL_STORE.files[name]) for name in names}
+        features = list(forests[names[0]].feature_names_in_)
+        known_products = {col[len('product_name_'):] for col in features if col.startswith('product_name_')}
+        new_products = sorted(set(recent['product_name']) - known_products - {manifest['baseline_product']})
+        features += [f"product_name_{product}" for product in new_products]
+        X = pd.get_dummies(recent, columns=['product_name']).reindex(columns=features, fill_value=0)
+        y = {"stock": recent['historical_stock'], "waste": recent['historical_waste'],
+             "strategic": np.column_stack([recent['historical_stock'], recent['historical_waste']])}
+        random_state = STRATEGIC_PARAMS['random_state'] + manifest.get('updates', 0) + 1
+
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            futures = {name: pool.submit(grow_forest, forests[name], X, y[name], INCREMENTAL_TREES, INCREMENTAL_MAX_TREES, random_state)
+                       for name in names}
+            trained = {name: future.result() for name, future in futures.items()}
+        trained.update(export_flat_forests(trained))
+        with MODEL_STORE.writing():
+            _save_models(trained, targets)
+        STRATEGIC_TRAINING_SET.update_manifest(updates_since_refit=updates_since_refit, updates=manifest.get('updates', 0) + 1, source=None)
+        return True, (f"Strategic models updated with {len(new_rows):,} new rows in {time.perf_counter() - start:.1f}s "
+                      f"({len(trained[names[0]].estimators_)} trees, {len(new_products)} new products).{skipped}")
+    except Exception as e:
+        return False, str(e)
+
+def _strategic_row_keys(df):
+    """The (product_name, year, month) of each historical row, as a MultiIndex."""
+    return pd.MultiIndex.from_arrays([df[col].astype(str if col == 'product_name' else 'int64') for col in STRATEGIC_ROW_KEY])
+
+def grow_forest(model, X, y, n_trees, max_trees, random_state):
+    """Adds n_trees trees fitted on (X, y) to a fitted forest and keeps the newest max_trees.
+
+    X may have extra trailing columns the forest was not trained on.
+    """
+    _widen_forest(model, X.shape[1])
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_trees, random_state=random_state, n_jobs=TRAINING_N_JOBS)
+    model.fit(X, y)
+    model.estimators_ = model.estimators_[-max_trees:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_), n_jobs=None)
+    return model
 
-    predicted_stock = MODELS['stock'].predict(df_predict_encoded)
-    predicted_waste = MODELS['waste'].predict(df_predict_encoded)
+def _widen_forest(model, n_features):
+    """Lets a fitted forest's trees accept extra trailing feature columns, which they never split on."""
+    from sklearn.tree._tree import Tree
 
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        if tree.n_features < n_features:
+            widened = Tree(n_features, tree.n_classes, tree.n_outputs)
+            widened.__setstate__(tree.__getstate__())
+            estimator.tree_ = widened
+            estimator.n_features_in_ = n_features
+
+def _fit_strategic_frame(df, n_jobs=TRAINING_N_JOBS):
+    """Fits the strategic forests (and their flat copies) on a raw historical-data frame."""
+    df = pd.get_dummies(df, columns=['product_name'], drop_first=True)
+    features = [col for col in df.columns if col not in ('historical_stock', 'historical_waste', *PARTITION_COLUMNS)]
+    trained = fit_strategic_models(df[features], df['historical_stock'], df['historical_waste'], multi_output=STRATEGIC_MULTI_OUTPUT, n_jobs=n_jobs)
+    trained.update(export_flat_forests(trained))
+    return trained
+
+def _save_models(trained, targets):
+    """Replaces all target files together, removing ones this run did not produce. Call inside MODEL_STORE.writing()."""
+    for name, path in targets.items():
+        if name in trained:
+            _atomic_dump(trained[name], path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+def _reset_strategic_training_set(source_key, load_df):
+    """Restarts the incremental training set from a full history, unless it already holds that history."""
+    if STRATEGIC_TRAINING_SET.exists() and STRATEGIC_TRAINING_SET.manifest.get('source') == source_key:
+        return
+    df = load_df().drop(columns=list(PARTITION_COLUMNS), errors='ignore')
+    # get_dummies(drop_first=True) gives the alphabetically first product no column.
+    STRATEGIC_TRAINING_SET.replace(df, source=source_key, baseline_product=min(df['product_name'].astype(str)),
+                                   updates_since_refit=0, updates=0)
+
+def _read_strategic_training_set(where=None):
+    df = STRATEGIC_TRAINING_SET.read(where=where)
+    df['product_name'] = df['product_name'].astype(str)  # plain strings, so dummies match a CSV read
+    return df
+
+def fit_strategic_models(X, y_stock, y_waste, multi_output=False, n_jobs=TRAINING_N_JOBS):
+    """Fits the strategic forests on all cores. Returns {"stock", "waste"} or {"strategic"}."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    if multi_output:
+        model = RandomForestRegressor(**STRATEGIC_PARAMS, n_jobs=n_jobs)
+        model.fit(X, np.column_stack([y_stock, y_waste]))
+        model.n_jobs = None  # small forecast batches are faster without thread dispatch
+        return {"strategic": model}
+
+    def fit(y):
+        model = RandomForestRegressor(**STRATEGIC_PARAMS, n_jobs=n_jobs)
+        model.fit(X, y)
+        model.n_jobs = None
+        return model
+
+    # Tree building releases the GIL, so the two targets train side by side.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        stock_future = pool.submit(fit, y_stock)
+        waste_future = pool.submit(fit, y_waste)
+        return {"stock": stock_future.result(), "waste": waste_future.result()}
+
+def run_strategic_prediction(products, target_month, target_year, models=None):
+    forecast = run_strategic_forecast_batch(products, [(target_month, target_year)], models=models)
+    if forecast.empty:
+        return pd.DataFrame()
     return pd.DataFrame({
-        "Product": products,
-        "Recommended Stock (Units)": [int(p) for p in predicted_stock],
-        "Predicted Waste (Units)": [int(p) for p in predicted_waste]
+        "Product": forecast['product_name'].tolist(),
+        "Recommended Stock (Units)": forecast['recommended_stock'].tolist(),
+        "Predicted Waste (Units)": forecast['predicted_waste'].tolist()
+    })
+
+@metrics.instrument('ai_core.run_strategic_forecast_batch')
+def run_strategic_forecast_batch(products, horizons, scenarios=None, models=None):
+    """Forecasts every horizon x scenario x product combination in one pass per model.
+
+    horizons is a list of (month, year) pairs. scenarios maps any of promotions,
+    local_event and seasonality_indicator to a list of values to try; knobs left
+    out use DEFAULT_SCENARIO. Returns a long-format frame with one row per
+    combination.
+    """
+    models = models or current_models()
+    if not has_strategic_models(models) or not len(products) or not len(horizons):
+        return pd.DataFrame()
+
+    knobs = list(DEFAULT_SCENARIO)
+    knob_values = [list((scenarios or {}).get(knob, [DEFAULT_SCENARIO[knob]])) for knob in knobs]
+    scenario_rows = np.array(list(itertools.product(*knob_values)), dtype=float).reshape(-1, len(knobs))
+    horizon_rows = np.asarray(horizons, dtype=float).reshape(-1, 2)
+    products = list(products)
+
+    # Cross product with products varying fastest, then scenarios, then horizons.
+    n_products, n_scenarios, n_horizons = len(products), len(scenario_rows), len(horizon_rows)
+    n_rows = n_products * n_scenarios * n_horizons
+    metrics.count_rows('ai_core.run_strategic_forecast_batch', n_rows)
+    horizon_idx = np.repeat(np.arange(n_horizons), n_scenarios * n_products)
+    scenario_idx = np.tile(np.repeat(np.arange(n_scenarios), n_products), n_horizons)
+    product_idx = np.tile(np.arange(n_products), n_scenarios * n_horizons)
+
+    multi_output = models.has('strategic')
+    columns, product_columns = _strategic_design_index(_forest(models, 'strategic' if multi_output else 'stock', n_rows))
+
+    design = np.zeros((n_rows, len(columns)))
+    values = {"month": horizon_rows[horizon_idx, 0], "year": horizon_rows[horizon_idx, 1]}
+    values.update({knob: scenario_rows[scenario_idx, pos] for pos, knob in enumerate(knobs)})
+    for name, column_values in values.items():
+        if name in columns:  # like reindex, ignore inputs the model was not trained on
+            design[:, columns[name]] = column_values
+    # Products without a dummy column (the dropped first level, or unseen names) stay all-zero.
+    dummy_cols = np.array([product_columns.get(p, -1) for p in products])[product_idx]
+    has_dummy = dummy_cols >= 0
+    design[np.flatnonzero(has_dummy), dummy_cols[has_dummy]] = 1
+
+    if multi_output:
+        predicted = _forest_predict(_forest(models, 'strategic', n_rows), design)
+        predicted_stock, predicted_waste = predicted[:, 0], predicted[:, 1]
+    else:
+        predicted_stock = _forest_predict(_forest(models, 'stock', n_rows), design)
+        predicted_waste = _forest_predict(_forest(models, 'waste', n_rows), design)
+
+    forecast = pd.DataFrame({
+        "year": horizon_rows[horizon_idx, 1].astype(int),
+        "month": horizon_rows[horizon_idx, 0].astype(int),
+        "product_name": np.asarray(products, dtype=object)[product_idx],
     })
+    for knob_pos, knob in enumerate(knobs):
+        forecast[knob] = scenario_rows[scenario_idx, knob_pos]
+    forecast['recommended_stock'] = predicted_stock.astype(int)
+    forecast['predicted_waste'] = predicted_waste.astype(int)
+    return forecast
+
+_DESIGN_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+def _strategic_design_index(model):
+    """Maps feature names to design-matrix columns, cached per fitted model."""
+    cached = _DESIGN_INDEX_CACHE.get(model)
+    if cached is None:
+        columns = {name: i for i, name in enumerate(model.feature_names_in_)}
+        product_columns = {name[len('product_name_'):]: i for name, i in columns.items() if name.startswith('product_name_')}
+        cached = _DESIGN_INDEX_CACHE[model] = (columns, product_columns)
+    return cached
 
 # --- 2. TACTICAL AI FUNCTIONS ---
-def train_tactical_model():
-    """Trains and saves the sell-through prediction model."""
+@metrics.instrument('ai_core.train_tactical_model')
+def train_tactical_model(data_path=None):
+    """Trains and saves the sell-through prediction model, reusing a cached model for unchanged data."""
     try:
-        df = pd.read_csv(os.path.join(DATA_DIR, 'tactical_training_data.csv'))
-        X = df[['days_until_expiry', 'stock_to_sales_ratio']]
-        y = df['sell_through_rate']
-        model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=5)
-        model.fit(X, y)
-        joblib.dump(model, SELL_THROUGH_MODEL_FILE)
-        return True, "Tactical model trained."
+        data_path = data_path or os.path.join(DATA_DIR, 'tactical_training_data.csv')
+        targets = {name: MODEL_STORE.files[name] for name in TACTICAL_TARGETS}
+        grid_params = {"grid": "steps", "grid_max_cells": GRID_MAX_CELLS}
+        cache_key = REGISTRY.key('tactical', data_path, {**TACTICAL_PARAMS, **grid_params, "sklearn": SKLEARN_VERSION})
+        with MODEL_STORE.writing():
+            restored = REGISTRY.restore('tactical', cache_key, targets)
+        metrics.cache_lookup('model_registry', restored)
+        if restored:
+            return True, "Tactical model restored from cache (cache hit)."
+
+        df = data_store.read_table(data_path, 'tactical', columns=['days_until_expiry', 'stock_to_sales_ratio', 'sell_through_rate'])
+        metrics.count_rows('ai_core.train_tactical_model', len(df))
+        trained = _fit_tactical_frame(df)
+        message = "Tactical model trained (cache miss)."
+        if USE_SELL_THROUGH_GRID and trained['sell_through_grid'] is not None:
+            message += f" Lookup grid max error: {trained['sell_through_grid']['max_error']:.4f}."
+
+        with MODEL_STORE.writing():
+            _save_models(trained, targets)
+            REGISTRY.store('tactical', cache_key, targets)
+        return True, message
     except Exception as e:
         return False, str(e)
 
-def get_tactical_discount(days_left, stock, avg_sales):
-    if days_left < 0 or stock <= 0 or avg_sales <= 0 or not MODELS['sell_through']:
+def _fit_tactical_frame(df, n_jobs=None):
+    """Fits the sell-through forest, its flat copy and (if enabled) its lookup grid on a tactical-data frame."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    model = RandomForestRegressor(**TACTICAL_PARAMS, n_jobs=n_jobs)
+    model.fit(df[['days_until_expiry', 'stock_to_sales_ratio']], df['sell_through_rate'])
+    model.n_jobs = None
+    trained = {"sell_through": model, **export_flat_forests({"sell_through": model})}
+    if USE_SELL_THROUGH_GRID:
+        trained['sell_through_grid'] = build_sell_through_grid(model)
+    return trained
+
+def build_sell_through_grid(model):
+    """Tabulates the sell-through forest over the cells between its split thresholds.
+
+    Each tree sends x left when x <= threshold, so between consecutive thresholds
+    (of every tree, per feature) the forest is constant. Predicting once per cell
+    and looking inputs up with searchsorted therefore reproduces the forest
+    exactly. Returns None if the forest has more than GRID_MAX_CELLS cells.
+    """
+    edges = [np.unique(np.concatenate([t.tree_.threshold[t.tree_.feature == feature] for t in model.estimators_]))
+             for feature in (0, 1)]
+    if (len(edges[0]) + 1) * (len(edges[1]) + 1) > GRID_MAX_CELLS:
+        print("🟡 Sell-through forest has too many threshold cells for a lookup grid; scoring with the forest.")
+        return None
+    days_points, ratio_points = (_cell_points(axis_edges) for axis_edges in edges)
+    days_mesh, ratio_mesh = np.meshgrid(days_points, ratio_points, indexing='ij')
+    values = _predict_sell_through(model, days_mesh.ravel(), ratio_mesh.ravel()).reshape(days_mesh.shape)
+    grid = {"days_edges": edges[0], "ratio_edges": edges[1], "values": values}
+
+    # Check against the forest between neighbouring cell points, away from the points the grid was built from.
+    check_days = np.repeat(days_points, len(ratio_points) - 1)
+    check_ratios = np.tile((ratio_points[:-1] + ratio_points[1:]) / 2, len(days_points))
+    exact = _predict_sell_through(model, check_days, check_ratios)
+    grid['max_error'] = float(np.abs(exact - lookup_sell_through(grid, check_days, check_ratios)).max()) if exact.size else 0.0
+    print(f"✅ Sell-through lookup grid built ({values.size:,} cells). Max error vs. forest: {grid['max_error']:.4f}.")
+    return grid
+
+def _cell_points(edges):
+    """One float32 input inside each cell of sorted split thresholds: (-inf, e0], (e0, e1], ..., (e_last, inf)."""
+    if not len(edges):
+        return np.zeros(1)
+    # Trees compare float32 inputs, so each point is the largest float32 not above its cell's upper edge.
+    points = edges.astype(np.float32)
+    points = np.where(points > edges, np.nextafter(points, np.float32(-np.inf)), points)
+    last = np.float32(edges[-1])
+    last = np.nextafter(last, np.float32(np.inf)) if last <= edges[-1] else last
+    return np.append(points, last).astype(float)
+
+def _is_step_grid(grid, missing_ok=False):
+    return missing_ok if grid is None else 'ratio_edges' in grid
+
+def lookup_sell_through(grid, days_left, stock_ratio):
+    """The forest's sell-through prediction for each input, read from the grid's cell."""
+    days = np.asarray(days_left, dtype=np.float32).astype(float)
+    ratio = np.asarray(stock_ratio, dtype=np.float32).astype(float)
+    return grid['values'][np.searchsorted(grid['days_edges'], days), np.searchsorted(grid['ratio_edges'], ratio)]
+
+def _predict_sell_through(model, days_left, stock_ratio):
+    return _forest_predict(model, np.column_stack([days_left, stock_ratio]))
+
+def get_tactical_discount(days_left, stock, avg_sales, models=None):
+    models = models or current_models()
+    # Written so that NaN (a blank cell) fails every guard and gets no discount.
+    if not (days_left >= 0 and stock > 0 and avg_sales > 0) or not models.has('sell_through'):
         return 0
 
     stock_ratio = stock / avg_sales
-    input_data = pd.DataFrame([[days_left, stock_ratio]], columns=['days_until_expiry', 'stock_to_sales_ratio'])
-    predicted_sell_through = MODELS['sell_through'].predict(input_data)[0]
+    predicted_sell_through = _predict_sell_through(_forest(models, 'sell_through', 1), [days_left], [stock_ratio])[0]
 
     discount = 0.0
     if predicted_sell_through < 0.30: discount = 0.75
@@ -110,18 +603,240 @@ def get_tactical_discount(days_left, stock, avg_sales):
 
     return 0 if days_left > 7 else round(discount, 2)
 
-def run_tactical_analysis(df_inventory):
-    today = pd.Timestamp.now().normalize()
+@metrics.instrument('ai_core.get_tactical_discounts')
+def get_tactical_discounts(days_left, stock, avg_sales, models=None):
+    """Vectorized get_tactical_discount: scores every row with a single predict call."""
+    models = models or current_models()
+    days_left = np.asarray(days_left, dtype=float)
+    stock = np.asarray(stock, dtype=float)
+    avg_sales = np.asarray(avg_sales, dtype=float)
+    discounts = np.zeros(len(days_left))
+    metrics.count_rows('ai_core.get_tactical_discounts', len(days_left))
+    if not models.has('sell_through'):
+        return discounts
+
+    # Same guards as the per-row function: rows with NaN days, stock or sales get no discount.
+    valid = (days_left >= 0) & (days_left <= 7) & (stock > 0) & (avg_sales > 0)
+    if not valid.any():
+        return discounts
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stock_ratio = stock[valid] / avg_sales[valid]
+    grid = models['sell_through_grid']
+    if USE_SELL_THROUGH_GRID and _is_step_grid(grid):
+        predicted_sell_through = lookup_sell_through(grid, days_left[valid], stock_ratio)
+    else:
+        predicted_sell_through = _predict_sell_through(_forest(models, 'sell_through', len(stock_ratio)), days_left[valid], stock_ratio)
+
+    discounts[valid] = sell_through_to_discount(predicted_sell_through)
+    return discounts
+
+def sell_through_to_discount(predicted_sell_through):
+    """Maps predicted sell-through rates to the 75/50/25% discount tiers."""
+    return np.select(
+        [predicted_sell_through < 0.30, predicted_sell_through < 0.60, predicted_sell_through < 0.85],
+        [0.75, 0.50, 0.25],
+        default=0.0,
+    )
+
+def score_inventory(df_inventory, today=None, models=None, cached_discounts=None):
+    """Adds days_until_expiry, discount_rate, recovered_revenue and action (donate, flash_sale or keep) to every row.
+
+    cached_discounts optionally gives a known discount per row (NaN where unknown);
+    only the unknown rows are sent to the models.
+    """
+    if today is None:
+        today = pd.Timestamp.now().normalize()
     df_inventory['expiry_date'] = pd.to_datetime(df_inventory['expiry_date'])
     df_inventory['days_until_expiry'] = (df_inventory['expiry_date'] - today).dt.days
 
-    df_inventory['discount_rate'] = df_inventory.apply(lambda row: get_tactical_discount(row['days_until_expiry'], row['current_stock'], row['avg_daily_sales']), axis=1)
+    if cached_discounts is None:
+        df_inventory['discount_rate'] = _partitioned_tactical_discounts(df_inventory, models)
+    else:
+        discounts = np.array(cached_discounts, dtype=float)
+        stale = np.isnan(discounts)
+        if stale.any():
+            discounts[stale] = _partitioned_tactical_discounts(df_inventory[stale], models)
+        df_inventory['discount_rate'] = discounts
     df_inventory['recovered_revenue'] = df_inventory['current_stock'] * df_inventory['price'] * (1 - df_inventory['discount_rate'])
+    df_inventory['action'] = np.select([df_inventory['days_until_expiry'] <= 2, df_inventory['discount_rate'] > 0], ['donate', 'flash_sale'], 'keep')
+    return df_inventory
 
-    flash_sale_items = df_inventory[(df_inventory['discount_rate'] > 0) & (df_inventory['days_until_expiry'] > 2)].copy()
-    donation_items = df_inventory[df_inventory['days_until_expiry'] <= 2].copy()
+def run_tactical_analysis(df_inventory, today=None, models=None):
+    df_inventory = score_inventory(df_inventory, today=today, models=models)
+    flash_sale_items = df_inventory[df_inventory['action'] == 'flash_sale'].copy()
+    donation_items = df_inventory[df_inventory['action'] == 'donate'].copy()
     
     return flash_sale_items, donation_items
 
-# --- Load any existing models on application startup ---
-load_models()
\ No newline at end of file
+@metrics.instrument('ai_core.run_tactical_analysis_streaming')
+def run_tactical_analysis_streaming(inventory_source, chunk_rows=INVENTORY_CHUNK_ROWS, models=None, history=None, keep_items=True):
+    """Scores an inventory file (CSV or Parquet) chunk by chunk, keeping only actionable rows and running totals.
+
+    history, if given, is an inventory_store.SnapshotRecorder: rows unchanged
+    since earlier snapshots reuse their decisions, and every scored chunk is
+    handed to the new snapshot. With keep_items=False the actionable rows are not
+    collected (e.g. when they are read back from the snapshot) and the returned
+    frames are empty.
+    """
+    models = models or current_models()
+    today = pd.Timestamp.now().normalize()
+    sale_chunks, donation_chunks = [], []
+    totals = {"rows_scored": 0, "rows_reused": 0, "waste_prevented": 0, "revenue_recovered": 0.0, "donated_stock": 0}
+
+    for chunk in data_store.iter_batches(inventory_source, 'inventory', chunk_rows):
+        cached_discounts = history.cached_discounts(chunk, today) if history is not None else None
+        chunk = score_inventory(chunk, today=today, models=models, cached_discounts=cached_discounts)
+        if history is not None:
+            reused = ~np.isnan(cached_discounts)
+            history.add(chunk, reused)
+            totals['rows_reused'] += int(reused.sum())
+        sale_items = chunk[chunk['action'] == 'flash_sale']
+        donation_items = chunk[chunk['action'] == 'donate']
+        totals['rows_scored'] += len(chunk)
+        totals['waste_prevented'] += int(sale_items['current_stock'].sum() + donation_items['current_stock'].sum())
+        totals['revenue_recovered'] += float(sale_items['recovered_revenue'].sum())
+        totals['donated_stock'] += int(donation_items['current_stock'].sum())
+        if keep_items and len(sale_items):
+            sale_chunks.append(sale_items)
+        if keep_items and len(donation_items):
+            donation_chunks.append(donation_items)
+
+    totals['potential_meals'] = int(totals['donated_stock'] * 2.5)
+    metrics.count_rows('ai_core.run_tactical_analysis_streaming', totals['rows_scored'])
+    return _concat_inventory_chunks(sale_chunks), _concat_inventory_chunks(donation_chunks), totals
+
+_MODEL_FILE_HASHES = {}
+
+def tactical_model_key(models):
+    """Identifies the tactical models in use by content; decisions cached under a different key are not reused."""
+    state = []
+    for name in TACTICAL_TARGETS:
+        stamp = models.stamps.get(name)
+        # Restoring from the registry rewrites identical files, so hash contents rather than compare stamps.
+        if stamp is not None and _MODEL_FILE_HASHES.get(name, (None,))[0] != stamp:
+            _MODEL_FILE_HASHES[name] = (stamp, file_sha256(MODEL_STORE.files[name]))
+        state.append(_MODEL_FILE_HASHES[name][1] if stamp is not None else None)
+    state += [USE_SELL_THROUGH_GRID, USE_PARTITIONED_MODELS and PARTITIONS['tactical'].run]
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
+def _concat_inventory_chunks(chunks):
+    if not chunks:
+        return pd.DataFrame(columns=list(data_store.SCHEMAS['inventory']) + ['days_until_expiry', 'discount_rate', 'recovered_revenue', 'action'])
+    # Each chunk has its own categories, so re-encode once after concatenating.
+    df = pd.concat(chunks, ignore_index=True)
+    for col in ('product_name', 'category'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+# --- 3. PARTITIONED MODELS ---
+@metrics.instrument('ai_core.train_partitioned_models')
+def train_partitioned_models(kind, data_path, partition_by):
+    """Trains one strategic or tactical model set per partition, e.g. partition_by=['store_id'].
+
+    Partitions are fitted in parallel in a pool of PARTITION_WORKERS processes,
+    each reading only its own rows from the Parquet copy of data_path. The new
+    set replaces any previously trained partitions of this kind in one step.
+    """
+    run_dir = None
+    try:
+        partitions = PARTITIONS[kind]
+        partition_by = list(partition_by)
+        parquet_path = data_store.to_columnar(data_path, kind)
+        columns = data_store.read_table(parquet_path, kind, columns=partition_by).drop_duplicates()
+        missing = [col for col in partition_by if col not in columns.columns]
+        if not partition_by or missing:
+            return False, f"Cannot partition by missing columns: {', '.join(missing) or 'none given'}"
+        keys = sorted(columns.dropna().astype(object).itertuples(index=False, name=None), key=str)
+
+        run_id, run_dir = partitions.new_run()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=max(1, min(PARTITION_WORKERS, len(keys))),
+                                 mp_context=worker_processes.pool_context()) as pool:
+            futures = [pool.submit(_train_partition, kind, parquet_path, partition_by, values,
+                                   partitions.partition_dir(run_dir, partition_by, values))
+                       for values in keys]
+            rows = {values: {"rows": n_rows} for values, n_rows in (future.result() for future in futures)}
+        metrics.count_rows('ai_core.train_partitioned_models', sum(info['rows'] for info in rows.values()))
+        partitions.publish(run_id, partition_by, rows, source=data_path, trained_at=datetime.now().isoformat(timespec='seconds'))
+        return True, f"Trained {kind} models for {len(keys):,} partitions by {', '.join(partition_by)} in {time.perf_counter() - start:.1f}s."
+    except Exception as e:
+        if run_dir:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        return False, str(e)
+
+def _train_partition(kind, parquet_path, partition_by, values, partition_dir):
+    """Process-pool worker: fits and saves one partition's models. Returns (values, n_rows)."""
+    df = data_store.read_table(parquet_path, kind, filters=[(col, '=', value) for col, value in zip(partition_by, values)])
+    # The partition columns are constant within a partition, so they carry no signal.
+    df = df.drop(columns=partition_by)
+    if kind == 'strategic':
+        trained = _fit_strategic_frame(df.astype({'product_name': str}), n_jobs=PARTITION_TRAINING_N_JOBS)
+    else:
+        trained = _fit_tactical_frame(df, n_jobs=PARTITION_TRAINING_N_JOBS)
+    os.makedirs(partition_dir)
+    for name, model in trained.items():
+        joblib.dump(model, os.path.join(partition_dir, PARTITIONS[kind].files[name]))
+    return values, len(df)
+
+def partition_models(kind, values):
+    """Returns one partition's model snapshot, loading it on first use, or None if the partition has no models."""
+    values = tuple(int(v) if isinstance(v, float) and v.is_integer() else v for v in values)
+    if any(pd.isna(v) for v in values):
+        return None
+    mmap_names, skip_names = _load_options()
+    snapshot, hit = PARTITIONS[kind].models(values, mmap_names, skip_names)
+    metrics.cache_lookup(f'{kind}_partitions', hit)
+    return snapshot
+
+def _partition_groups(kind, df, extra_keys=()):
+    """Yields (models, row positions, group key) per group of rows sharing a partition and extra_keys.
+
+    models is the partition's snapshot, or None when partitioned models are off, not
+    trained, or df lacks the partition columns.
+    """
+    partition_by = list(PARTITIONS[kind].partition_by) if USE_PARTITIONED_MODELS else []
+    if not set(partition_by) <= set(df.columns):
+        partition_by = []
+    keys = partition_by + list(extra_keys)
+    if not keys:
+        yield None, np.arange(len(df)), ()
+        return
+    for key, positions in df.groupby(keys, dropna=False, sort=False, observed=True).indices.items():
+        key = key if isinstance(key, tuple) else (key,)
+        models = partition_models(kind, key[:len(partition_by)]) if partition_by else None
+        yield models, positions, key[len(partition_by):]
+
+def _partitioned_tactical_discounts(df_inventory, models):
+    """get_tactical_discounts with each row scored by its partition's sell-through model."""
+    discounts = np.zeros(len(df_inventory))
+    for partition, positions, _ in _partition_groups('tactical', df_inventory):
+        rows = df_inventory.iloc[positions]
+        discounts[positions] = get_tactical_discounts(rows['days_until_expiry'], rows['current_stock'], rows['avg_daily_sales'],
+                                                      models=partition if partition is not None else models)
+    return discounts
+
+def run_partitioned_forecast(requests, models=None):
+    """Forecasts a frame of product_name, month, year (plus any scenario knobs and partition columns) rows.
+
+    Rows are grouped by partition, horizon and scenario, so each group takes one
+    run_strategic_forecast_batch pass with its partition's models (the global
+    ones for untrained partitions). Returns recommended_stock and predicted_waste
+    aligned with requests.
+    """
+    models = models or current_models()
+    knobs = [knob for knob in DEFAULT_SCENARIO if knob in requests.columns]
+    requests = requests.fillna({knob: DEFAULT_SCENARIO[knob] for knob in knobs})
+    stock = np.zeros(len(requests), dtype=int)
+    waste = np.zeros(len(requests), dtype=int)
+    product_names = requests['product_name'].to_numpy()
+    for partition, positions, key in _partition_groups('strategic', requests, ['month', 'year', *knobs]):
+        scenario = {knob: [value] for knob, value in zip(knobs, key[2:])}
+        forecast = run_strategic_forecast_batch(product_names[positions], [key[:2]], scenario,
+                                                models=partition if partition is not None else models)
+        if forecast.empty:
+            raise ValueError("The strategic models have not been trained yet.")
+        stock[positions] = forecast['recommended_stock'].to_numpy()
+        waste[positions] = forecast['predicted_waste'].to_numpy()
+    return pd.DataFrame({"recommended_stock": stock, "predicted_waste": waste}, index=requests.index)
@@ -1,10 +1,24 @@
-from flask import Flask, render_template, request, session, redirect, url_for, send_file, flash
+from flask import Flask, render_template, request, session, redirect, url_for, flash, jsonify, abort, Response, stream_with_context, g
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-import pandas as pd
 from datetime import datetime
-import ai_core 
-import io
+import cProfile
+import functools
+import itertools
+import json
 import os
+import random
+import threading
+import time
+import uuid
+import auth
+import data_store
+import exports
+import inventory_store
+import jobs
+import metrics
+import paging
+import result_store
+from datetime import timedelta
 from forms import LoginForm, RegistrationForm
 from models import db, bcrypt, User # <-- MODIFIED: Import from models.py
 
@@ -13,10 +27,55 @@ app = Flask(__name__)
 app.secret_key = 'your_super_secret_key_for_hackathon'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///site.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['TRAINING_WORKERS'] = 2
+# Uploaded files (and their Parquet copies) are deleted once older than UPLOAD_TTL or beyond
+# the newest UPLOADS_KEPT, unless a training job still needs them.
+app.config['UPLOAD_TTL'] = timedelta(hours=24)
+app.config['UPLOADS_KEPT'] = 50
+# Load models on a background thread when the first request arrives. ai_core (pandas,
+# joblib, the model files) is imported lazily so admin scripts importing this module
+# never pay for it.
+app.config['WARM_UP_MODELS'] = True
+app.config['FORECAST_RESULT_TTL'] = timedelta(hours=24)
+app.config['FORECAST_RESULTS_PER_USER'] = 10
+# Each scored inventory upload is saved as a snapshot holding its flash-sale and donation
+# rows, which back the paged results views. INVENTORY_HISTORY also stores the rows to keep,
+# which /download_sell_through_history and INVENTORY_REUSE_DECISIONS need: with reuse, rows
+# unchanged since the user's earlier uploads reuse their decisions instead of being
+# rescored, and a snapshot only stores the rows it rescored.
+# Snapshots beyond the newest per user, or older than the TTL, are deleted.
+app.config['INVENTORY_HISTORY'] = False
+app.config['INVENTORY_REUSE_DECISIONS'] = False
+app.config['INVENTORY_SNAPSHOTS_PER_USER'] = 14
+app.config['INVENTORY_SNAPSHOT_TTL'] = timedelta(days=14)
+# Rows per page of the results tables (and the default page size of /api/v1/results).
+app.config['RESULTS_PER_PAGE'] = 50
+# Stage timers, row counts and cache hit counters, exposed at /metrics in the Prometheus
+# text format. When False every timer is a no-op and /metrics returns 404.
+app.config['METRICS_ENABLED'] = True
+# Fraction of requests to run under cProfile; each profile is saved to PROFILE_DIR.
+app.config['PROFILE_SAMPLE_RATE'] = 0.0
+app.config['PROFILE_DIR'] = 'profiles'
+# Items scored per model call by the /api/v1 endpoints; results stream out batch by batch.
+app.config['API_BATCH_ROWS'] = 5000
+# bcrypt work factor for new hashes; existing hashes are upgraded (or downgraded) on login.
+app.config['BCRYPT_LOG_ROUNDS'] = 12
+# Password checks run on this many threads (0 = on the request thread); logins beyond
+# PASSWORD_HASH_MAX_PENDING waiting checks are turned away instead of queueing.
+app.config['PASSWORD_HASH_WORKERS'] = max(1, (os.cpu_count() or 2) // 2)
+app.config['PASSWORD_HASH_MAX_PENDING'] = 64
+# Seconds users (and verified API credentials) stay cached in each process; 0 disables.
+app.config['USER_CACHE_TTL'] = 300
+# Any setting above can be overridden by a FLASK_<NAME> environment variable (JSON values,
+# e.g. FLASK_SQLALCHEMY_DATABASE_URI=sqlite:////srv/site.db or FLASK_BCRYPT_LOG_ROUNDS=13).
+app.config.from_prefixed_env()
+metrics.ENABLED = app.config['METRICS_ENABLED']
 
 # --- Initialize Extensions with the App ---
 db.init_app(app)
 bcrypt.init_app(app)
+auth.user_cache.init_app(app)
+auth.password_verifier.init_app(app)
 
 # --- Login Manager Setup ---
 login_manager = LoginManager(app)
@@ -25,10 +84,106 @@ login_manager.login_message_category = 'info'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return auth.user_cache.get(user_id)
+
+@login_manager.request_loader
+def load_user_from_request(req):
+    """Lets API clients authenticate with HTTP Basic credentials instead of a session cookie."""
+    credentials = req.authorization
+    if credentials is None or credentials.type != 'basic' or not credentials.username:
+        return None
+    user = auth.user_cache.get_by_username(credentials.username)
+    try:
+        if user and auth.password_verifier.verify(user, credentials.password or '', remember=True):
+            return user
+    except auth.PasswordCheckBusy:
+        pass
+    return None
 
 # --- App Configuration ---
 DATA_DIR = 'data'
+UPLOAD_DIR = os.path.join(DATA_DIR, 'uploads')
+
+# --- Background Training ---
+# Jobs are tracked in this process only (see jobs.TrainingJobQueue): run the app as a single
+# process so /jobs/<id> finds them.
+training_jobs = jobs.TrainingJobQueue(max_workers=app.config['TRAINING_WORKERS'])
+
+def _save_upload(field, prefix):
+    """Saves an uploaded file (see jobs.save_upload), deleting expired uploads first."""
+    with metrics.timed('index.prune_uploads'):
+        jobs.prune_uploads(UPLOAD_DIR, app.config['UPLOAD_TTL'], app.config['UPLOADS_KEPT'], in_use=training_jobs.active_paths())
+    with metrics.timed('index.save_upload'):
+        return jobs.save_upload(request.files[field], UPLOAD_DIR, prefix)
+
+def _train_strategic(dataset_path):
+    import ai_core
+    success, message = ai_core.train_strategic_models(dataset_path)
+    if success:
+        ai_core.load_models()
+    return success, message
+
+def _update_strategic(dataset_path):
+    import ai_core
+    success, message = ai_core.update_strategic_models(dataset_path)
+    if success:
+        ai_core.load_models()
+    return success, message
+
+def _train_tactical(dataset_path):
+    import ai_core
+    success, message = ai_core.train_tactical_model(dataset_path)
+    if success:
+        ai_core.load_models()
+    return success, message
+
+_warm_up_lock = threading.Lock()
+_warm_up_started = False
+
+def _warm_up_models():
+    import ai_core
+    ai_core.current_models()
+
+@app.before_request
+def start_model_warm_up():
+    global _warm_up_started
+    if _warm_up_started or not app.config['WARM_UP_MODELS']:
+        return
+    with _warm_up_lock:
+        if not _warm_up_started:
+            _warm_up_started = True
+            threading.Thread(target=_warm_up_models, name='model-warmup', daemon=True).start()
+
+@app.before_request
+def start_request_instrumentation():
+    if metrics.ENABLED:
+        g.request_started = time.perf_counter()
+    sample_rate = app.config['PROFILE_SAMPLE_RATE']
+    if sample_rate and random.random() < sample_rate:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # another request is already being profiled
+        g.profiler = profiler
+
+@app.teardown_request
+def finish_request_instrumentation(exc):
+    # Runs after a streamed response has finished sending, so downloads are timed in full.
+    started = g.pop('request_started', None)
+    if started is not None:
+        metrics.observe_request(request.endpoint, request.method, time.perf_counter() - started)
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+        profiler.dump_stats(os.path.join(app.config['PROFILE_DIR'], f"{request.endpoint}-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.prof"))
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not app.config['METRICS_ENABLED']:
+        abort(404)
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 # --- Authentication Routes ---
 @app.route("/register", methods=['GET', 'POST'])
@@ -37,9 +192,14 @@ def register():
         return redirect(url_for('index'))
     form = RegistrationForm()
     if form.validate_on_submit():
-        user = User(username=form.username.data, password=form.password.data)
+        try:
+            user = User(username=form.username.data, password_hash=auth.password_verifier.hash(form.password.data))
+        except auth.PasswordCheckBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('register.html', title='Register', form=form), 503
         db.session.add(user)
         db.session.commit()
+        auth.user_cache.invalidate()
         login_user(user) # Log the user in automatically
         flash(f'Welcome, {user.username}! Your account has been successfully created.', 'success')
         return redirect(url_for('index')) # Redirect to the main page
@@ -51,8 +211,13 @@ def login():
         return redirect(url_for('index'))
     form = LoginForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(username=form.username.data).first()
-        if user and user.verify_password(form.password.data):
+        user = auth.user_cache.get_by_username(form.username.data)
+        try:
+            verified = user is not None and auth.password_verifier.verify(user, form.password.data)
+        except auth.PasswordCheckBusy:
+            flash('Too many people are signing in right now. Please try again in a moment.', 'warning')
+            return render_template('login.html', title='Login', form=form), 503
+        if verified:
             login_user(user)
             flash(f'Welcome back, {user.username}!', 'success')
             return redirect(url_for('index'))
@@ -75,100 +240,491 @@ def index():
                 flash('Please upload a historical data file to train the strategic models.', 'warning')
                 return redirect(url_for('index'))
             
-            s_file = request.files['strategic_file']
-            s_filepath = os.path.join(DATA_DIR, 'historical_data.csv')
-            s_file.save(s_filepath)
+            s_filepath, dataset_key = _save_upload('strategic_file', 'historical')
 
             try:
-                hist_df = pd.read_csv(s_filepath)
-                products_in_file = hist_df['product_name'].unique().tolist()
+                with metrics.timed('index.check_columns'):
+                    data_store.check_columns(s_filepath, 'historical')
             except Exception as e:
-                flash(f"Could not read product list from file: {e}", "danger")
+                flash(f"Could not read historical data from file: {e}", "danger")
                 return redirect(url_for('index'))
 
-            success, message = ai_core.train_strategic_models()
-            if not success:
-                flash(f'Error during strategic model training: {message}', 'danger')
-                return redirect(url_for('index'))
-            
-            ai_core.load_models()
-            if not ai_core.MODELS['stock'] or not ai_core.MODELS['waste']:
-                 flash('Strategic models trained but failed to load. Cannot generate forecast.', 'danger')
-                 return redirect(url_for('index'))
-            target_month = int(request.form['month'])
-            target_year = int(request.form['year'])
-            predictions = ai_core.run_strategic_prediction(products_in_file, target_month, target_year)
-            session['strategic_df'] = predictions.to_json()
-            session['strategic_month'] = target_month
-            session['strategic_year'] = target_year
-            chart_data = {'labels': predictions['Product'].tolist(), 'stock': predictions['Recommended Stock (Units)'].tolist(), 'waste': predictions['Predicted Waste (Units)'].tolist()}
-            total_stock = predictions['Recommended Stock (Units)'].sum()
-            total_waste = predictions['Predicted Waste (Units)'].sum()
-            waste_percentage = (total_waste / total_stock * 100) if total_stock > 0 else 0
-            return render_template('strategic_results.html', month=target_month, year=target_year, chart_data=chart_data, total_stock=f"{total_stock:,}", total_waste=f"{total_waste:,}", waste_percentage=f"{waste_percentage:.1f}", results_table=predictions.to_html(classes='table table-hover text-center', index=False))
+            if request.form.get('incremental'):
+                # Same kind as a full retrain, so the two never write the model files at once.
+                job, _ = training_jobs.submit('strategic', s_filepath, f"incremental-{dataset_key}", _update_strategic)
+            else:
+                job, _ = training_jobs.submit('strategic', s_filepath, dataset_key, _train_strategic)
+            session['strategic_request'] = {'job_id': job.id, 'month': int(request.form['month']), 'year': int(request.form['year'])}
+            return redirect(url_for('job_results', job_id=job.id))
         elif 'run_tactical' in request.form:
             if 'tactical_file' not in request.files or request.files['tactical_file'].filename == '':
                 flash('Please upload a tactical training data file.', 'warning')
                 return redirect(url_for('index'))
             
-            t_file = request.files['tactical_file']
-            t_filepath = os.path.join(DATA_DIR, 'tactical_training_data.csv')
-            t_file.save(t_filepath)
-            success, message = ai_core.train_tactical_model()
-            if not success:
-                flash(f'Error during tactical model training: {message}', 'danger')
-                return redirect(url_for('index'))
+            t_filepath, dataset_key = _save_upload('tactical_file', 'tactical')
+            job, _ = training_jobs.submit('tactical', t_filepath, dataset_key, _train_tactical)
             if 'inventory_file' not in request.files or request.files['inventory_file'].filename == '':
-                flash('Training successful, but please also upload an inventory file for analysis.', 'warning')
-                return redirect(url_for('index'))
-            
-            ai_core.load_models()
-            if not ai_core.MODELS['sell_through']:
-                flash('Tactical model trained but failed to load. Cannot get daily actions.', 'danger')
-                return redirect(url_for('index'))
-            
-            inventory_file = request.files['inventory_file']
-            try:
-                inventory_df = pd.read_csv(inventory_file.stream)
-                sale_items, donation_items = ai_core.run_tactical_analysis(inventory_df.copy())
-                total_waste_prevented = donation_items['current_stock'].sum() + sale_items['current_stock'].sum()
-                total_revenue_recovered = sale_items['recovered_revenue'].sum()
-                co2_saved = total_waste_prevented * 0.5
-                water_saved = total_waste_prevented * 25
-                potential_meals = int(donation_items['current_stock'].sum() * 2.5)
-                return render_template('tactical_results.html', 
-                                       sale_items=sale_items.to_dict('records'), 
-                                       donation_items=donation_items.to_dict('records'), 
-                                       co2_saved=f"{co2_saved:.1f}", 
-                                       water_saved=f"{water_saved:,.0f}", 
-                                       revenue_recovered=f"${total_revenue_recovered:,.2f}", 
-                                       potential_meals=f"~{potential_meals:,}")
-            except Exception as e:
-                flash(f"An error occurred while processing the inventory file: {e}", "danger")
+                flash('Training started, but please also upload an inventory file for analysis.', 'warning')
                 return redirect(url_for('index'))
+
+            inventory_path, _ = _save_upload('inventory_file', 'inventory')
+            session['tactical_request'] = {'job_id': job.id, 'inventory_file': os.path.basename(inventory_path)}
+            return redirect(url_for('job_results', job_id=job.id))
     current_year = datetime.now().year
     return render_template('index.html', current_year=current_year)
 
+@app.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    job = training_jobs.get(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/results')
+@login_required
+def job_results(job_id):
+    job = training_jobs.get(job_id)
+    if job is None:
+        flash('That training job could not be found. Please submit your data again.', 'warning')
+        return redirect(url_for('index'))
+    if not job.finished:
+        return render_template('job_pending.html', title='Training', job=job)
+    if job.status == jobs.FAILED:
+        flash(f'Error during {job.kind} model training: {job.message}', 'danger')
+        return redirect(url_for('index'))
+    flash(job.message, 'info')
+    if job.kind == 'strategic':
+        return _strategic_results(job)
+    return _tactical_results(job)
+
+def _strategic_results(job):
+    params = session.get('strategic_request')
+    if not params or params['job_id'] != job.id:
+        flash('Training finished. Please submit a forecast request to view results.', 'info')
+        return redirect(url_for('index'))
+    # The forecast is made once per request; reloading the page shows the stored one.
+    result_id = params.get('result_id')
+    summary = result_store.forecast_summary(result_id) if result_id else None
+    if summary is None:
+        result_id = _save_strategic_forecast(job, params)
+        if result_id is None:
+            return redirect(url_for('index'))
+        session['strategic_request'] = {**params, 'result_id': result_id}
+        session['strategic_result_id'] = result_id
+        summary = result_store.forecast_summary(result_id)
+    # The chart shows the top products only; the full forecast is paged in from /api/v1/results.
+    chart_data = {'labels': [row['product'] for row in summary['top_waste']],
+                  'stock': [row['recommended_stock'] for row in summary['top_waste']],
+                  'waste': [row['predicted_waste'] for row in summary['top_waste']]}
+    total_stock = summary['recommended_stock']
+    total_waste = summary['predicted_waste']
+    waste_percentage = (total_waste / total_stock * 100) if total_stock > 0 else 0
+    with metrics.timed('results.render_template'):
+        return render_template('strategic_results.html', month=params['month'], year=params['year'], chart_data=chart_data, summary=summary,
+                               total_stock=f"{total_stock:,}", total_waste=f"{total_waste:,}", waste_percentage=f"{waste_percentage:.1f}",
+                               rows_url=url_for('api_strategic_results', result_id=result_id), per_page=app.config['RESULTS_PER_PAGE'])
+
+def _save_strategic_forecast(job, params):
+    """Forecasts the products in the job's dataset and stores the result; returns its ID, or None after flashing why not."""
+    import ai_core
+    with metrics.timed('results.current_models'):
+        models = ai_core.current_models()
+    if not ai_core.has_strategic_models(models):
+         flash('Strategic models trained but failed to load. Cannot generate forecast.', 'danger')
+         return None
+    if not os.path.exists(job.dataset_path):
+        flash('Your uploaded data has expired. Please submit it again.', 'warning')
+        return None
+    with metrics.timed('results.read_products'):
+        products_df = data_store.read_table(job.dataset_path, 'historical', columns=['product_name', 'category']).drop_duplicates('product_name')
+    products_in_file = products_df['product_name'].tolist()
+    target_month = params['month']
+    target_year = params['year']
+    predictions = ai_core.run_strategic_prediction(products_in_file, target_month, target_year, models=models)
+    if 'category' in products_df.columns and not predictions.empty:
+        predictions.insert(1, 'Category', products_df['category'].tolist())
+    with metrics.timed('results.save_forecast'):
+        return result_store.save_forecast(predictions, target_month, target_year, current_user.id,
+                                          ttl=app.config['FORECAST_RESULT_TTL'],
+                                          max_per_user=app.config['FORECAST_RESULTS_PER_USER'])
+
+def _tactical_results(job):
+    params = session.get('tactical_request')
+    if not params or params['job_id'] != job.id:
+        flash('Training finished. Please upload an inventory file for analysis.', 'info')
+        return redirect(url_for('index'))
+    # The inventory is scored once per upload; reloading the page shows the stored snapshot.
+    snapshot = inventory_store.get_snapshot(params.get('snapshot_id'), current_user.id)
+    if snapshot is None:
+        snapshot = _save_inventory_snapshot(params)
+        if snapshot is None:
+            return redirect(url_for('index'))
+        session['tactical_request'] = {**params, 'snapshot_id': snapshot.id}
+    summary = snapshot.summary
+    total_waste_prevented = summary['actions']['flash_sale']['stock'] + summary['actions']['donate']['stock']
+    total_revenue_recovered = summary['actions']['flash_sale']['recovered_revenue']
+    co2_saved = total_waste_prevented * 0.5
+    water_saved = total_waste_prevented * 25
+    potential_meals = int(summary['actions']['donate']['stock'] * 2.5)
+    with metrics.timed('results.render_template'):
+        return render_template('tactical_results.html', 
+                               summary=summary,
+                               sale_items=summary['top_sales'],
+                               donation_items=summary['top_donations'],
+                               co2_saved=f"{co2_saved:.1f}", 
+                               water_saved=f"{water_saved:,.0f}", 
+                               revenue_recovered=f"${total_revenue_recovered:,.2f}", 
+                               potential_meals=f"~{potential_meals:,}",
+                               rows_url=url_for('api_tactical_results', snapshot_id=snapshot.id),
+                               per_page=app.config['RESULTS_PER_PAGE'])
+
+def _save_inventory_snapshot(params):
+    """Scores the uploaded inventory and stores it as a snapshot; returns the snapshot, or None after flashing why not."""
+    import ai_core
+    with metrics.timed('results.current_models'):
+        models = ai_core.current_models()
+    if not models.has('sell_through'):
+        flash('Tactical model trained but failed to load. Cannot get daily actions.', 'danger')
+        return None
+    
+    inventory_path = os.path.join(UPLOAD_DIR, os.path.basename(params['inventory_file']))
+    if not os.path.exists(inventory_path):
+        flash('Your uploaded inventory has expired. Please submit it again.', 'warning')
+        return None
+    history = None
+    try:
+        history = inventory_store.SnapshotRecorder(current_user.id, ai_core.tactical_model_key(models),
+                                                   reuse=app.config['INVENTORY_REUSE_DECISIONS'],
+                                                   all_rows=app.config['INVENTORY_HISTORY'])
+        _, _, totals = ai_core.run_tactical_analysis_streaming(inventory_path, models=models, history=history, keep_items=False)
+        with metrics.timed('results.save_inventory_snapshot'):
+            history.finish(totals['rows_reused'], app.config['INVENTORY_SNAPSHOTS_PER_USER'], app.config['INVENTORY_SNAPSHOT_TTL'])
+        return history.snapshot
+    except Exception as e:
+        if history is not None:
+            history.discard()
+        flash(f"An error occurred while processing the inventory file: {e}", "danger")
+        return None
+
+@app.route('/download_sell_through_history')
+@login_required
+def download_sell_through_history():
+    """Tactical training data (CSV) observed in the user's saved inventory snapshots."""
+    if not app.config['INVENTORY_HISTORY']:
+        flash("Inventory history is not being kept, so there is no sell-through history to download.", "warning")
+        return redirect(url_for('index'))
+    history = inventory_store.sell_through_history(current_user.id)
+    if history.empty:
+        flash("Not enough inventory history yet: lots must be seen at least twice before they expire.", "warning")
+        return redirect(url_for('index'))
+    return Response(history.to_csv(index=False), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=tactical_training_history.csv'})
+
 @app.route('/download_po')
 @login_required
 def download_po():
-    strategic_df_json = session.get('strategic_df', None)
-    if strategic_df_json is None:
-        flash("No strategic forecast found in session. Please run a forecast first.", "warning")
+    """Streams the purchase order as CSV, gzip-CSV or Parquet, optionally filtered by product or category."""
+    with metrics.timed('download_po.get_forecast'):
+        result = result_store.get_forecast(session.get('strategic_result_id'), current_user.id)
+    if result is None:
+        flash("No strategic forecast found. Please run a forecast first.", "warning")
         return redirect(url_for('index'))
-    df = pd.read_json(strategic_df_json)
-    month = session.get('strategic_month')
-    year = session.get('strategic_year')
-    po_df = df[['Product', 'Recommended Stock (Units)']]
-    output = io.BytesIO()
-    po_df.to_csv(output, index=False)
-    output.seek(0)
-    return send_file(output, mimetype='text/csv', as_attachment=True, download_name=f'purchase_order_{month}_{year}.csv')
+    export_format = request.args.get('format', 'csv')
+    if export_format not in exports.FORMATS:
+        flash(f"Unknown purchase order format '{export_format}'.", "warning")
+        return redirect(url_for('index'))
+
+    rows = ((product, recommended_stock) for product, _, recommended_stock, _ in
+            result_store.iter_forecast_rows(result.id, products=request.args.getlist('product'), categories=request.args.getlist('category')))
+    rows = metrics.counted('download_po.stream', rows)
+    header = ['Product', 'Recommended Stock (Units)']
+    if export_format == 'csv':
+        body = exports.stream_csv(header, rows)
+    elif export_format == 'csv.gz':
+        body = exports.stream_csv_gzip(header, rows)
+    else:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            flash("Parquet export requires the 'pyarrow' package.", "warning")
+            return redirect(url_for('index'))
+        body = exports.stream_parquet(header, rows, [pa.string(), pa.int64()])
+
+    mimetype, extension = exports.FORMATS[export_format]
+    download_name = f'purchase_order_{result.month}_{result.year}.{extension}'
+    return Response(stream_with_context(metrics.timed_iter(f'download_po.stream.{export_format}', body)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={download_name}'})
+
+# --- Scoring API ---
+# Machine-facing endpoints for POS/ERP integrations. They score with the models that are
+# already loaded and never train. Bodies are a JSON array (or {"items": [...]}) or NDJSON
+# (Content-Type: application/x-ndjson), and the response uses the same format, streamed.
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+SCENARIO_FIELDS = ('promotions', 'local_event', 'seasonality_indicator')
+# Optional item fields that route an item to its store's or category's partitioned models.
+PARTITION_FIELDS = ('store_id', 'category')
+
+def api_login_required(fn):
+    """Like login_required, but answers 401 JSON instead of redirecting to the login page."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify(error='Authentication required.'), 401, {'WWW-Authenticate': 'Basic realm="FreshFuture API"'}
+        return fn(*args, **kwargs)
+    return wrapper
+
+def _api_items():
+    """Returns (items, ndjson). items yields (line, item) with item None when it is not a JSON object."""
+    if request.mimetype in NDJSON_MIMETYPES:
+        return _ndjson_items(request.stream), True
+    body = request.get_json(silent=True)
+    items = body.get('items') if isinstance(body, dict) else body
+    if not isinstance(items, list):
+        return None, False
+    return ((line, item if isinstance(item, dict) else None) for line, item in enumerate(items, start=1)), False
+
+def _ndjson_items(stream):
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = None
+        yield line_number, item if isinstance(item, dict) else None
+
+def _batches(items, size):
+    items = iter(items)
+    while batch := list(itertools.islice(items, size)):
+        yield batch
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _stream_api_records(records, ndjson, stage):
+    body = exports.stream_ndjson(metrics.counted(stage, records)) if ndjson else exports.stream_json_array(metrics.counted(stage, records))
+    return Response(stream_with_context(metrics.timed_iter(stage, body)), mimetype=NDJSON_MIMETYPES[0] if ndjson else 'application/json')
+
+def _inventory_item_error(item):
+    if item is None:
+        return 'Item is not a JSON object.'
+    for field in ('avg_daily_sales', 'current_stock', 'price'):
+        if not _is_number(item.get(field)):
+            return f"'{field}' must be a number."
+    try:
+        # strptime, unlike date.fromisoformat, rejects the basic (20261021) and week (2026-W42-1) forms.
+        datetime.strptime(item.get('expiry_date'), '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return "'expiry_date' must be a YYYY-MM-DD date."
+    return None
+
+def _score_inventory_batch(batch, today, models):
+    """Scores one batch of (line, item) pairs and yields a result per item, in input order."""
+    import ai_core
+    import pandas as pd
+
+    errors = {line: _inventory_item_error(item) for line, item in batch}
+    valid = [item for line, item in batch if errors[line] is None]
+    scored = iter(())
+    if valid:
+        df = pd.DataFrame({field: [item[field] for item in valid] for field in ('expiry_date', 'current_stock', 'avg_daily_sales', 'price')})
+        df = df.assign(**_partition_columns(valid))
+        df = ai_core.score_inventory(df, today=today, models=models)
+        scored = zip(df['days_until_expiry'].tolist(), df['discount_rate'].tolist(), df['recovered_revenue'].tolist(), df['action'].tolist())
+    for line, item in batch:
+        if errors[line]:
+            yield {'line': line, 'error': errors[line]}
+            continue
+        days, discount_rate, recovered_revenue, action = next(scored)
+        yield {**item, 'days_until_expiry': days, 'discount_rate': discount_rate,
+               'recovered_revenue': round(recovered_revenue, 2), 'action': action}
+
+@app.route('/api/v1/tactical/score', methods=['POST'])
+@api_login_required
+def api_tactical_score():
+    """Returns a discount/donation decision for each inventory item.
+
+    Items need expiry_date (YYYY-MM-DD), current_stock, avg_daily_sales and price;
+    optional store_id and category pick partitioned models, and all fields are echoed back. Invalid items come back as {"line", "error"}.
+    """
+    import ai_core
+    import pandas as pd
+
+    models = ai_core.current_models()
+    if not models.has('sell_through'):
+        return jsonify(error='The tactical model has not been trained yet.'), 503
+    items, ndjson = _api_items()
+    if items is None:
+        return jsonify(error='Expected a JSON array of items, {"items": [...]}, or an NDJSON body.'), 400
+    today = pd.Timestamp.now().normalize()
+    records = (record for batch in _batches(items, app.config['API_BATCH_ROWS'])
+               for record in _score_inventory_batch(batch, today, models))
+    return _stream_api_records(records, ndjson, 'api.tactical_score')
+
+def _forecast_item_error(item):
+    if item is None:
+        return 'Item is not a JSON object.'
+    if not isinstance(item.get('product_name'), str) or not item['product_name']:
+        return "'product_name' must be a non-empty string."
+    if not _is_int(item.get('month')) or not 1 <= item['month'] <= 12:
+        return "'month' must be an integer from 1 to 12."
+    if not _is_int(item.get('year')):
+        return "'year' must be an integer."
+    for field in SCENARIO_FIELDS:
+        if field in item and not _is_number(item[field]):
+            return f"'{field}' must be a number."
+    return None
+
+def _partition_columns(items):
+    """The partition fields any of the items carry, as columns (None where an item lacks one)."""
+    return {field: [item.get(field) for item in items] for field in PARTITION_FIELDS if any(field in item for item in items)}
+
+def _forecast_batch(batch, models):
+    """Forecasts one batch of (line, item) pairs, one model pass per distinct partition, month and scenario."""
+    import ai_core
+    import pandas as pd
+
+    errors = {line: _forecast_item_error(item) for line, item in batch}
+    valid = [item for line, item in batch if errors[line] is None]
+    forecast = iter(())
+    if valid:
+        fields = ('product_name', 'month', 'year', *SCENARIO_FIELDS)
+        requests = pd.DataFrame({field: [item.get(field) for item in valid] for field in fields}).assign(**_partition_columns(valid))
+        result = ai_core.run_partitioned_forecast(requests, models=models)
+        forecast = zip(result['recommended_stock'].tolist(), result['predicted_waste'].tolist())
+    for line, item in batch:
+        if errors[line]:
+            yield {'line': line, 'error': errors[line]}
+            continue
+        stock, waste = next(forecast)
+        yield {**item, 'recommended_stock': stock, 'predicted_waste': waste}
+
+def _forecast_grid_request(body):
+    """Returns (grid, error) for a JSON grid request; grid has products, (month, year) horizons and scenario lists."""
+    products = body.get('products')
+    if not isinstance(products, list) or not products or not all(isinstance(p, str) and p for p in products):
+        return None, '"products" must be a non-empty list of product names.'
+    horizons = []
+    for horizon in body.get('horizons') or [None]:
+        if isinstance(horizon, dict):
+            month, year = horizon.get('month'), horizon.get('year')
+        elif isinstance(horizon, list) and len(horizon) == 2:
+            month, year = horizon
+        else:
+            return None, '"horizons" must be a non-empty list of {"month", "year"} objects.'
+        if not _is_int(month) or not 1 <= month <= 12 or not _is_int(year):
+            return None, 'Each horizon needs an integer "month" from 1 to 12 and an integer "year".'
+        horizons.append((month, year))
+    scenarios = body.get('scenarios') or {}
+    if not isinstance(scenarios, dict):
+        return None, '"scenarios" must be an object such as {"promotions": [0, 1]}.'
+    values = {}
+    for field, field_values in scenarios.items():
+        if field not in SCENARIO_FIELDS:
+            return None, f"Unknown scenario '{field}'; expected any of {', '.join(SCENARIO_FIELDS)}."
+        field_values = field_values if isinstance(field_values, list) else [field_values]
+        if not field_values or not all(_is_number(value) for value in field_values):
+            return None, f"Scenario '{field}' must be a number or a non-empty list of numbers."
+        values[field] = field_values
+    return {'products': products, 'horizons': horizons, 'scenarios': values}, None
+
+def _forecast_grid(grid, models):
+    """Yields forecast records for every product x horizon x scenario of a validated grid request."""
+    import ai_core
+
+    horizons, products = grid['horizons'], grid['products']
+    batch_products = max(1, app.config['API_BATCH_ROWS'])
+    for horizon in horizons:
+        for start in range(0, len(products), batch_products):
+            forecast = ai_core.run_strategic_forecast_batch(products[start:start + batch_products], [horizon], grid['scenarios'], models=models)
+            yield from forecast.to_dict('records')
+
+@app.route('/api/v1/strategic/forecast', methods=['POST'])
+@api_login_required
+def api_strategic_forecast():
+    """Returns recommended stock and predicted waste.
+
+    Either a JSON grid, {"products": [...], "horizons": [{"month", "year"}, ...],
+    "scenarios": {"promotions": [0, 1], ...}}, forecasting every combination, or
+    items (JSON array or NDJSON) with product_name, month, year and optional
+    promotions, local_event, seasonality_indicator, store_id and category.
+    """
+    import ai_core
+
+    models = ai_core.current_models()
+    if not ai_core.has_strategic_models(models):
+        return jsonify(error='The strategic models have not been trained yet.'), 503
+    if request.mimetype not in NDJSON_MIMETYPES:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict) and 'products' in body:
+            # Validated up front: once the response streams, errors can no longer become a 400.
+            grid, error = _forecast_grid_request(body)
+            if error:
+                return jsonify(error=error), 400
+            return _stream_api_records(_forecast_grid(grid, models), False, 'api.strategic_forecast')
+    items, ndjson = _api_items()
+    if items is None:
+        return jsonify(error='Expected a grid request, a JSON array of items, {"items": [...]}, or an NDJSON body.'), 400
+    records = (record for batch in _batches(items, app.config['API_BATCH_ROWS'])
+               for record in _forecast_batch(batch, models))
+    return _stream_api_records(records, ndjson, 'api.strategic_forecast')
+
+# --- Results API ---
+# Pages of stored results for the results views (and integrations): ?page=, ?per_page=,
+# ?sort=<column>&order=asc|desc and repeatable ?category= filters, all applied in SQL.
+def _page_args(default_sort):
+    """(page, per_page, sort, descending) from the query string."""
+    page = request.args.get('page', 1, type=int)
+    per_page = max(1, min(request.args.get('per_page', app.config['RESULTS_PER_PAGE'], type=int), paging.MAX_PAGE_ROWS))
+    return page, per_page, request.args.get('sort', default_sort), request.args.get('order', 'desc') != 'asc'
+
+def _page_response(fetch, page, per_page, sort, descending):
+    try:
+        with metrics.timed('api.results_page'):
+            items, total = fetch()
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(items=items, total=total, page=max(page, 1), per_page=per_page, sort=sort, order='desc' if descending else 'asc')
+
+@app.route('/api/v1/results/strategic/<result_id>')
+@api_login_required
+def api_strategic_results(result_id):
+    """One page of a stored strategic forecast."""
+    result = result_store.get_forecast(result_id, current_user.id)
+    if result is None:
+        return jsonify(error='Forecast not found.'), 404
+    page, per_page, sort, descending = _page_args('predicted_waste')
+    return _page_response(lambda: result_store.forecast_page(result.id, page, per_page, sort, descending,
+                                                             products=request.args.getlist('product'),
+                                                             categories=request.args.getlist('category')),
+                          page, per_page, sort, descending)
+
+@app.route('/api/v1/results/tactical/<int:snapshot_id>')
+@api_login_required
+def api_tactical_results(snapshot_id):
+    """One page of a stored inventory analysis; ?action=flash_sale|donate selects the decision."""
+    snapshot = inventory_store.get_snapshot(snapshot_id, current_user.id)
+    if snapshot is None:
+        return jsonify(error='Inventory analysis not found.'), 404
+    action = request.args.get('action')
+    if action is not None and action not in inventory_store.RESULT_ACTIONS:
+        return jsonify(error=f"Unknown action '{action}'."), 400
+    page, per_page, sort, descending = _page_args('recovered_revenue')
+    return _page_response(lambda: inventory_store.snapshot_page(snapshot.id, action, page, per_page, sort, descending,
+                                                                categories=request.args.getlist('category')),
+                          page, per_page, sort, descending)
 
 if __name__ == '__main__':
     # You may need to create the database from a separate script or the terminal first
     with app.app_context():
         db.create_all()
     os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    import ai_core
     os.makedirs(ai_core.MODEL_DIR, exist_ok=True)
     app.run(debug=True, port=5004)
\ No newline at end of file
@@ -0,0 +1,184 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import flask_bcrypt
+from models import db, bcrypt, User
+import worker_processes
+
+class PasswordCheckBusy(Exception):
+    """Raised when too many password checks are already waiting for the hashing pool."""
+
+class UserCache:
+    """In-process cache of User rows by ID and username, so authenticated requests skip the database.
+
+    Entries expire after USER_CACHE_TTL seconds. Every process watches a stamp
+    file (USER_CACHE_STAMP_FILE): invalidate() touches it, so users created or
+    deleted by manage_users.py or another worker drop every cached entry on the
+    next lookup. Cached users are detached from any session and must be treated
+    as read-only.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 300
+        self.stamp_path = None
+        self._by_id = {}
+        self._by_username = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.setdefault('USER_CACHE_TTL', 300)
+        self.stamp_path = app.config.setdefault('USER_CACHE_STAMP_FILE', os.path.join(app.instance_path, 'users.stamp'))
+
+    def get(self, user_id):
+        return self._lookup(self._by_id, int(user_id), lambda: db.session.get(User, int(user_id)))
+
+    def get_by_username(self, username):
+        return self._lookup(self._by_username, username, lambda: User.query.filter_by(username=username).first())
+
+    def invalidate(self):
+        """Drops every cached user here and, through the stamp file, in every other process."""
+        with self._lock:
+            self._by_id.clear()
+            self._by_username.clear()
+        if self.stamp_path:
+            os.makedirs(os.path.dirname(self.stamp_path), exist_ok=True)
+            with open(self.stamp_path, 'a'):
+                os.utime(self.stamp_path)
+
+    def _lookup(self, entries, key, load):
+        if not self.ttl:
+            return load()
+        now = time.monotonic()
+        self._check_stamp()
+        entry = entries.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        user = load()
+        if user is not None:
+            db.session.expunge(user)
+            with self._lock:
+                self._by_id[user.id] = self._by_username[user.username] = (user, now + self.ttl)
+        return user
+
+    def _check_stamp(self):
+        try:
+            stamp = os.stat(self.stamp_path).st_mtime_ns if self.stamp_path else None
+        except FileNotFoundError:
+            stamp = None
+        if stamp != self._stamp:
+            with self._lock:
+                self._by_id.clear()
+                self._by_username.clear()
+                self._stamp = stamp
+
+class PasswordVerifier:
+    """Checks and rehashes passwords with bcrypt on a bounded thread pool.
+
+    bcrypt releases the GIL, so at most PASSWORD_HASH_WORKERS hashes run at once
+    and the remaining cores stay free for rendering pages. Beyond
+    PASSWORD_HASH_MAX_PENDING waiting checks, verify raises PasswordCheckBusy
+    instead of queueing more. Successful Basic-auth credentials are remembered
+    (as an HMAC with a per-process key) for USER_CACHE_TTL seconds, so API
+    clients do not pay for bcrypt on every request.
+    """
+
+    def __init__(self, app=None):
+        self.log_rounds = 12
+        self.max_pending = 64
+        self.credential_ttl = 300
+        self._executor = None
+        self._pending = 0
+        self._credentials = {}
+        self._key = os.urandom(32)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.log_rounds = app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+        self.max_pending = app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 64)
+        self.credential_ttl = app.config.setdefault('USER_CACHE_TTL', 300)
+        workers = app.config.setdefault('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash') if workers else None
+
+    def verify(self, user, password, remember=False):
+        """True if password matches the user's hash. Rehashes it if it was made with another work factor."""
+        digest = self._credential_digest(user, password) if remember else None
+        if digest is not None and self._credentials.get(user.id, (None, 0))[0] == digest \
+                and self._credentials[user.id][1] > time.monotonic():
+            return True
+        if not self._run(bcrypt.check_password_hash, user.password_hash, password):
+            return False
+        if hash_rounds(user.password_hash) != self.log_rounds:
+            self._rehash(user, password)
+        if digest is not None:
+            self._credentials[user.id] = (digest, time.monotonic() + self.credential_ttl)
+        return True
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password, self.log_rounds).decode('utf-8')
+
+    def forget(self):
+        self._credentials.clear()
+
+    def _rehash(self, user, password):
+        password_hash = self.hash(password)
+        db.session.execute(db.update(User).where(User.id == user.id, User.password_hash == user.password_hash)
+                           .values(password_hash=password_hash))
+        db.session.commit()
+        user_cache.invalidate()
+
+    def _credential_digest(self, user, password):
+        message = f"{user.id}:{user.password_hash}:{password}".encode()
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordCheckBusy()
+            self._pending += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+def hash_rounds(password_hash):
+    """The bcrypt work factor encoded in a hash ("$2b$12$..." -> 12)."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+def hash_passwords(passwords, log_rounds, workers=None, progress=None):
+    """Hashes many passwords (e.g. for a bulk import) across `workers` processes; returns the hashes in order.
+
+    progress, if given, is called with the number of passwords hashed so far.
+    """
+    passwords = list(passwords)
+    if not passwords:
+        return []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(passwords)))
+    chunksize = max(1, min(64, len(passwords) // (workers * 8)))
+    hashes = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=worker_processes.pool_context()) as pool:
+        for password_hash in pool.map(_hash_password, passwords, [log_rounds] * len(passwords), chunksize=chunksize):
+            hashes.append(password_hash)
+            if progress is not None:
+                progress(len(hashes))
+    return hashes
+
+def _hash_password(password, log_rounds):
+    return flask_bcrypt.generate_password_hash(password, log_rounds).decode('utf-8')
+
+user_cache = UserCache()
+password_verifier = PasswordVerifier()
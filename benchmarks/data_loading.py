@@ -0,0 +1,105 @@
+"""Load time and memory for historical data: pandas CSV parsing vs the Parquet data layer.
+
+Writes synthetic 1M and 10M row histories as CSV, then measures each way of
+loading them in a fresh process: time, peak RSS growth and the resulting
+DataFrame's size. "convert" is the one-off CSV -> Parquet conversion
+data_store does for each upload; later reads use the Parquet copy.
+
+Linux only (reads /proc/self/status). Run from the repository root (needs ~2 GB of free disk and memory for 10M rows):
+    python -m benchmarks.data_loading
+"""
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+
+ROW_COUNTS = [1_000_000, 10_000_000]
+N_PRODUCTS = 500
+
+
+def write_history(path, n_rows, seed=42):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    rng = np.random.default_rng(seed)
+    products = np.array([f"Product {i:04d}" for i in range(N_PRODUCTS)])
+    months = rng.integers(0, 120, n_rows)
+    stock = rng.integers(500, 2000, n_rows).astype(float)
+    table = pa.table({
+        "product_name": products[rng.integers(0, N_PRODUCTS, n_rows)],
+        "month": months % 12 + 1,
+        "year": 2015 + months // 12,
+        "promotions": rng.integers(0, 2, n_rows),
+        "local_event": rng.integers(0, 2, n_rows),
+        "seasonality_indicator": np.round(rng.uniform(1.0, 1.3, n_rows), 2),
+        "historical_stock": stock,
+        "historical_waste": (stock * rng.uniform(0.01, 0.06, n_rows)).astype(int),
+    })
+    pa_csv.write_csv(table, path)
+
+
+def load(method, path):
+    import pandas as pd
+    import data_store
+
+    if method == 'csv (pandas)':
+        return pd.read_csv(path)
+    if method == 'convert':
+        return data_store.to_columnar(path, 'historical')
+    if method == 'parquet':
+        return data_store.read_table(path, 'historical')
+    if method == 'parquet, 1 column':
+        return data_store.read_table(path, 'historical', columns=['product_name'])
+
+
+def peak_rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(method, path, results):
+    import pandas  # noqa: F401  import cost is not part of the load time
+    import pyarrow.parquet  # noqa: F401
+    import data_store  # noqa: F401
+
+    before_kb = peak_rss_kb()
+    start = time.perf_counter()
+    loaded = load(method, path)
+    seconds = time.perf_counter() - start
+    peak_kb = peak_rss_kb() - before_kb
+    frame_bytes = int(loaded.memory_usage(deep=True).sum()) if hasattr(loaded, 'memory_usage') else 0
+    results.put((seconds, peak_kb / 1024, frame_bytes / 1024 ** 2))
+
+
+def run_in_child(method, path):
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    proc = ctx.Process(target=measure, args=(method, path, results))
+    proc.start()
+    result = results.get()
+    proc.join()
+    return result
+
+
+def main():
+    print(f"{'rows':>11} {'method':>18} {'time (s)':>9} {'peak RSS (MB)':>14} {'frame (MB)':>11}")
+    for n_rows in ROW_COUNTS:
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'historical_data.csv')
+            write_history(path, n_rows)
+            for method in ('csv (pandas)', 'convert', 'parquet', 'parquet, 1 column'):
+                seconds, peak_mb, frame_mb = run_in_child(method, path)
+                frame = f"{frame_mb:>11.1f}" if frame_mb else f"{'-':>11}"
+                print(f"{n_rows:>11,} {method:>18} {seconds:>9.2f} {peak_mb:>14.1f} {frame}")
+            csv_mb = os.path.getsize(path) / 1024 ** 2
+            parquet_mb = os.path.getsize(path.replace('.csv', '.parquet')) / 1024 ** 2
+            print(f"{'':>11} {'file size (MB)':>18} csv {csv_mb:.1f}, parquet {parquet_mb:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""End-to-end benchmark: training, forecasting, tactical analysis and the web flows.
+
+For each data size it generates a fresh dataset with generate_data.py in a
+scratch directory, then records wall time and peak RSS growth of:
+train_strategic_models, train_tactical_model, run_strategic_prediction,
+run_tactical_analysis, and the strategic and tactical POST / flows through
+Flask's test client (upload, background training, results page). Training
+always starts with an empty model registry, so nothing is a cache hit.
+
+Results are written as JSON. With --baseline, the run fails (exit status 1) if
+any tracked metric is more than --threshold worse than in the baseline file.
+Linux only (peak RSS is read from /proc/self/status).
+
+Run from the repository root:
+    python -m benchmarks.end_to_end --sizes small medium --output bench.json
+    python -m benchmarks.end_to_end --sizes small medium --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import ai_core  # noqa: E402
+import data_store  # noqa: E402
+import generate_data  # noqa: E402
+
+SIZES = {
+    "small": {"stores": 1, "products": 5, "months": 60, "inventory_rows": 1_000},
+    "medium": {"stores": 10, "products": 100, "months": 60, "inventory_rows": 100_000},
+    "large": {"stores": 50, "products": 200, "months": 60, "inventory_rows": 1_000_000},
+}
+TRACKED_METRICS = ("seconds", "peak_rss_mb")
+# Differences below these are noise, whatever the ratio.
+MIN_REGRESSION = {"seconds": 0.05, "peak_rss_mb": 10.0}
+BENCHMARK_USER = 'benchmark'
+JOB_TIMEOUT_SECONDS = 3600
+
+
+def _status_kb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(fn):
+    """Runs fn() and returns (result, {"seconds", "peak_rss_mb"}), peak RSS relative to the start."""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')  # resets VmHWM to the current RSS
+    start_kb = _status_kb('VmRSS')
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    return result, {"seconds": round(seconds, 4), "peak_rss_mb": round(max(_status_kb('VmHWM') - start_kb, 0) / 1024, 1)}
+
+
+def generate(size):
+    os.makedirs(ai_core.DATA_DIR, exist_ok=True)
+    os.makedirs(ai_core.MODEL_DIR, exist_ok=True)
+    today = generate_data.np.datetime64(datetime.now().date())
+    files = {
+        "historical": generate_data.historical_chunks(size['stores'], size['products'], size['months'], seed=42),
+        "tactical": generate_data.tactical_chunks(10, seed=42),
+        "inventory": generate_data.inventory_chunks(size['inventory_rows'], size['stores'], size['products'], today, seed=42),
+    }
+    paths, rows = {}, {}
+    for kind, chunks in files.items():
+        paths[kind] = os.path.join(ai_core.DATA_DIR, f"{kind}.csv")
+        rows[kind] = generate_data.write_csv(paths[kind], chunks)
+    return paths, rows
+
+
+def clear_registry():
+    shutil.rmtree(ai_core.REGISTRY.root, ignore_errors=True)
+    os.makedirs(ai_core.REGISTRY.root)
+
+
+def web_client():
+    import app as web
+    from models import User, db
+
+    web.app.config['WARM_UP_MODELS'] = False
+    with web.app.app_context():
+        db.create_all()
+        user = User.query.filter_by(username=BENCHMARK_USER).first()
+        if user is None:
+            user = User(username=BENCHMARK_USER, password=os.urandom(16).hex())
+            db.session.add(user)
+            db.session.commit()
+        user_id = user.id
+    client = web.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return web, client, user_id
+
+
+def remove_web_user(web, user_id):
+    import result_store
+    from models import User, db
+
+    with web.app.app_context():
+        result_store.evict_forecasts(user_id, ttl=timedelta(days=365 * 100), keep=0)
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+
+
+def post_flow(client, form):
+    """POSTs to / and follows the job to its results page. Returns the results response."""
+    form = {name: (open(value, 'rb'), os.path.basename(value)) if name.endswith('_file') else value for name, value in form.items()}
+    response = client.post('/', data=form, content_type='multipart/form-data')
+    for value in form.values():
+        if isinstance(value, tuple):
+            value[0].close()
+    job_id = response.location.split('/')[2]
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while client.get(f'/jobs/{job_id}').get_json()['status'] not in ('done', 'failed'):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"training job {job_id} did not finish")
+        time.sleep(0.05)
+    response = client.get(f'/jobs/{job_id}/results')
+    if response.status_code != 200:
+        raise RuntimeError(f"results page returned {response.status_code}: {response.location}")
+    return response
+
+
+def run_size(name, size, client):
+    paths, rows = generate(size)
+    steps = {}
+
+    def check(result):
+        success, message = result
+        if not success:
+            raise RuntimeError(message)
+
+    clear_registry()
+    result, steps['train_strategic_models'] = measure(lambda: ai_core.train_strategic_models(paths['historical']))
+    check(result)
+    result, steps['train_tactical_model'] = measure(lambda: ai_core.train_tactical_model(paths['tactical']))
+    check(result)
+    models = ai_core.load_models()
+
+    products = data_store.read_table(paths['historical'], 'historical', columns=['product_name'])['product_name'].unique().tolist()
+    _, steps['run_strategic_prediction'] = measure(lambda: ai_core.run_strategic_prediction(products, 6, datetime.now().year + 1, models=models))
+    inventory = data_store.read_table(paths['inventory'], 'inventory')
+    _, steps['run_tactical_analysis'] = measure(lambda: ai_core.run_tactical_analysis(inventory, models=models))
+
+    clear_registry()
+    _, steps['post_strategic'] = measure(lambda: post_flow(client, {
+        'run_strategic': '1', 'month': '6', 'year': str(datetime.now().year + 1), 'strategic_file': paths['historical']}))
+    clear_registry()
+    _, steps['post_tactical'] = measure(lambda: post_flow(client, {
+        'run_tactical': '1', 'tactical_file': paths['tactical'], 'inventory_file': paths['inventory']}))
+    return {"params": size, "rows": rows, "steps": steps}
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of human-readable regressions versus the baseline results."""
+    regressions = []
+    for size_name, size in results['sizes'].items():
+        base_size = baseline['sizes'].get(size_name)
+        if base_size is None:
+            continue
+        for step, metrics in size['steps'].items():
+            base_metrics = base_size['steps'].get(step, {})
+            for metric in TRACKED_METRICS:
+                if metric not in base_metrics:
+                    continue
+                current, previous = metrics[metric], base_metrics[metric]
+                if current > previous * (1 + threshold) and current - previous > MIN_REGRESSION[metric]:
+                    regressions.append(f"{size_name}/{step} {metric}: {previous} -> {current}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium'])
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write this run's JSON results")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed relative slowdown / memory growth (0.25 = 25%%)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "sizes": {},
+    }
+    web, client, user_id = web_client()
+    original_dir = os.getcwd()
+    try:
+        print(f"{'size':>7} {'step':>25} {'time (s)':>9} {'peak RSS (MB)':>14}")
+        for size_name in args.sizes:
+            with tempfile.TemporaryDirectory() as workdir:
+                os.chdir(workdir)  # ai_core and app use paths relative to the working directory
+                try:
+                    results['sizes'][size_name] = run_size(size_name, SIZES[size_name], client)
+                finally:
+                    os.chdir(original_dir)
+            for step, metrics in results['sizes'][size_name]['steps'].items():
+                print(f"{size_name:>7} {step:>25} {metrics['seconds']:>9.3f} {metrics['peak_rss_mb']:>14.1f}")
+    finally:
+        remove_web_user(web, user_id)
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"✅ No metric regressed by more than {args.threshold:.0%} against '{args.baseline}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Single-row and batch latency of the flattened forests vs. sklearn's predict.
+
+Run from the repository root (trained models must exist in models/):
+    python -m benchmarks.flat_forest
+"""
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import ai_core
+from flat_forest import FlatForest
+
+SINGLE_ROW_CALLS = 500
+BATCH_ROWS = 10_000
+
+
+def sample_inputs(model, n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    names = list(model.feature_names_in_)
+    X = np.zeros((n_rows, len(names)))
+    for i, name in enumerate(names):
+        if name == 'month':
+            X[:, i] = rng.integers(1, 13, n_rows)
+        elif name == 'year':
+            X[:, i] = rng.integers(2018, 2030, n_rows)
+        elif name.startswith('product_name_') or name in ('promotions', 'local_event'):
+            X[:, i] = rng.integers(0, 2, n_rows)
+        elif name == 'days_until_expiry':
+            X[:, i] = rng.integers(0, 8, n_rows)
+        else:
+            X[:, i] = rng.uniform(0.5, 8.0, n_rows)
+    return X
+
+
+def latencies(fn, rows):
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        times.append(time.perf_counter() - start)
+    return np.percentile(times, 50) * 1e6, np.percentile(times, 99) * 1e6
+
+
+def main():
+    models = ai_core.current_models()
+    names = [name for name in ai_core.FOREST_FILES if models.has(name)]
+    if not names:
+        print("Error: no trained models found. Run the trainer scripts first.")
+        sys.exit(1)
+
+    print(f"{'model':>13} {'max |diff|':>11} {'sklearn p50/p99 (us)':>21} {'flat p50/p99 (us)':>18} {'sklearn batch (ms)':>19} {'flat batch (ms)':>16}")
+    for name in names:
+        model = joblib.load(ai_core.FOREST_FILES[name])
+        flat = FlatForest.from_sklearn(model)
+        X = sample_inputs(model, BATCH_ROWS)
+        frame = pd.DataFrame(X, columns=model.feature_names_in_)
+
+        max_diff = np.abs(flat.predict(X) - model.predict(frame)).max()
+        rows = [frame.iloc[[i]] for i in range(SINGLE_ROW_CALLS)]
+        sk_p50, sk_p99 = latencies(model.predict, rows)
+        flat_p50, flat_p99 = latencies(flat.predict, X[:SINGLE_ROW_CALLS])
+
+        start = time.perf_counter()
+        model.predict(frame)
+        sk_batch = (time.perf_counter() - start) * 1e3
+        start = time.perf_counter()
+        flat.predict(X)
+        flat_batch = (time.perf_counter() - start) * 1e3
+
+        print(f"{name:>13} {max_diff:>11.2e} {sk_p50:>10.0f}/{sk_p99:<10.0f} {flat_p50:>8.0f}/{flat_p99:<9.0f} {sk_batch:>19.1f} {flat_batch:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
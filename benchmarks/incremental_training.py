@@ -0,0 +1,75 @@
+"""Compares a full strategic refit with an incremental update after appending one month.
+
+Builds histories of increasing length by repeating data/historical_data.csv with
+shifted years, trains on all but the last month, then times refitting everything
+versus update_strategic_models on the last month alone. Uses a scratch directory
+for models and the training set, so the real ones are untouched.
+
+Run from the repository root (data/historical_data.csv must exist):
+    python -m benchmarks.incremental_training
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import ai_core
+from model_registry import ModelRegistry
+from model_store import ModelStore
+from training_set import TrainingSet
+
+SCALES = [1, 10, 50]  # copies of the historical file, each shifted to later years
+
+
+def build_history(scale):
+    base = pd.read_csv(os.path.join(ai_core.DATA_DIR, 'historical_data.csv'))
+    span = base['year'].max() - base['year'].min() + 1
+    copies = []
+    for i in range(scale):
+        copy = base.copy()
+        copy['year'] += i * span
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def use_scratch_dir(root):
+    ai_core.MODEL_STORE = ModelStore({name: os.path.join(root, os.path.basename(path)) for name, path in ai_core.MODEL_STORE.files.items()})
+    ai_core.REGISTRY = ModelRegistry(os.path.join(root, 'registry'))
+    ai_core.STRATEGIC_TRAINING_SET = TrainingSet(os.path.join(root, 'strategic_training'))
+    os.makedirs(ai_core.REGISTRY.root)
+
+
+def main():
+    if not os.path.exists(os.path.join(ai_core.DATA_DIR, 'historical_data.csv')):
+        print("Error: historical data not found. Please run generate_data.py first.")
+        sys.exit(1)
+
+    print(f"{'history rows':>12} {'new rows':>9} {'full refit (s)':>15} {'update (s)':>11} {'speedup':>8}")
+    for scale in SCALES:
+        history = build_history(scale)
+        period = history['year'] * 12 + history['month']
+        old_rows, new_rows = history[period < period.max()], history[period == period.max()]
+        with tempfile.TemporaryDirectory() as root:
+            use_scratch_dir(root)
+            old_path, new_path, all_path = (os.path.join(root, name) for name in ('old.csv', 'new.csv', 'all.csv'))
+            old_rows.to_csv(old_path, index=False)
+            new_rows.to_csv(new_path, index=False)
+            history.to_csv(all_path, index=False)
+
+            start = time.perf_counter()
+            ok, message = ai_core.train_strategic_models(all_path)
+            full = time.perf_counter() - start
+            ai_core.train_strategic_models(old_path)
+            start = time.perf_counter()
+            ok, message = ai_core.update_strategic_models(new_path)
+            update = time.perf_counter() - start
+            if not ok:
+                print(f"Error: {message}")
+                sys.exit(1)
+        print(f"{len(history):>12,} {len(new_rows):>9,} {full:>15.2f} {update:>11.2f} {full / update:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
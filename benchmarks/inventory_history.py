@@ -0,0 +1,108 @@
+"""Benchmarks saving tactical inventory uploads as snapshots, with and without decision reuse.
+
+Uploads the same inventory twice, the second time with --changed rows
+restocked, and reports per upload the scoring time, the time spent writing
+the snapshot (the only time the database is locked), rows stored and database
+growth. "plain" scores without saving anything, "results" saves only the
+flash-sale and donation rows (the default), "history" saves every row
+(INVENTORY_HISTORY) and "reuse" adds INVENTORY_REUSE_DECISIONS. With
+--duplicate-lots every lot appears twice in the file.
+
+Run from the repository root (models/sell_through_model.joblib must exist):
+    python -m benchmarks.inventory_history
+    python -m benchmarks.inventory_history --rows 300000 --changed 1000 --duplicate-lots
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+import ai_core
+import inventory_store
+from models import db
+
+STORES, PRODUCTS, EXPIRY_DAYS = 50, 400, 15
+
+
+def make_inventory(n_rows, duplicate_lots=False, seed=42):
+    rng = np.random.default_rng(seed)
+    lots = rng.permutation(STORES * PRODUCTS * EXPIRY_DAYS)[:n_rows // 2 if duplicate_lots else n_rows]
+    if duplicate_lots:
+        lots = np.repeat(lots, 2)
+    today = pd.Timestamp.now().normalize()
+    return pd.DataFrame({
+        'store_id': lots // (PRODUCTS * EXPIRY_DAYS) + 1,
+        'product_id': (lots // EXPIRY_DAYS) % PRODUCTS + 100,
+        'product_name': 'Product',
+        'category': 'Dairy',
+        'avg_daily_sales': rng.integers(5, 150, len(lots)),
+        'current_stock': rng.integers(0, 400, len(lots)),
+        'expiry_date': (today + pd.to_timedelta(lots % EXPIRY_DAYS, unit='D')).strftime('%Y-%m-%d'),
+        'price': 2.5,
+    })
+
+
+def upload(path, models, model_key, mode):
+    start = time.perf_counter()
+    if mode == 'plain':
+        _, _, totals = ai_core.run_tactical_analysis_streaming(path, models=models, keep_items=False)
+        return time.perf_counter() - start, 0.0, 0, 0
+    history = inventory_store.SnapshotRecorder(1, model_key, reuse=mode == 'reuse', all_rows=mode != 'results')
+    _, _, totals = ai_core.run_tactical_analysis_streaming(path, models=models, history=history, keep_items=False)
+    scoring_time = time.perf_counter() - start
+    start = time.perf_counter()
+    history.finish(totals['rows_reused'], keep=14)
+    write_time = time.perf_counter() - start
+    stored = history.snapshot.items.count()
+    db.session.execute(db.text('PRAGMA wal_checkpoint(TRUNCATE)'))
+    return scoring_time, write_time, stored, totals['rows_reused']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--changed', type=int, default=1_000)
+    parser.add_argument('--duplicate-lots', action='store_true')
+    args = parser.parse_args()
+
+    models = ai_core.current_models()
+    if not models.has('sell_through'):
+        print("Error: sell-through model not found. Run tactical_model_trainer.py first.")
+        sys.exit(1)
+    model_key = ai_core.tactical_model_key(models)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        first = make_inventory(args.rows, args.duplicate_lots)
+        second = first.copy()
+        restocked = np.random.default_rng(7).choice(len(second), args.changed, replace=False)
+        second.loc[restocked, 'current_stock'] += 1
+        paths = [os.path.join(scratch, 'day1.csv'), os.path.join(scratch, 'day2.csv')]
+        first.to_csv(paths[0], index=False)
+        second.to_csv(paths[1], index=False)
+
+        print(f"{len(first):,} rows, {args.changed:,} changed on day 2{', every lot twice' if args.duplicate_lots else ''}")
+        print(f"{'mode':>8} {'upload':>7} {'scoring (s)':>12} {'write (s)':>10} {'stored':>9} {'reused':>9} {'db growth (MB)':>15}")
+        for mode in ('plain', 'results', 'history', 'reuse'):
+            db_path = os.path.join(scratch, f'{mode}.db')
+            bench = Flask('benchmark')
+            bench.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+            db.init_app(bench)
+            with bench.app_context():
+                db.create_all()
+                size = os.path.getsize(db_path)
+                for day, path in enumerate(paths, 1):
+                    scoring_time, write_time, stored, reused = upload(path, models, model_key, mode)
+                    growth = os.path.getsize(db_path) - size
+                    size += growth
+                    print(f"{mode:>8} {day:>7} {scoring_time:>12.2f} {write_time:>10.2f} {stored:>9,} {reused:>9,} {growth / 1e6:>15.1f}")
+                db.session.remove()
+                db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
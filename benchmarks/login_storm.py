@@ -0,0 +1,149 @@
+"""Login storm: many managers signing in at once while others keep browsing.
+
+Creates --users benchmark users, then for each configuration fires --logins
+login POSTs from --threads threads at once through Flask's test client. While
+the storm runs, one already-signed-in client keeps requesting the login page's
+authenticated redirect (GET /login), which exercises load_user and page
+handling but no bcrypt. It reports login latency, the browsing client's
+latency during the storm, and authenticated requests per second afterwards.
+
+Configurations:
+  baseline  - no user cache, bcrypt on the request threads (the old behaviour)
+  cached    - user cache and a PASSWORD_HASH_WORKERS-thread hashing pool
+
+The benchmark users are removed afterwards.
+
+Run from the repository root:
+    python -m benchmarks.login_storm --logins 200 --threads 64 --rounds 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import auth  # noqa: E402
+import app as web  # noqa: E402
+from models import User, bcrypt, db  # noqa: E402
+
+USER_PREFIX = 'storm-user-'
+PASSWORD = 'storm-password'
+BROWSE_INTERVAL = 0.01  # pause between the browsing client's requests, so it does not hog a core
+CONFIGURATIONS = {
+    "baseline": {"USER_CACHE_TTL": 0, "PASSWORD_HASH_WORKERS": 0},
+    "cached": {"USER_CACHE_TTL": 300, "PASSWORD_HASH_WORKERS": max(1, (os.cpu_count() or 2) // 2)},
+}
+
+
+def configure(settings, rounds, max_pending):
+    web.app.config.update(settings, BCRYPT_LOG_ROUNDS=rounds, PASSWORD_HASH_MAX_PENDING=max_pending)
+    auth.user_cache.init_app(web.app)
+    auth.user_cache.invalidate()
+    auth.password_verifier.init_app(web.app)
+
+
+def create_users(n_users, rounds):
+    password_hash = bcrypt.generate_password_hash(PASSWORD, rounds).decode('utf-8')  # one hash, shared by all
+    with web.app.app_context():
+        remove_users()
+        db.session.execute(db.insert(User), [{"username": f"{USER_PREFIX}{i}", "password_hash": password_hash} for i in range(n_users)])
+        db.session.commit()
+
+
+def remove_users():
+    with web.app.app_context():
+        db.session.execute(db.delete(User).where(User.username.startswith(USER_PREFIX)))
+        db.session.commit()
+    auth.user_cache.invalidate()
+
+
+def login(i, n_users):
+    client = web.app.test_client()
+    start = time.perf_counter()
+    response = client.post('/login', data={'username': f"{USER_PREFIX}{i % n_users}", 'password': PASSWORD})
+    return time.perf_counter() - start, response.status_code
+
+
+def signed_in_client():
+    client = web.app.test_client()
+    client.post('/login', data={'username': f"{USER_PREFIX}0", 'password': PASSWORD})
+    return client
+
+
+def browse(client, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.get('/login')  # redirects signed-in users, after load_user
+        latencies.append(time.perf_counter() - start)
+        stop.wait(BROWSE_INTERVAL)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+
+def run(name, args):
+    configure(CONFIGURATIONS[name], args.rounds, args.max_pending)
+    browser = signed_in_client()
+    stop, browse_latencies = threading.Event(), []
+    browser_thread = threading.Thread(target=browse, args=(browser, stop, browse_latencies))
+    browser_thread.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(lambda i: login(i, args.users), range(args.logins)))
+    storm_seconds = time.perf_counter() - start
+    stop.set()
+    browser_thread.join()
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        browser.get('/login')
+    authenticated_rps = args.requests / (time.perf_counter() - start)
+
+    login_latencies = [seconds for seconds, status in results if status == 302]
+    return {
+        "storm_seconds": round(storm_seconds, 3),
+        "logins_ok": len(login_latencies),
+        "logins_busy": sum(status == 503 for _, status in results),
+        "login_p50": round(statistics.median(login_latencies), 4) if login_latencies else None,
+        "login_p95": round(percentile(login_latencies, 0.95), 4),
+        "browse_p50": round(statistics.median(browse_latencies), 4) if browse_latencies else None,
+        "browse_p95": round(percentile(browse_latencies, 0.95), 4),
+        "authenticated_rps": round(authenticated_rps, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=64, help="concurrent login clients")
+    parser.add_argument('--rounds', type=int, default=12, help="bcrypt work factor of the benchmark users")
+    parser.add_argument('--max-pending', type=int, default=1024, help="PASSWORD_HASH_MAX_PENDING during the storm")
+    parser.add_argument('--requests', type=int, default=2000, help="authenticated requests timed after the storm")
+    args = parser.parse_args()
+
+    web.app.config.update(WTF_CSRF_ENABLED=False, WARM_UP_MODELS=False)
+    with web.app.app_context():
+        db.create_all()
+    create_users(args.users, args.rounds)
+    try:
+        print(f"{args.logins} logins from {args.threads} threads, bcrypt work factor {args.rounds}, {os.cpu_count()} CPUs")
+        print(f"{'config':>9} {'storm (s)':>10} {'ok':>5} {'busy':>5} {'login p50':>10} {'login p95':>10} "
+              f"{'browse p50':>11} {'browse p95':>11} {'auth req/s':>11}")
+        for name in CONFIGURATIONS:
+            r = run(name, args)
+            print(f"{name:>9} {r['storm_seconds']:>10.2f} {r['logins_ok']:>5} {r['logins_busy']:>5} {r['login_p50'] or 0:>10.3f} "
+                  f"{r['login_p95']:>10.3f} {r['browse_p50'] or 0:>11.4f} {r['browse_p95']:>11.4f} {r['authenticated_rps']:>11.0f}")
+    finally:
+        remove_users()
+
+
+if __name__ == '__main__':
+    main()
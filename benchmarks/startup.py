@@ -0,0 +1,47 @@
+"""Measures import time and peak RSS of the app's entry modules, each in a fresh process.
+
+Run from the repository root:
+    python -m benchmarks.startup
+"""
+import json
+import subprocess
+import sys
+
+MODULES = ['ai_core', 'app', 'manage_users']
+HEAVY_MODULES = ['pandas', 'sklearn', 'joblib']
+RUNS = 3
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+models_loaded = 'ai_core' in sys.modules and sys.modules['ai_core'].MODEL_STORE.snapshot().version > 0
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+    "models_loaded": models_loaded,
+}}))
+"""
+
+
+def measure(module):
+    runs = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['seconds'])
+
+
+def main():
+    print(f"{'module':>13} {'import (s)':>11} {'max RSS (MB)':>13} {'models loaded':>14}  heavy modules imported")
+    for module in MODULES:
+        result = measure(module)
+        print(f"{module:>13} {result['seconds']:>11.2f} {result['max_rss_mb']:>13.0f} {str(result['models_loaded']):>14}  "
+              f"{', '.join(result['heavy_modules']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Compares strategic training wall time: sequential single-threaded fits (the
+original behavior), parallel separate forests, and one multi-output forest.
+
+Run from the repository root (data/historical_data.csv must exist):
+    python -m benchmarks.strategic_training
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+import ai_core
+
+SCALES = [1, 10, 50]  # copies of the historical file, with jittered targets
+
+
+def load_features(scale, seed=42):
+    df = pd.read_csv(os.path.join(ai_core.DATA_DIR, 'historical_data.csv'))
+    df = pd.concat([df] * scale, ignore_index=True)
+    rng = np.random.default_rng(seed)
+    df['historical_stock'] = df['historical_stock'] * rng.uniform(0.95, 1.05, len(df))
+    df['historical_waste'] = df['historical_waste'] * rng.uniform(0.95, 1.05, len(df))
+    df = pd.get_dummies(df, columns=['product_name'], drop_first=True)
+    features = [col for col in df.columns if col not in ['historical_stock', 'historical_waste']]
+    return df[features], df['historical_stock'], df['historical_waste']
+
+
+def fit_sequential(X, y_stock, y_waste):
+    for y in (y_stock, y_waste):
+        RandomForestRegressor(**ai_core.STRATEGIC_PARAMS).fit(X, y)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    if not os.path.exists(os.path.join(ai_core.DATA_DIR, 'historical_data.csv')):
+        print("Error: historical data not found. Please run generate_data.py first.")
+        sys.exit(1)
+
+    print(f"{'rows':>8} {'sequential (s)':>15} {'parallel (s)':>13} {'speedup':>8} {'multi-output (s)':>17} {'speedup':>8} {'predict speedup':>16}")
+    for scale in SCALES:
+        X, y_stock, y_waste = load_features(scale)
+        sequential, _ = timed(fit_sequential, X, y_stock, y_waste)
+        parallel, separate = timed(ai_core.fit_strategic_models, X, y_stock, y_waste)
+        multi, combined = timed(ai_core.fit_strategic_models, X, y_stock, y_waste, multi_output=True)
+
+        sample = X.head(500)
+        separate_predict, _ = timed(lambda: (separate['stock'].predict(sample), separate['waste'].predict(sample)))
+        multi_predict, _ = timed(combined['strategic'].predict, sample)
+
+        print(f"{len(X):>8,} {sequential:>15.2f} {parallel:>13.2f} {sequential / parallel:>7.1f}x "
+              f"{multi:>17.2f} {sequential / multi:>7.1f}x {separate_predict / multi_predict:>15.1f}x")
+
+
+if __name__ == '__main__':
+    main()
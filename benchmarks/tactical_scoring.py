@@ -0,0 +1,77 @@
+"""Benchmarks per-row vs. batched (forest and lookup grid) tactical discount scoring.
+
+Run from the repository root (models/sell_through_model.joblib must exist):
+    python -m benchmarks.tactical_scoring
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import ai_core
+
+SIZES = [10_000, 100_000, 1_000_000]
+PER_ROW_SAMPLE = 2_000  # per-row time is measured on a sample and extrapolated
+
+
+def make_inventory(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'days_until_expiry': rng.integers(-1, 12, n_rows),
+        'current_stock': rng.integers(0, 400, n_rows).astype(float),
+        'avg_daily_sales': rng.integers(0, 120, n_rows).astype(float),
+    })
+    # Blank stock and sales cells must score 0 on every path (they used to crash the grid lookup).
+    df.loc[::97, 'current_stock'] = np.nan
+    df.loc[::89, 'avg_daily_sales'] = np.nan
+    return df
+
+
+def score_per_row(df):
+    return df.apply(lambda row: ai_core.get_tactical_discount(row['days_until_expiry'], row['current_stock'], row['avg_daily_sales']), axis=1).to_numpy()
+
+
+def score_batched(df):
+    return ai_core.get_tactical_discounts(df['days_until_expiry'], df['current_stock'], df['avg_daily_sales'])
+
+
+def main():
+    models = ai_core.current_models()
+    if not models.has('sell_through'):
+        print("Error: sell-through model not found. Run tactical_model_trainer.py first.")
+        sys.exit(1)
+    has_grid = models['sell_through_grid'] is not None
+
+    print(f"{'rows':>10} {'per-row (s)':>12} {'batched (s)':>12} {'speedup':>9} {'grid (s)':>10} {'speedup':>9} {'grid agree':>11}")
+    for n_rows in SIZES:
+        df = make_inventory(n_rows)
+        sample = df.head(PER_ROW_SAMPLE)
+
+        start = time.perf_counter()
+        expected = score_per_row(sample)
+        per_row_time = (time.perf_counter() - start) * n_rows / len(sample)
+
+        ai_core.USE_SELL_THROUGH_GRID = False
+        start = time.perf_counter()
+        exact = score_batched(df)
+        batched_time = time.perf_counter() - start
+
+        if not np.array_equal(expected, exact[:len(sample)]):
+            print(f"Error: batched discounts differ from per-row discounts at {n_rows} rows.")
+            sys.exit(1)
+
+        ai_core.USE_SELL_THROUGH_GRID = True
+        grid_time, agreement = float('nan'), float('nan')
+        if has_grid:
+            start = time.perf_counter()
+            approx = score_batched(df)
+            grid_time = time.perf_counter() - start
+            agreement = np.mean(approx == exact)
+
+        print(f"{n_rows:>10,} {per_row_time:>12.2f} {batched_time:>12.3f} {per_row_time / batched_time:>8.0f}x "
+              f"{grid_time:>10.3f} {per_row_time / grid_time:>8.0f}x {agreement:>11.4%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+from benchmarks.end_to_end import compare
+
+
+def results(**steps):
+    return {'sizes': {'small': {'steps': {step: {'seconds': seconds, 'peak_rss_mb': rss} for step, (seconds, rss) in steps.items()}}}}
+
+
+def test_compare_reports_only_regressions_beyond_threshold_and_noise():
+    baseline = results(train=(2.0, 100.0), predict=(0.01, 5.0), score=(1.0, 50.0))
+    current = results(train=(2.6, 100.0), predict=(0.04, 12.0), score=(1.2, 80.0), new_step=(9.0, 900.0))
+    assert compare(current, baseline, threshold=0.25) == [
+        'small/train seconds: 2.0 -> 2.6',
+        'small/score peak_rss_mb: 50.0 -> 80.0',
+    ]
+    assert compare(current, {'sizes': {}}, threshold=0.25) == []
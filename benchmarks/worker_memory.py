@@ -0,0 +1,75 @@
+"""Per-worker memory with 1, 4 and 16 processes, with and without memory-mapped models.
+
+Each worker loads the models the way ai_core.load_models does, scores a batch so
+every model page is touched, and reports RSS, PSS (RSS with shared pages split
+between the processes mapping them) and private memory from
+/proc/self/smaps_rollup (Linux only). The "model" columns are the increase over
+the worker's footprint before loading.
+
+Run from the repository root (trained models must exist in models/):
+    python -m benchmarks.worker_memory
+"""
+import multiprocessing as mp
+import sys
+
+WORKER_COUNTS = [1, 4, 16]
+
+
+def memory_kb():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        "rss": fields.get('Rss', 0),
+        "pss": fields.get('Pss', 0),
+        "private": fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def worker(mmap_models, barrier, results):
+    import numpy as np
+    import ai_core
+
+    ai_core.MMAP_MODELS = mmap_models
+    before = memory_kb()
+    models = ai_core.current_models()
+    n_rows = 500
+    rng = np.random.default_rng(0)
+    ai_core.get_tactical_discounts(rng.integers(0, 8, n_rows), rng.integers(1, 300, n_rows), rng.integers(1, 100, n_rows), models=models)
+    ai_core.run_strategic_forecast_batch([f"Product {i}" for i in range(n_rows // 12)], [(m, 2030) for m in range(1, 13)], models=models)
+    barrier.wait()  # measure while every worker is alive and mapping the same files
+    after = memory_kb()
+    results.put({key: (after[key], after[key] - before[key]) for key in after})
+    barrier.wait()
+
+
+def measure(n_workers, mmap_models):
+    ctx = mp.get_context('spawn')
+    barrier, results = ctx.Barrier(n_workers), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mmap_models, barrier, results)) for _ in range(n_workers)]
+    for proc in procs:
+        proc.start()
+    samples = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    return {key: (sum(s[key][0] for s in samples) / n_workers / 1024, sum(s[key][1] for s in samples) / n_workers / 1024) for key in samples[0]}
+
+
+def main():
+    if not sys.platform.startswith('linux'):
+        print("Error: this benchmark reads /proc/self/smaps_rollup and needs Linux.")
+        sys.exit(1)
+
+    print(f"{'workers':>7} {'mmap':>5} {'RSS (MB)':>9} {'PSS (MB)':>9} {'private (MB)':>13} {'model PSS (MB)':>15} {'model private (MB)':>19}")
+    for n_workers in WORKER_COUNTS:
+        for mmap_models in (False, True):
+            m = measure(n_workers, mmap_models)
+            print(f"{n_workers:>7} {str(mmap_models):>5} {m['rss'][0]:>9.1f} {m['pss'][0]:>9.1f} {m['private'][0]:>13.1f} "
+                  f"{m['pss'][1]:>15.1f} {m['private'][1]:>19.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Shared pytest fixtures.
+
+Tests that need trained models or the web app run from a scratch workspace
+holding the demo data (generate_data.py) and models trained on it, so the
+repository's own data/, models/ and instance/ are never touched.
+"""
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+_SCRATCH = tempfile.mkdtemp(prefix='freshfuture-tests-')
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+
+# Read by app.py through app.config.from_prefixed_env(), so they must be set before it is imported.
+os.environ.setdefault('FLASK_SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(_SCRATCH, 'site.db')}")
+os.environ.setdefault('FLASK_USER_CACHE_STAMP_FILE', os.path.join(_SCRATCH, 'users.stamp'))
+os.environ.setdefault('FLASK_BCRYPT_LOG_ROUNDS', '4')
+os.environ.setdefault('FLASK_WARM_UP_MODELS', 'false')
+os.environ.setdefault('FLASK_WTF_CSRF_ENABLED', 'false')
+os.environ.setdefault('FLASK_TRAINING_WORKERS', '1')
+
+PASSWORD = 'secret-password'
+
+
+@pytest.fixture(scope='session')
+def workspace():
+    """Runs the tests from a directory with the demo data and models trained on it."""
+    path = os.path.join(_SCRATCH, 'workspace')
+    os.makedirs(path, exist_ok=True)
+    previous = os.getcwd()
+    os.chdir(path)
+    subprocess.run([sys.executable, os.path.join(REPO_ROOT, 'generate_data.py'), '--months', '36'],
+                   check=True, capture_output=True, env={**os.environ, 'PYTHONPATH': REPO_ROOT})
+    import ai_core
+
+    os.makedirs(ai_core.MODEL_DIR, exist_ok=True)
+    for trained, message in (ai_core.train_strategic_models(os.path.join('data', 'historical_data.csv')),
+                             ai_core.train_tactical_model(os.path.join('data', 'tactical_training_data.csv'))):
+        assert trained, message
+    ai_core.load_models()
+    yield path
+    os.chdir(previous)
+
+
+@pytest.fixture
+def app(workspace):
+    """The Flask app with empty tables, recreated for every test."""
+    from app import app
+    from models import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def user(app):
+    """The ID of a user with password PASSWORD."""
+    import auth
+    from models import db, User
+
+    with app.app_context():
+        user = User(username='manager', password=PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        auth.user_cache.invalidate()
+        return user.id
+
+
+@pytest.fixture
+def client(app, user):
+    """A test client logged in as the user fixture."""
+    client = app.test_client()
+    response = client.post('/login', data={'username': 'manager', 'password': PASSWORD})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def wait_for_job(client):
+    """Polls the job behind a /jobs/<id>/results URL until it finishes and returns its status dict."""
+    def wait(results_url, timeout=60):
+        job_id = results_url.rstrip('/').split('/')[-2]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = client.get(f'/jobs/{job_id}').get_json()
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.05)
+        raise TimeoutError(f"Job {job_id} did not finish in {timeout}s")
+    return wait
@@ -0,0 +1,150 @@
+import csv
+import os
+import uuid
+
+# Column types per dataset kind. 'dictionary' columns are dictionary-encoded text and
+# load as pandas categoricals. Columns not listed keep the types Arrow infers.
+SCHEMAS = {
+    'historical': {
+        'store_id': 'int32',
+        'product_name': 'dictionary',
+        'category': 'dictionary',
+        'month': 'int8',
+        'year': 'int16',
+        'promotions': 'int8',
+        'local_event': 'int8',
+        'seasonality_indicator': 'float32',  # sklearn trains on float32 anyway
+        'historical_stock': 'float64',
+        'historical_waste': 'float64',
+    },
+    'tactical': {
+        'store_id': 'int32',
+        'category': 'dictionary',
+        'days_until_expiry': 'int16',
+        'stock_to_sales_ratio': 'float32',
+        'sell_through_rate': 'float64',
+    },
+    'inventory': {
+        'store_id': 'int32',
+        'product_id': 'int32',
+        'product_name': 'dictionary',
+        'category': 'dictionary',
+        'avg_daily_sales': 'float32',
+        # Read as leniently as pandas.read_csv did: stock such as "12.0" is accepted, and
+        # dates in any format pd.to_datetime understands are converted chunk by chunk.
+        'current_stock': 'float64',
+        'expiry_date': 'string',
+        'price': 'float32',
+    },
+}
+OPTIONAL_COLUMNS = {
+    'historical': {'store_id', 'category'},
+    'tactical': {'store_id', 'category'},
+    'inventory': {'store_id', 'product_id', 'category'},
+}
+
+# pyarrow reads ahead a few dozen blocks, so peak memory scales with the block size.
+CSV_BLOCK_BYTES = 1024 * 1024
+PARQUET_ROW_GROUP_ROWS = 256 * 1024
+
+def columnar_path(path):
+    """Where the Parquet copy of a CSV file lives (next to it, same name)."""
+    return os.path.splitext(path)[0] + '.parquet'
+
+def check_columns(path, kind):
+    """Raises ValueError if a CSV or Parquet file lacks a required column. Reads only the header."""
+    missing = sorted(set(SCHEMAS[kind]) - OPTIONAL_COLUMNS[kind] - set(_column_names(path)))
+    if missing:
+        raise ValueError(f"File is missing required columns: {', '.join(missing)}")
+
+def to_columnar(path, kind):
+    """Converts a CSV file to typed Parquet once and returns the Parquet path.
+
+    The conversion streams the CSV, so memory stays bounded by one row group.
+    Parquet input is returned unchanged, and an up-to-date copy is reused.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    if path.endswith('.parquet'):
+        return path
+    target = columnar_path(path)
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+        return target
+
+    check_columns(path, kind)
+    tmp_target = f"{target}.{uuid.uuid4().hex}.tmp"
+    try:
+        reader = pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+                                 convert_options=pa_csv.ConvertOptions(column_types=_arrow_types(kind)))
+        with pq.ParquetWriter(tmp_target, reader.schema) as writer:
+            batches, n_rows = [], 0
+            for batch in reader:
+                batches.append(batch)
+                n_rows += batch.num_rows
+                if n_rows >= PARQUET_ROW_GROUP_ROWS:
+                    writer.write_table(pa.Table.from_batches(batches, schema=reader.schema))
+                    batches, n_rows = [], 0
+            if batches:
+                writer.write_table(pa.Table.from_batches(batches, schema=reader.schema))
+    except pa.ArrowInvalid as e:
+        if os.path.exists(tmp_target):
+            os.remove(tmp_target)
+        # e.g. "In CSV column #4: CSV conversion error to double: invalid value 'ten'"
+        raise ValueError(f"The file has a value that cannot be read: {e}") from e
+    os.replace(tmp_target, target)
+    return target
+
+def read_table(path, kind, columns=None, filters=None):
+    """Loads a CSV or Parquet file as a DataFrame, reading only `columns` (optional ones may be absent).
+
+    filters selects rows as in pyarrow.parquet.read_table, e.g. [('store_id', '=', 3)].
+    """
+    import pyarrow.parquet as pq
+
+    parquet_path = to_columnar(path, kind)
+    table = pq.read_table(parquet_path, columns=_existing_columns(parquet_path, columns), filters=filters)
+    return _to_pandas(table)
+
+def iter_batches(path, kind, batch_rows, columns=None):
+    """Yields DataFrames of at most batch_rows rows from a CSV or Parquet file."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(to_columnar(path, kind))
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=_existing_columns(parquet_file, columns)):
+        yield _to_pandas(batch)
+
+def save(df, path, kind):
+    """Writes df as CSV at path, plus its Parquet copy so later reads skip the CSV parse."""
+    df.to_csv(path, index=False)
+    return to_columnar(path, kind)
+
+def _arrow_types(kind):
+    import pyarrow as pa
+
+    return {name: pa.dictionary(pa.int32(), pa.string()) if type_ == 'dictionary' else pa.type_for_alias(type_)
+            for name, type_ in SCHEMAS[kind].items()}
+
+def _column_names(path):
+    import pyarrow.parquet as pq
+
+    if path.endswith('.parquet'):
+        return pq.read_schema(path).names
+    with open(path, newline='') as f:
+        return next(csv.reader(f), [])
+
+def _existing_columns(source, columns):
+    import pyarrow.parquet as pq
+
+    if columns is None:
+        return None
+    schema = source.schema_arrow if isinstance(source, pq.ParquetFile) else pq.read_schema(source)
+    return [col for col in columns if col in schema.names]
+
+def _to_pandas(table):
+    df = table.to_pandas()
+    # Sorted categories make get_dummies and groupby orderings match a plain CSV read.
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import zlib
+
+# Flush to the client roughly every this many bytes / rows.
+STREAM_CHUNK_BYTES = 64 * 1024
+PARQUET_ROW_GROUP_ROWS = 50_000
+
+# format -> (mimetype, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'csv.gz': ('application/gzip', 'csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+def stream_csv(header, rows):
+    """Yields CSV text in ~STREAM_CHUNK_BYTES pieces as rows are produced."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_csv_gzip(header, rows):
+    """Yields a gzip-compressed CSV stream."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for text in stream_csv(header, rows):
+        compressed = compressor.compress(text.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def stream_ndjson(records):
+    """Yields newline-delimited JSON, one record per line, in ~STREAM_CHUNK_BYTES pieces."""
+    buffer = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    yield ''.join(buffer)
+
+def stream_json_array(records):
+    """Yields a JSON array of records without building it in memory."""
+    first = True
+    for piece in stream_ndjson(records):
+        if not piece:
+            continue
+        yield ('[' if first else ',') + piece.rstrip('\n').replace('\n', ',')
+        first = False
+    yield '[]' if first else ']'
+
+def stream_parquet(header, rows, types):
+    """Yields a Parquet file, one row group at a time. types are pyarrow types per column."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, type_) for name, type_ in zip(header, types)])
+    sink = _DrainableSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(_rows_to_table(batch, schema))
+                batch = []
+                yield sink.drain()
+        if batch:
+            writer.write_table(_rows_to_table(batch, schema))
+    yield sink.drain()
+
+def _rows_to_table(rows, schema):
+    import pyarrow as pa
+    columns = list(zip(*rows))
+    return pa.Table.from_arrays([pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema)
+
+class _DrainableSink:
+    """Write-only file object whose buffered bytes can be handed off mid-stream."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
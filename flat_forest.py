@@ -0,0 +1,96 @@
+import numpy as np
+
+PREDICT_BATCH_ROWS = 8192
+
+class FlatForest:
+    """A fitted random forest flattened into NumPy node arrays.
+
+    All trees share one set of arrays (feature, threshold, left child, leaf value)
+    and are walked level by level for every row at once, so predicting skips
+    sklearn's input validation, feature-name checks and thread dispatch.
+    Nodes are laid out breadth-first with siblings adjacent, and leaves point
+    back at themselves, so every walk runs max_depth gather steps without
+    branching.
+    """
+
+    def __init__(self, feature, threshold, left, value, roots, max_depth, n_features, feature_names, n_outputs):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.feature_names_in_ = feature_names
+        self.n_outputs = n_outputs
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, lefts, values, roots = [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            order, left = _breadth_first_layout(tree.children_left, tree.children_right)
+            is_leaf = tree.children_left[order] == -1
+            features.append(np.where(is_leaf, 0, tree.feature[order]))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            lefts.append(left + offset)
+            values.append(tree.value[order, :, 0])
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        feature_names = getattr(model, 'feature_names_in_', None)
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            feature_names=None if feature_names is None else np.asarray(feature_names, dtype=object),
+            n_outputs=model.n_outputs_,
+        )
+
+    def predict(self, X):
+        """Same output shape as RandomForestRegressor.predict for an (n_rows, n_features) array."""
+        # sklearn compares float32 inputs against float64 thresholds; do the same.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        out = np.empty((len(X), self.n_outputs))
+        for start in range(0, len(X), PREDICT_BATCH_ROWS):
+            out[start:start + PREDICT_BATCH_ROWS] = self._predict_batch(X[start:start + PREDICT_BATCH_ROWS])
+        return out[:, 0] if self.n_outputs == 1 else out
+
+    def _predict_batch(self, X):
+        n_rows, n_trees = len(X), len(self.roots)
+        flat_X = np.ascontiguousarray(X).ravel()
+        row_offsets = np.repeat(np.arange(n_rows) * self.n_features, n_trees)
+        nodes = np.tile(self.roots, n_rows)
+        for _ in range(self.max_depth):
+            # Children are stored side by side, so the right child is left + 1.
+            nodes = self.left[nodes] + (flat_X[row_offsets + self.feature[nodes]] > self.threshold[nodes])
+        # Accumulate tree by tree, in sklearn's order, so results match it bit for bit.
+        leaf_values = self.value[nodes].reshape(n_rows, n_trees, self.n_outputs)
+        total = np.zeros((n_rows, self.n_outputs))
+        for t in range(n_trees):
+            total += leaf_values[:, t]
+        return total / n_trees
+
+def _breadth_first_layout(children_left, children_right):
+    """Renumbers a tree breadth-first so each node's two children are adjacent.
+
+    Returns (order, left): order[i] is the original id of new node i and left[i]
+    the new id of its left child (leaves point at themselves).
+    """
+    order = [0]
+    left = np.empty(len(children_left), dtype=np.intp)
+    for i in range(len(children_left)):
+        node = order[i]
+        if children_left[node] == -1:
+            left[i] = i
+        else:
+            left[i] = len(order)
+            order.extend((children_left[node], children_right[node]))
+    return np.asarray(order), left
@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Length, EqualTo, ValidationError
-from models import User # <-- MODIFIED: Import from models.py, NOT app.py
+import auth
 
 class LoginForm(FlaskForm):
     username = StringField('Username', 
@@ -19,6 +19,6 @@ class RegistrationForm(FlaskForm):
 
     def validate_username(self, username):
         """Checks if the username is already taken."""
-        user = User.query.filter_by(username=username.data).first()
+        user = auth.user_cache.get_by_username(username.data)
         if user:
             raise ValidationError('That username is taken. Please choose a different one.')
\ No newline at end of file
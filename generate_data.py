@@ -1,115 +1,193 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+import argparse
 import os # Import the 'os' module to handle file paths and directories
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
-print("Starting data generation...")
+import data_store # Writes each CSV plus a typed Parquet copy for fast loading
 
 # --- Configuration ---
 PRODUCTS = ["Chicken Breast", "Organic Bananas", "Gallon Milk", "Bagged Salad", "Artisan Bread"]
-START_DATE = datetime(2018, 1, 1)
+PRODUCT_CATEGORIES = {"Chicken Breast": "Meat", "Organic Bananas": "Produce", "Gallon Milk": "Dairy", "Bagged Salad": "Produce", "Artisan Bread": "Bakery"}
+CATEGORIES = ["Produce", "Dairy", "Meat", "Bakery", "Frozen", "Pantry"]
+START_DATE = np.datetime64('2018-01-01')
 MONTHS_OF_DATA = 5 * 12  # 5 years
 DATA_DIR = 'data' # Define the directory name
+CHUNK_ROWS = 1_000_000  # rows generated and written at a time
+
+def product_catalog(n_products):
+    """The five demo products first, then numbered ones spread over CATEGORIES."""
+    names = PRODUCTS[:n_products] + [f"Product {i:05d}" for i in range(len(PRODUCTS), n_products)]
+    categories = [PRODUCT_CATEGORIES.get(name, CATEGORIES[i % len(CATEGORIES)]) for i, name in enumerate(names)]
+    return np.array(names), np.array(categories)
+
+def _chunk_rng(seed, kind, chunk_index):
+    # One stream per chunk, so any chunk can be generated without the ones before it.
+    return np.random.default_rng([seed, kind, chunk_index])
+
+def write_csv(path, chunks):
+    """Streams pyarrow tables to one CSV file, writing the header once."""
+    writer = None
+    n_rows = 0
+    try:
+        for table in chunks:
+            if writer is None:
+                writer = pa_csv.CSVWriter(path, table.schema, write_options=pa_csv.WriteOptions(quoting_style='none'))
+            writer.write_table(table)
+            n_rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+# --- 1. Strategic Historical Data ---
+def historical_chunks(n_stores, n_products, n_months, seed, chunk_rows=CHUNK_ROWS):
+    """Yields the monthly history, ordered by month, then store, then product."""
+    names, categories = product_catalog(n_products)
+    category_names, category_codes = np.unique(categories, return_inverse=True)
+    # Month i is START_DATE + 30*i days, as in the original day-stepping loop.
+    calendar = (START_DATE + np.arange(n_months) * 30).astype('datetime64[M]').astype(int)
+    month_of = calendar % 12 + 1
+    year_of = calendar // 12 + 1970
+
+    # Seasonality (e.g., higher demand in summer/holidays), one draw per store and month
+    seasonality = np.ones((n_months, n_stores))
+    peak = np.isin(month_of, [6, 7, 11, 12])
+    seasonality[peak] = np.random.default_rng([seed, 0]).uniform(1.1, 1.3, (peak.sum(), n_stores))
+
+    total_rows = n_months * n_stores * n_products
+    for chunk_index, start in enumerate(range(0, total_rows, chunk_rows)):
+        rng = _chunk_rng(seed, 1, chunk_index)
+        row = np.arange(start, min(start + chunk_rows, total_rows))
+        month_store, product = np.divmod(row, n_products)
+        month_idx, store = np.divmod(month_store, n_stores)
+        n = len(row)
+
+        base_stock = rng.integers(500, 2000, n)
+        base_sales = rng.integers(400, base_stock)
+        promotions = (rng.random(n) < 0.2).astype(np.int8)
+        season = seasonality[month_idx, store]
+        stocked_amount = np.floor(base_stock * season)
 
-# --- Create Data Directory if it Doesn't Exist ---
-# This is the key change: it ensures the 'data' folder is available.
-os.makedirs(DATA_DIR, exist_ok=True)
-print(f"Ensured data directory exists at: '{DATA_DIR}/'")
-
-# --- 1. Generate Strategic Historical Data (5 years) ---
-data = []
-for i in range(MONTHS_OF_DATA):
-    current_date = START_DATE + timedelta(days=i*30)
-    month = current_date.month
-    year = current_date.year
-    
-    # Seasonality (e.g., higher demand in summer/holidays)
-    seasonality = 1.0
-    if month in [6, 7, 11, 12]:
-        seasonality = np.random.uniform(1.1, 1.3)
-        
-    for product in PRODUCTS:
-        base_stock = np.random.randint(500, 2000)
-        base_sales = np.random.randint(400, base_stock)
-
-        # Simulate effects
-        promotions = np.random.choice([0, 1], p=[0.8, 0.2])
-        stocked_amount = int(base_stock * seasonality)
-        
-        # Add a local event simulator
-        local_event = 0
-        if month in [5, 8, 10]: # Assume months with potential holidays/events
-             if np.random.rand() > 0.85: # 15% chance of a major event
-                local_event = 1
-                stocked_amount *= 1.2 # Event boosts demand
+        # Local events: 15% chance in months with potential holidays/events, boosting demand
+        month = month_of[month_idx]
+        local_event = (np.isin(month, [5, 8, 10]) & (rng.random(n) > 0.85)).astype(np.int8)
+        stocked_amount = np.where(local_event == 1, stocked_amount * 1.2, stocked_amount)
 
         # Waste is a function of overstocking and lack of promotions
-        # MODIFIED: Lowered the base waste percentage for more realistic numbers
-        waste_percentage = np.random.uniform(0.01, 0.05) 
-        # MODIFIED: Made the overstock condition stricter and penalty smaller
-        if (stocked_amount > base_sales * 1.3) and promotions == 0:
-            waste_percentage *= 1.2 
-        wasted_amount = int(stocked_amount * waste_percentage)
-        
-        data.append({
-            "product_name": product,
+        waste_percentage = rng.uniform(0.01, 0.05, n)
+        waste_percentage = np.where((stocked_amount > base_sales * 1.3) & (promotions == 0), waste_percentage * 1.2, waste_percentage)
+        wasted_amount = (stocked_amount * waste_percentage).astype(np.int64)
+
+        columns = {}
+        if n_stores > 1:
+            columns["store_id"] = store + 1
+        columns.update({
+            "product_name": pa.DictionaryArray.from_arrays(product.astype(np.int32), names),
+            "category": pa.DictionaryArray.from_arrays(category_codes[product].astype(np.int32), category_names),
             "month": month,
-            "year": year,
+            "year": year_of[month_idx],
             "promotions": promotions,
             "local_event": local_event,
-            "seasonality_indicator": round(seasonality, 2),
+            "seasonality_indicator": np.round(season, 2),
             "historical_stock": stocked_amount,
-            "historical_waste": wasted_amount
+            "historical_waste": wasted_amount,
         })
+        yield pa.table(columns)
 
-historical_df = pd.DataFrame(data)
-# Use os.path.join to create the correct file path
-historical_file_path = os.path.join(DATA_DIR, 'historical_data.csv')
-historical_df.to_csv(historical_file_path, index=False)
-print(f"✅ Generated '{historical_file_path}' with {len(historical_df)} rows.")
-
-# --- 2. Generate Tactical Training Data (for sell-through model) ---
-tactical_data = []
-for days in [7, 6, 5, 4, 3, 2, 1]:
-    for ratio in np.linspace(0.5, 8.0, 10):
+# --- 2. Tactical Training Data (for sell-through model) ---
+def tactical_chunks(ratio_steps, seed, by_category=False):
+    """Yields the sell-through grid; with by_category, one grid per category with its own noise and a category column."""
+    days, ratio = np.meshgrid([7, 6, 5, 4, 3, 2, 1], np.linspace(0.5, 8.0, ratio_steps), indexing='ij')
+    days, ratio = days.ravel(), ratio.ravel()
+    for chunk_index, category in enumerate(CATEGORIES if by_category else [None]):
         # Logic: sell-through drops sharply as expiry nears and overstock increases
         sell_through = 0.95 * (1 / (ratio**0.5)) * (days / 7)
-        sell_through = max(0, min(sell_through - np.random.uniform(0, 0.1), 1.0))
-        tactical_data.append({
-            "days_until_expiry": days,
-            "stock_to_sales_ratio": round(ratio, 2),
-            "sell_through_rate": round(sell_through, 2)
+        sell_through = np.clip(sell_through - _chunk_rng(seed, 2, chunk_index).uniform(0, 0.1, len(days)), 0, 1.0)
+        columns = {"category": [category] * len(days)} if by_category else {}
+        columns.update({"days_until_expiry": days, "stock_to_sales_ratio": np.round(ratio, 2), "sell_through_rate": np.round(sell_through, 2)})
+        yield pa.table(columns)
+
+# --- 3. Current Inventory Snapshot ---
+def demo_inventory_chunks(today):
+    """The six hand-picked items that show every action: donation and a 75/50/25% flash-sale split."""
+    def day(offset):
+        return str(today + np.timedelta64(offset, 'D'))
+    yield pa.Table.from_pylist([
+        # --- Items that will be marked for DONATION (Expires in <= 2 days) ---
+        {'product_id': 105, 'product_name': 'Artisan Bread', 'category': 'Bakery', 'avg_daily_sales': 40, 'current_stock': 30, 'expiry_date': day(1), 'price': 5.50},
+        {'product_id': 104, 'product_name': 'Bagged Salad', 'category': 'Produce', 'avg_daily_sales': 60, 'current_stock': 80, 'expiry_date': day(2), 'price': 3.00},
+
+        # --- Items that will be marked for FLASH SALE to create a 75/50/25 split ---
+        # High stock ratio, near expiry -> 75% discount
+        {'product_id': 101, 'product_name': 'Chicken Breast', 'category': 'Meat', 'avg_daily_sales': 25, 'current_stock': 180, 'expiry_date': day(3), 'price': 12.50},
+        # Medium stock ratio, mid expiry -> 50% discount
+        {'product_id': 102, 'product_name': 'Organic Bananas', 'category': 'Produce', 'avg_daily_sales': 50, 'current_stock': 150, 'expiry_date': day(5), 'price': 1.50},
+        # Lower stock ratio, far expiry -> 25% discount
+        {'product_id': 106, 'product_name': 'Greek Yogurt', 'category': 'Dairy', 'avg_daily_sales': 70, 'current_stock': 100, 'expiry_date': day(6), 'price': 2.50},
+
+        # --- Item that is safe (Expires far out) ---
+        {'product_id': 103, 'product_name': 'Gallon Milk', 'category': 'Dairy', 'avg_daily_sales': 100, 'current_stock': 120, 'expiry_date': day(9), 'price': 4.25},
+    ])
+
+def inventory_chunks(n_rows, n_stores, n_products, today, seed, chunk_rows=CHUNK_ROWS):
+    """Yields random inventory rows, expiring between today and two weeks out."""
+    names, categories = product_catalog(n_products)
+    for chunk_index, start in enumerate(range(0, n_rows, chunk_rows)):
+        rng = _chunk_rng(seed, 3, chunk_index)
+        n = min(chunk_rows, n_rows - start)
+        product = rng.integers(0, n_products, n)
+        columns = {}
+        if n_stores > 1:
+            columns["store_id"] = rng.integers(1, n_stores + 1, n)
+        columns.update({
+            "product_id": 100 + product,
+            "product_name": pa.DictionaryArray.from_arrays(product.astype(np.int32), names),
+            "category": pa.array(categories[product]).dictionary_encode(),
+            "avg_daily_sales": rng.integers(5, 150, n),
+            "current_stock": rng.integers(0, 400, n),
+            "expiry_date": (today + rng.integers(0, 15, n).astype('timedelta64[D]')).astype(str),
+            "price": np.round(rng.uniform(0.5, 25.0, n), 2),
         })
+        yield pa.table(columns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic historical, tactical training and inventory data.")
+    parser.add_argument('--stores', type=int, default=1, help="stores per month (adds a store_id column when > 1)")
+    parser.add_argument('--products', type=int, default=len(PRODUCTS), help="products per store and month")
+    parser.add_argument('--months', type=int, default=MONTHS_OF_DATA, help="months of history")
+    parser.add_argument('--inventory-rows', type=int, default=0, help="random inventory rows (default: the six-item demo inventory)")
+    parser.add_argument('--ratio-steps', type=int, default=10, help="stock-to-sales ratios per day in the tactical training grid")
+    parser.add_argument('--tactical-by-category', action='store_true', help="one tactical grid per category, for partitioned models")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="rows held in memory at a time")
+    parser.add_argument('--out-dir', default=DATA_DIR)
+    parser.add_argument('--skip-parquet', action='store_true', help="write only the CSV files")
+    args = parser.parse_args()
+
+    print("Starting data generation...")
+    # --- Create Data Directory if it Doesn't Exist ---
+    os.makedirs(args.out_dir, exist_ok=True)
+    print(f"Ensured data directory exists at: '{args.out_dir}/'")
+    today = np.datetime64(datetime.now().date())
+
+    outputs = [
+        ('historical_data.csv', 'historical', historical_chunks(args.stores, args.products, args.months, args.seed, args.chunk_rows)),
+        ('tactical_training_data.csv', 'tactical', tactical_chunks(args.ratio_steps, args.seed, args.tactical_by_category)),
+        ('current_inventory.csv', 'inventory',
+         inventory_chunks(args.inventory_rows, args.stores, args.products, today, args.seed, args.chunk_rows) if args.inventory_rows
+         else demo_inventory_chunks(today)),
+    ]
+    for file_name, kind, chunks in outputs:
+        path = os.path.join(args.out_dir, file_name)
+        n_rows = write_csv(path, chunks)
+        if not args.skip_parquet:
+            data_store.to_columnar(path, kind)
+        print(f"✅ Generated '{path}' with {n_rows:,} rows.")
+
+    print("\nData generation complete!")
 
-tactical_df = pd.DataFrame(tactical_data)
-# Use os.path.join for this file too
-tactical_file_path = os.path.join(DATA_DIR, 'tactical_training_data.csv')
-tactical_df.to_csv(tactical_file_path, index=False)
-print(f"✅ Generated '{tactical_file_path}' with {len(tactical_df)} rows.")
-
-
-# --- 3. Generate Current Inventory Snapshot ---
-today = datetime.now()
-current_inventory = [
-    # --- Items that will be marked for DONATION (Expires in <= 2 days) ---
-    {'product_id': 105, 'product_name': 'Artisan Bread', 'category': 'Bakery', 'avg_daily_sales': 40, 'current_stock': 30, 'expiry_date': (today + timedelta(days=1)).strftime('%Y-%m-%d'), 'price': 5.50},
-    {'product_id': 104, 'product_name': 'Bagged Salad', 'category': 'Produce', 'avg_daily_sales': 60, 'current_stock': 80, 'expiry_date': (today + timedelta(days=2)).strftime('%Y-%m-%d'), 'price': 3.00},
-
-    # --- Items that will be marked for FLASH SALE to create a 75/50/25 split ---
-    # High stock ratio, near expiry -> 75% discount
-    {'product_id': 101, 'product_name': 'Chicken Breast', 'category': 'Meat', 'avg_daily_sales': 25, 'current_stock': 180, 'expiry_date': (today + timedelta(days=3)).strftime('%Y-%m-%d'), 'price': 12.50},
-    # Medium stock ratio, mid expiry -> 50% discount
-    {'product_id': 102, 'product_name': 'Organic Bananas', 'category': 'Produce', 'avg_daily_sales': 50, 'current_stock': 150, 'expiry_date': (today + timedelta(days=5)).strftime('%Y-%m-%d'), 'price': 1.50},
-    # Lower stock ratio, far expiry -> 25% discount
-    {'product_id': 106, 'product_name': 'Greek Yogurt', 'category': 'Dairy', 'avg_daily_sales': 70, 'current_stock': 100, 'expiry_date': (today + timedelta(days=6)).strftime('%Y-%m-%d'), 'price': 2.50},
-
-    # --- Item that is safe (Expires far out) ---
-    {'product_id': 103, 'product_name': 'Gallon Milk', 'category': 'Dairy', 'avg_daily_sales': 100, 'current_stock': 120, 'expiry_date': (today + timedelta(days=9)).strftime('%Y-%m-%d'), 'price': 4.25}
-]
-current_inventory_df = pd.DataFrame(current_inventory)
-# And finally, for the inventory file
-inventory_file_path = os.path.join(DATA_DIR, 'current_inventory.csv')
-current_inventory_df.to_csv(inventory_file_path, index=False)
-print(f"✅ Generated '{inventory_file_path}' for today.")
-
-print("\nData generation complete!")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
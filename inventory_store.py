@@ -0,0 +1,246 @@
+from datetime import datetime
+
+from models import db, InventorySnapshot, InventoryItem
+import metrics
+import paging
+
+# Decisions shown on the results pages; rows that are kept as they are only stored as history.
+RESULT_ACTIONS = ('flash_sale', 'donate')
+# Columns of an inventory item served by result pages, each of which they may sort by.
+PAGE_COLUMNS = [InventoryItem.product_name, InventoryItem.category, InventoryItem.expiry_date, InventoryItem.days_until_expiry,
+                InventoryItem.current_stock, InventoryItem.price, InventoryItem.discount_rate, InventoryItem.recovered_revenue,
+                InventoryItem.action]
+# A lot is the same product from the same store with the same expiry date.
+LOT_COLUMNS = ['store_id', 'product_id', 'expiry_date']
+# A discount depends only on these: the lot's store and category pick the partition models,
+# and stock, sales rate and days-to-expiry bucket are the inputs.
+DECISION_COLUMNS = LOT_COLUMNS + ['category', 'current_stock', 'avg_daily_sales', 'days_bucket']
+# Discounts only depend on the exact day count within the first week; every day
+# beyond it (and every day past expiry) gives the same decision.
+MIN_DAYS_BUCKET, MAX_DAYS_BUCKET = -1, 8
+
+def days_bucket(days_until_expiry):
+    return days_until_expiry.clip(MIN_DAYS_BUCKET, MAX_DAYS_BUCKET)
+
+class SnapshotRecorder:
+    """Records an inventory upload as a snapshot and supplies decisions cached in earlier ones.
+
+    A snapshot always stores its flash-sale and donation rows, which back the
+    results pages. With all_rows it also stores every other row it scored
+    afresh, the history that decisions are reused from and that
+    sell_through_history reads. Each snapshot points at its parent: the user's
+    previous snapshot, if it was scored with the same tactical models
+    (model_key). A row reuses a discount stored anywhere along that chain of
+    parents for the same lot with the same stock, sales rate, category and
+    days-to-expiry bucket. Uploads without product_id are always fully rescored,
+    as is everything when reuse is False.
+
+    Rows are buffered while scoring and written by finish() in one short
+    transaction, so the database is never locked for the whole scoring run.
+    """
+
+    def __init__(self, user_id, model_key, today=None, reuse=True, all_rows=True):
+        now = datetime.now()
+        chain = _snapshot_chain(user_id, model_key) if reuse else []
+        self._cache = _load_decisions(chain) if chain else None
+        self.snapshot = InventorySnapshot(user_id=user_id, taken_on=(today or now).date(), created_at=now, model_key=model_key,
+                                          parent_id=chain[0] if chain else None, rows_scored=0, rows_reused=0)
+        self._all_rows = all_rows
+        self._pending = []
+
+    def cached_discounts(self, chunk, today):
+        """Returns each row's cached discount, or NaN where the row must be rescored."""
+        import numpy as np
+
+        if self._cache is None or self._cache.empty or 'product_id' not in chunk.columns:
+            return np.full(len(chunk), np.nan)
+        current = _decision_inputs(chunk, today)
+        cached = current.merge(self._cache, on=DECISION_COLUMNS, how='left')['discount_rate'].to_numpy(dtype=float)
+        metrics.count_rows('inventory_store.reused', int((~np.isnan(cached)).sum()))
+        return cached
+
+    def add(self, scored, reused):
+        """Buffers a scored inventory chunk (see ai_core.score_inventory); reused marks rows given a cached discount."""
+        import pandas as pd
+
+        self.snapshot.rows_scored += len(scored)
+        stored = scored['action'].isin(RESULT_ACTIONS).to_numpy()
+        if self._all_rows:
+            stored = stored | ~reused
+        scored = scored[stored]
+        if scored.empty:
+            return
+        self._pending.append(pd.DataFrame({
+            'store_id': scored['store_id'].astype(object) if 'store_id' in scored.columns else None,
+            'product_id': scored['product_id'].astype(object) if 'product_id' in scored.columns else None,
+            'product_name': scored['product_name'].astype(str),
+            'category': scored['category'].astype(object) if 'category' in scored.columns else None,
+            'expiry_date': pd.to_datetime(scored['expiry_date']).dt.date,
+            'current_stock': scored['current_stock'].round().astype('Int64'),
+            'avg_daily_sales': scored['avg_daily_sales'].astype(float),
+            'price': scored['price'].astype(float),
+            'days_until_expiry': scored['days_until_expiry'].astype('Int64'),
+            'discount_rate': scored['discount_rate'].astype(float),
+            'recovered_revenue': scored['recovered_revenue'].astype(float),
+            'action': scored['action'].astype(str),
+        }, index=scored.index))
+
+    def finish(self, rows_reused, keep, ttl=None):
+        """Writes, summarizes and commits the snapshot, then evicts old ones (see evict_snapshots)."""
+        self.snapshot.rows_reused = rows_reused
+        db.session.add(self.snapshot)
+        db.session.flush()
+        pending, self._pending = self._pending, []
+        for rows in pending:
+            paging.insert_frame(InventoryItem, rows, snapshot_id=self.snapshot.id)
+            metrics.count_rows('inventory_store.stored', len(rows))
+        with metrics.timed('inventory_store.summarize'):
+            self.snapshot.summary = summarize_snapshot(self.snapshot.id)
+        db.session.commit()
+        evict_snapshots(self.snapshot.user_id, keep, ttl)
+
+    def discard(self):
+        self._pending = []
+        db.session.rollback()
+
+def _snapshot_chain(user_id, model_key):
+    """IDs of the user's newest snapshot and its parents, newest first; empty if it used other models."""
+    snapshots = db.session.execute(db.select(InventorySnapshot.id, InventorySnapshot.parent_id, InventorySnapshot.model_key)
+                                   .where(InventorySnapshot.user_id == user_id)
+                                   .order_by(InventorySnapshot.created_at.desc(), InventorySnapshot.id.desc())).all()
+    if not snapshots or snapshots[0].model_key != model_key:
+        return []
+    by_id = {snapshot.id: snapshot for snapshot in snapshots}
+    chain, current = [], snapshots[0]
+    while current is not None:
+        chain.append(current.id)
+        current = by_id.get(current.parent_id)
+    return chain
+
+def _decision_inputs(chunk, today):
+    """The DECISION_COLUMNS of an uploaded inventory chunk."""
+    import pandas as pd
+
+    inputs = pd.DataFrame({
+        'store_id': chunk['store_id'].fillna(0).to_numpy(dtype=float) if 'store_id' in chunk.columns else 0.0,
+        'product_id': chunk['product_id'].to_numpy(dtype=float),
+        'expiry_date': pd.to_datetime(chunk['expiry_date']).to_numpy(),
+        'category': chunk['category'].astype(object).fillna('').to_numpy() if 'category' in chunk.columns else '',
+        'current_stock': chunk['current_stock'].to_numpy(dtype=float),
+        'avg_daily_sales': chunk['avg_daily_sales'].to_numpy(dtype=float),
+    })
+    inputs['days_bucket'] = days_bucket((inputs['expiry_date'] - today).dt.days).astype(float)
+    return inputs
+
+def _load_decisions(snapshot_ids):
+    """The discounts stored in the given snapshots, one per distinct DECISION_COLUMNS combination."""
+    import pandas as pd
+
+    query = (db.select(InventoryItem.store_id, InventoryItem.product_id, InventoryItem.expiry_date, InventoryItem.category,
+                       InventoryItem.current_stock, InventoryItem.avg_daily_sales, InventoryItem.days_until_expiry,
+                       InventoryItem.discount_rate)
+             .where(InventoryItem.snapshot_id.in_(snapshot_ids), InventoryItem.product_id.is_not(None)))
+    items = pd.DataFrame(db.session.execute(query).all(),
+                         columns=['store_id', 'product_id', 'expiry_date', 'category', 'current_stock', 'avg_daily_sales',
+                                  'days_until_expiry', 'discount_rate'])
+    items['store_id'] = items['store_id'].fillna(0).astype(float)
+    items['product_id'] = items['product_id'].astype(float)
+    items['expiry_date'] = pd.to_datetime(items['expiry_date'])
+    items['category'] = items['category'].fillna('').astype(object)
+    items['current_stock'] = items['current_stock'].astype(float)
+    items['avg_daily_sales'] = items['avg_daily_sales'].astype(float)
+    items['days_bucket'] = days_bucket(items['days_until_expiry'].astype(float))
+    # Under one model_key equal inputs always got the same discount, so any duplicate will do.
+    return items[DECISION_COLUMNS + ['discount_rate']].drop_duplicates(DECISION_COLUMNS)
+
+def summarize_snapshot(snapshot_id, top_n=paging.SUMMARY_TOP_N):
+    """Per-action and per-category totals of a snapshot, plus its top_n flash sales by
+    recovered revenue and top_n donations by stock, computed in SQL."""
+    query = (db.select(InventoryItem.action, InventoryItem.category, db.func.count(),
+                       db.func.sum(InventoryItem.current_stock), db.func.sum(InventoryItem.recovered_revenue))
+             .where(InventoryItem.snapshot_id == snapshot_id, InventoryItem.action.in_(RESULT_ACTIONS))
+             .group_by(InventoryItem.action, InventoryItem.category))
+    actions = {action: {"items": 0, "stock": 0, "recovered_revenue": 0.0} for action in RESULT_ACTIONS}
+    categories = []
+    for action, category, items, stock, revenue in db.session.execute(query):
+        totals = actions.setdefault(action, {"items": 0, "stock": 0, "recovered_revenue": 0.0})
+        totals['items'] += items
+        totals['stock'] += int(stock or 0)
+        totals['recovered_revenue'] += float(revenue or 0)
+        categories.append({"action": action, "category": category, "items": items, "stock": int(stock or 0),
+                           "recovered_revenue": round(float(revenue or 0), 2)})
+    for totals in actions.values():
+        totals['recovered_revenue'] = round(totals['recovered_revenue'], 2)
+    return {
+        "actions": actions,
+        "categories": sorted(categories, key=lambda totals: (totals['action'], -totals['stock'])),
+        "top_sales": snapshot_page(snapshot_id, 'flash_sale', per_page=top_n, sort='recovered_revenue')[0],
+        "top_donations": snapshot_page(snapshot_id, 'donate', per_page=top_n, sort='current_stock')[0],
+    }
+
+def get_snapshot(snapshot_id, user_id):
+    """Returns the user's snapshot, or None if it is missing or was evicted."""
+    snapshot = db.session.get(InventorySnapshot, snapshot_id) if snapshot_id else None
+    return snapshot if snapshot is not None and snapshot.user_id == user_id else None
+
+def snapshot_page(snapshot_id, action=None, page=1, per_page=50, sort='recovered_revenue', descending=True, categories=None):
+    """Returns (rows, total) for one page of a snapshot's flash-sale and donation items (see paging.fetch_page).
+
+    action (flash_sale or donate) and categories optionally restrict the rows.
+    """
+    condition = (InventoryItem.snapshot_id == snapshot_id) & InventoryItem.action.in_([action] if action else RESULT_ACTIONS)
+    rows, total = paging.fetch_page(PAGE_COLUMNS, paging.where_in(condition, InventoryItem.category, categories), InventoryItem.id,
+                                    page, per_page, sort, descending)
+    for row in rows:
+        row['expiry_date'] = row['expiry_date'] and row['expiry_date'].isoformat()
+    return rows, total
+
+def evict_snapshots(user_id, keep, ttl=None):
+    """Deletes the user's snapshots beyond the newest keep, and everyone's older than ttl (a timedelta).
+
+    Snapshots that pointed at an evicted parent start a new chain; the lots
+    only stored in the parent are simply rescored on the next upload.
+    """
+    recent = (db.select(InventorySnapshot.id)
+              .where(InventorySnapshot.user_id == user_id)
+              .order_by(InventorySnapshot.created_at.desc(), InventorySnapshot.id.desc()))
+    stale_ids = list(db.session.scalars(recent))[max(keep, 1):]
+    if ttl is not None:
+        expired = db.select(InventorySnapshot.id).where(InventorySnapshot.created_at < datetime.now() - ttl)
+        stale_ids = sorted(set(stale_ids) | set(db.session.scalars(expired)))
+    if stale_ids:
+        db.session.execute(db.update(InventorySnapshot).where(InventorySnapshot.parent_id.in_(stale_ids)).values(parent_id=None))
+        db.session.execute(db.delete(InventoryItem).where(InventoryItem.snapshot_id.in_(stale_ids)))
+        db.session.execute(db.delete(InventorySnapshot).where(InventorySnapshot.id.in_(stale_ids)))
+        db.session.commit()
+
+def sell_through_history(user_id=None, max_days=7):
+    """Derives tactical training rows from lots observed more than once before they expired.
+
+    For a lot seen d days before expiry (1 <= d <= max_days) and seen again on or
+    after its last selling day, the sell-through rate is the share of the stock
+    seen at d that was gone by then. Returns a frame with the
+    days_until_expiry, stock_to_sales_ratio and sell_through_rate columns.
+    """
+    import pandas as pd
+
+    query = (db.select(InventoryItem.store_id, InventoryItem.product_id, InventoryItem.expiry_date, InventoryItem.current_stock,
+                       InventoryItem.avg_daily_sales, InventoryItem.days_until_expiry)
+             .join(InventorySnapshot)
+             .where(InventoryItem.product_id.is_not(None), InventoryItem.days_until_expiry.between(0, max_days)))
+    if user_id is not None:
+        query = query.where(InventorySnapshot.user_id == user_id)
+    items = pd.DataFrame(db.session.execute(query).all(),
+                         columns=['store_id', 'product_id', 'expiry_date', 'current_stock', 'avg_daily_sales', 'days_until_expiry'])
+    items['store_id'] = items['store_id'].fillna(0)
+    items = items.drop_duplicates(LOT_COLUMNS + ['days_until_expiry'], keep='last')
+    # Each earlier sighting of a lot is paired with its sighting closest to expiry.
+    last = items.sort_values('days_until_expiry').groupby(LOT_COLUMNS).first()
+    pairs = items.join(last, on=LOT_COLUMNS, rsuffix='_last')
+    pairs = pairs[(pairs['days_until_expiry_last'] <= 1) & (pairs['days_until_expiry'] > pairs['days_until_expiry_last'])
+                  & (pairs['current_stock'] > 0) & (pairs['avg_daily_sales'] > 0)]
+    return pd.DataFrame({
+        'days_until_expiry': pairs['days_until_expiry'].astype(int),
+        'stock_to_sales_ratio': (pairs['current_stock'] / pairs['avg_daily_sales']).round(2),
+        'sell_through_rate': (1 - pairs['current_stock_last'] / pairs['current_stock']).clip(0, 1).round(2),
+    }).reset_index(drop=True)
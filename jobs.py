@@ -0,0 +1,156 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import data_store
+
+# --- Job Status Values ---
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+def save_upload(file_storage, upload_dir, prefix):
+    """Saves an uploaded file under a content-addressed name and returns (path, sha256)."""
+    os.makedirs(upload_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(upload_dir, f".{prefix}_{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, 'wb') as out:
+        while True:
+            chunk = file_storage.stream.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    dataset_key = digest.hexdigest()
+    path = os.path.join(upload_dir, f"{prefix}_{dataset_key}.csv")
+    os.replace(tmp_path, path)
+    return path, dataset_key
+
+def prune_uploads(upload_dir, max_age, keep, in_use=()):
+    """Deletes uploads (with their Parquet copies) older than max_age (a timedelta) or beyond the newest keep.
+
+    Paths in in_use, such as the datasets of unfinished training jobs, are never
+    deleted. Re-uploading a file refreshes its age. Returns the number deleted.
+    """
+    in_use = {os.path.abspath(path) for path in in_use}
+    try:
+        names = [name for name in os.listdir(upload_dir) if name.endswith('.csv') and not name.startswith('.')]
+    except FileNotFoundError:
+        return 0
+    uploads = []
+    for name in names:
+        path = os.path.join(upload_dir, name)
+        try:
+            uploads.append((os.path.getmtime(path), path))
+        except FileNotFoundError:
+            continue
+    uploads.sort(reverse=True)
+    cutoff = time.time() - max_age.total_seconds()
+    deleted = 0
+    for rank, (mtime, path) in enumerate(uploads):
+        if (rank < keep and mtime >= cutoff) or os.path.abspath(path) in in_use:
+            continue
+        for stale in (path, data_store.columnar_path(path)):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+        deleted += 1
+    return deleted
+
+class TrainingJob:
+    """A single training run and its outcome."""
+
+    def __init__(self, kind, dataset_path, dataset_key):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.dataset_path = dataset_path
+        self.dataset_key = dataset_key
+        self.status = PENDING
+        self.message = ''
+        self.submitted_at = datetime.now()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "message": self.message,
+            "submitted_at": self.submitted_at.isoformat(timespec='seconds'),
+            "finished_at": self.finished_at.isoformat(timespec='seconds') if self.finished_at else None,
+        }
+
+class TrainingJobQueue:
+    """Runs training functions on a dedicated worker pool, off the request threads.
+
+    Submitting a (kind, dataset) pair that is already pending or running returns
+    the existing job instead of training the same data twice. Jobs of the same
+    kind run one at a time because they write the same model files.
+
+    Jobs live in this process only: behind several server processes, /jobs/<id>
+    answers 404 from every process but the one that queued the job, so the app
+    must run as a single process (threads are fine) or use sticky sessions.
+    """
+
+    def __init__(self, max_workers=2, max_finished_jobs=200):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='training')
+        self._max_finished_jobs = max_finished_jobs
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._kind_locks = {}
+
+    def submit(self, kind, dataset_path, dataset_key, train_fn):
+        """Queues train_fn(dataset_path) -> (success, message). Returns (job, created)."""
+        with self._lock:
+            job_id = self._active.get((kind, dataset_key))
+            if job_id is not None:
+                return self._jobs[job_id], False
+            job = TrainingJob(kind, dataset_path, dataset_key)
+            self._jobs[job.id] = job
+            self._active[(kind, dataset_key)] = job.id
+            kind_lock = self._kind_locks.setdefault(kind, threading.Lock())
+            self._prune_finished()
+        self._executor.submit(self._run, job, train_fn, kind_lock)
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_paths(self):
+        """Dataset paths of the jobs that are pending or running."""
+        with self._lock:
+            return [self._jobs[job_id].dataset_path for job_id in self._active.values()]
+
+    def _run(self, job, train_fn, kind_lock):
+        with kind_lock:
+            job.status = RUNNING
+            try:
+                success, message = train_fn(job.dataset_path)
+            except Exception as e:
+                success, message = False, str(e)
+        with self._lock:
+            job.message = message
+            job.finished_at = datetime.now()
+            job.status = DONE if success else FAILED
+            self._active.pop((job.kind, job.dataset_key), None)
+
+    def _prune_finished(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        excess = len(finished) - self._max_finished_jobs
+        if excess > 0:
+            for job in sorted(finished, key=lambda j: j.finished_at)[:excess]:
+                del self._jobs[job.id]
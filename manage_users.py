@@ -1,8 +1,22 @@
+import argparse
+import csv
+import json
+import os
 import sys
 import getpass
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from app import app
+import auth
 from models import db, User # <-- MODIFIED: Import db and User from models
 
+IMPORT_BATCH_ROWS = 500
+EXPORT_BATCH_ROWS = 1000
+# Same limits as the registration form.
+MIN_USERNAME_LENGTH, MAX_USERNAME_LENGTH = 2, 30
+MIN_PASSWORD_LENGTH = 6
+BCRYPT_HASH_LENGTH = 60
+
 def list_users():
     with app.app_context():
         users = User.query.all()
@@ -33,6 +47,7 @@ def create_manager():
         new_manager = User(username=username, password=password)
         db.session.add(new_manager)
         db.session.commit()
+        auth.user_cache.invalidate()
         print(f"✅ Success! Manager '{username}' has been created.")
 
 def delete_manager():
@@ -47,16 +62,143 @@ def delete_manager():
         if confirm == 'y':
             db.session.delete(user)
             db.session.commit()
+            auth.user_cache.invalidate()
             print(f"✅ Success! User '{username_to_delete}' has been deleted.")
         else:
             print("Deletion cancelled.")
 
+def read_users_file(path):
+    """Rows from a CSV file (with a header row) or a JSON array of objects (or {"users": [...]})."""
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = rows.get('users')
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError('Expected a JSON array of user objects or {"users": [...]}.')
+        return rows
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def _check_user_row(row):
+    """(username, password, password_hash, error) for one imported row; password or password_hash is None."""
+    username = str(row.get('username') or '').strip()
+    password = row.get('password') or None
+    password_hash = str(row['password_hash']) if row.get('password_hash') else None
+    if not MIN_USERNAME_LENGTH <= len(username) <= MAX_USERNAME_LENGTH:
+        return username, None, None, f"username must be {MIN_USERNAME_LENGTH}-{MAX_USERNAME_LENGTH} characters"
+    if password_hash is not None:
+        if len(password_hash) != BCRYPT_HASH_LENGTH or auth.hash_rounds(password_hash) is None:
+            return username, None, None, "password_hash is not a bcrypt hash"
+        return username, None, password_hash, None
+    if password is None or len(str(password)) < MIN_PASSWORD_LENGTH:
+        return username, None, None, f"password must be at least {MIN_PASSWORD_LENGTH} characters"
+    return username, str(password), None, None
+
+def _report_progress(label, done, total):
+    if done % max(1, total // 100) and done != total:
+        return
+    print(f"\r   {label}: {done:,}/{total:,}", end='\n' if done == total else '', flush=True)
+
+def import_users(path, dry_run=False, workers=None, batch_size=IMPORT_BATCH_ROWS):
+    """Creates the users listed in a CSV/JSON file (username plus password or password_hash).
+
+    Existing usernames are skipped, found with one query. Plain passwords are
+    hashed across a process pool at the configured work factor, and rows are
+    inserted batch_size at a time, one transaction per batch. With dry_run,
+    only reports what would be imported.
+    """
+    with app.app_context():
+        print(f"--- Import Store Managers from {path} ---")
+        try:
+            rows = read_users_file(path)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read users from '{path}': {e}")
+            return False
+
+        existing = set(db.session.scalars(db.select(User.username)))
+        new_users, skipped, invalid = [], 0, 0
+        seen = set()
+        for line, row in enumerate(rows, start=1):
+            username, password, password_hash, error = _check_user_row(row)
+            if error is None and username in seen:
+                error = "username appears more than once in the file"
+            if error is not None:
+                invalid += 1
+                print(f"   ⚠️ Row {line} ({username or 'no username'}): {error}")
+                continue
+            seen.add(username)
+            if username in existing:
+                skipped += 1
+                continue
+            new_users.append({"username": username, "password": password, "password_hash": password_hash})
+        to_hash = [user for user in new_users if user['password_hash'] is None]
+        print(f"{len(rows):,} rows: {len(new_users):,} new ({len(to_hash):,} passwords to hash), "
+              f"{skipped:,} already exist, {invalid:,} invalid.")
+        if dry_run:
+            print("Dry run: no users were created.")
+            return invalid == 0
+        if not new_users:
+            print("Nothing to import.")
+            return invalid == 0
+
+        log_rounds = app.config['BCRYPT_LOG_ROUNDS']
+        hashes = auth.hash_passwords([user['password'] for user in to_hash], log_rounds, workers,
+                                     progress=lambda done: _report_progress(f"Hashing passwords (work factor {log_rounds})", done, len(to_hash)))
+        for user, password_hash in zip(to_hash, hashes):
+            user['password_hash'] = password_hash
+
+        created = 0
+        try:
+            for start in range(0, len(new_users), batch_size):
+                batch = [{"username": user['username'], "password_hash": user['password_hash']}
+                         for user in new_users[start:start + batch_size]]
+                db.session.execute(insert(User), batch)
+                db.session.commit()
+                created += len(batch)
+                _report_progress("Creating users", created, len(new_users))
+        except IntegrityError:
+            db.session.rollback()
+            print(f"\nError: A username in the next batch was created meanwhile. {created:,} managers were created; "
+                  "run the import again to add the rest.")
+            return False
+        finally:
+            if created:
+                auth.user_cache.invalidate()
+        print(f"✅ Success! {created:,} managers have been created.")
+        return invalid == 0
+
+def export_users(path):
+    """Writes every user's username and password hash to a CSV or JSON file that import_users reads back."""
+    with app.app_context():
+        query = db.select(User.username, User.password_hash).order_by(User.id).execution_options(yield_per=EXPORT_BATCH_ROWS)
+        rows = db.session.execute(query)
+        count = 0
+        # The file holds password hashes, so only its owner may read it.
+        with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', newline='') as f:
+            if path.lower().endswith('.json'):
+                f.write('[')
+                for username, password_hash in rows:
+                    f.write((',\n' if count else '\n') + json.dumps({"username": username, "password_hash": password_hash}))
+                    count += 1
+                f.write('\n]\n')
+            else:
+                writer = csv.writer(f)
+                writer.writerow(['username', 'password_hash'])
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+        print(f"✅ Success! {count:,} managers exported to '{path}'.")
+
 def print_usage():
     print("Usage: python manage_users.py [command]")
     print("Commands:")
     print("  list    - View all current managers")
     print("  create  - Create a new manager")
     print("  delete  - Delete an existing manager")
+    print("  import FILE [--dry-run] [--workers N] [--batch-size N]")
+    print("          - Create managers from a CSV/JSON file with username and password (or password_hash)")
+    print("  export FILE - Write all managers with their password hashes to a CSV/JSON file")
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
@@ -69,6 +211,19 @@ if __name__ == '__main__':
         create_manager()
     elif command == 'delete':
         delete_manager()
+    elif command == 'import':
+        parser = argparse.ArgumentParser(prog='manage_users.py import', description="Create managers from a CSV/JSON file.")
+        parser.add_argument('file')
+        parser.add_argument('--dry-run', action='store_true', help="validate and report without creating anyone")
+        parser.add_argument('--workers', type=int, help="password hashing processes (default: one per CPU)")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_ROWS, help="users inserted per transaction")
+        args = parser.parse_args(sys.argv[2:])
+        sys.exit(0 if import_users(args.file, args.dry_run, args.workers, max(1, args.batch_size)) else 1)
+    elif command == 'export':
+        if len(sys.argv) < 3:
+            print_usage()
+            sys.exit(1)
+        export_users(sys.argv[2])
     else:
         print(f"Error: Unknown command '{command}'")
         print_usage()
\ No newline at end of file
@@ -0,0 +1,168 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Set to False to make every timer and counter a no-op.
+ENABLED = True
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in sorted(self._values.items())]
+
+class Histogram:
+    """Observations counted into fixed buckets, plus their sum and count, per label set."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", key, (('le', _format_bound(bound)),), cumulative))
+                samples.append((f"{self.name}_sum", key, (), total))
+                samples.append((f"{self.name}_count", key, (), cumulative))
+        return samples
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, extra_labels, value in metric.samples():
+                labels = tuple(zip(metric.labelnames, key)) + extra_labels
+                label_text = ','.join(f'{label}="{_escape(str(v))}"' for label, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+REGISTRY = MetricsRegistry()
+REQUEST_SECONDS = REGISTRY.histogram('freshfuture_request_seconds', 'HTTP request latency by endpoint.', ('endpoint', 'method'))
+STAGE_SECONDS = REGISTRY.histogram('freshfuture_stage_seconds', 'Time spent in each instrumented stage.', ('stage',))
+STAGE_ROWS = REGISTRY.counter('freshfuture_stage_rows_total', 'Rows processed by each instrumented stage.', ('stage',))
+CACHE_LOOKUPS = REGISTRY.counter('freshfuture_cache_lookups_total', 'Cache lookups by cache and result (hit or miss).', ('cache', 'result'))
+
+@contextmanager
+def timed(stage):
+    """Records the time spent inside the with-block under `stage`."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+def instrument(stage):
+    """Decorator form of timed()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+        return wrapper
+    return decorator
+
+def timed_iter(stage, iterable):
+    """Yields from iterable, recording the total time until it is exhausted or closed (for streamed responses)."""
+    if not ENABLED:
+        yield from iterable
+        return
+    start = time.perf_counter()
+    try:
+        yield from iterable
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+def counted(stage, iterable):
+    """Passes items through, adding how many there were to `stage`'s row count once exhausted."""
+    if not ENABLED:
+        return iterable
+    return _counted(stage, iterable)
+
+def _counted(stage, iterable):
+    n_rows = 0
+    for item in iterable:
+        n_rows += 1
+        yield item
+    STAGE_ROWS.inc(n_rows, stage=stage)
+
+def count_rows(stage, n_rows):
+    if ENABLED:
+        STAGE_ROWS.inc(n_rows, stage=stage)
+
+def cache_lookup(cache, hit):
+    if ENABLED:
+        CACHE_LOOKUPS.inc(cache=cache, result='hit' if hit else 'miss')
+
+def observe_request(endpoint, method, seconds):
+    if ENABLED:
+        REQUEST_SECONDS.observe(seconds, endpoint=endpoint or 'unknown', method=method)
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
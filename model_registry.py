@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ModelRegistry:
+    """Content-addressed cache of trained model files.
+
+    Entries are keyed by a hash of the training data plus the hyperparameters,
+    so re-uploading an unchanged dataset restores the saved models instead of
+    retraining. Least recently used entries are evicted once the registry holds
+    more than max_entries or max_bytes.
+    """
+
+    def __init__(self, root, max_entries=20, max_bytes=2 * 1024 ** 3):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, kind, data_path, params):
+        """Returns the cache key for training `kind` models on data_path with params."""
+        digest = hashlib.sha256()
+        digest.update(kind.encode())
+        digest.update(file_sha256(data_path).encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def restore(self, kind, key, targets):
+        """Copies a cached entry's files to targets ({name: path}). Returns True on a hit."""
+        entry_dir = self._entry_dir(kind, key)
+        with self._lock:
+            if not os.path.isdir(entry_dir):
+                self.misses += 1
+                return False
+            for name, target in targets.items():
+                source = os.path.join(entry_dir, f"{name}.joblib")
+                if os.path.exists(source):
+                    _atomic_copy(source, target)
+                elif os.path.exists(target):
+                    os.remove(target)
+            os.utime(entry_dir)
+            self.hits += 1
+            return True
+
+    def store(self, kind, key, sources):
+        """Saves freshly trained files ({name: path}) under key, then enforces the size caps."""
+        entry_dir = self._entry_dir(kind, key)
+        tmp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_dir)
+        for name, source in sources.items():
+            if os.path.exists(source):
+                shutil.copyfile(source, os.path.join(tmp_dir, f"{name}.joblib"))
+        with self._lock:
+            if os.path.isdir(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.replace(tmp_dir, entry_dir)
+            self._evict()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _entry_dir(self, kind, key):
+        return os.path.join(self.root, f"{kind}-{key}")
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path) and not name.endswith('.tmp'):
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                entries.append((os.path.getmtime(path), size, path))
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total_bytes -= size
+
+def _atomic_copy(source, target):
+    tmp_target = f"{target}.{uuid.uuid4().hex}.tmp"
+    shutil.copyfile(source, tmp_target)
+    os.replace(tmp_target, target)
@@ -0,0 +1,74 @@
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import joblib
+
+class ModelSnapshot:
+    """An immutable, versioned set of loaded models.
+
+    Request handlers should grab one snapshot and use it throughout, so a
+    reload in another thread can never mix models from different versions.
+    """
+
+    def __init__(self, version, models, stamps):
+        self.version = version
+        self.models = models
+        self.stamps = stamps
+        self.loaded_at = datetime.now()
+
+    def __getitem__(self, name):
+        return self.models.get(name)
+
+    def has(self, name):
+        """True if the model's file exists, even when it was not loaded into this process."""
+        return self.stamps.get(name) is not None
+
+class ModelStore:
+    """Loads joblib model files and swaps in a new snapshot only when a file changes.
+
+    Files listed in mmap_names are loaded with joblib's mmap_mode='r', so their
+    NumPy arrays stay in the OS page cache and are shared by every process that
+    maps them. Files in skip_names are tracked (see ModelSnapshot.has) but not
+    loaded.
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self._snapshot = ModelSnapshot(0, {name: None for name in files}, {name: None for name in files})
+        self._lock = threading.RLock()
+
+    def snapshot(self):
+        return self._snapshot
+
+    @contextmanager
+    def writing(self):
+        """Holds off reloads while a group of model files is being replaced."""
+        with self._lock:
+            yield
+
+    def refresh(self, mmap_names=(), skip_names=()):
+        """Reloads changed files and returns (snapshot, changed_names)."""
+        with self._lock:
+            current = self._snapshot
+            stamps = {name: _file_stamp(path) for name, path in self.files.items()}
+            changed = [name for name in self.files if stamps[name] != current.stamps[name]]
+            if not changed:
+                return current, []
+
+            models = dict(current.models)
+            for name in changed:
+                if not stamps[name] or name in skip_names:
+                    models[name] = None
+                else:
+                    models[name] = joblib.load(self.files[name], mmap_mode='r' if name in mmap_names else None)
+            self._snapshot = ModelSnapshot(current.version + 1, models, stamps)
+            return self._snapshot, changed
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
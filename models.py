@@ -1,11 +1,24 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from flask_bcrypt import Bcrypt
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 # Initialize extensions here, but without the app object
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 
+@event.listens_for(Engine, 'connect')
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets results pages read while a snapshot is being written; NORMAL sync is safe under WAL."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
 class User(db.Model, UserMixin):
     """Our User model for the database."""
     id = db.Column(db.Integer, primary_key=True)
@@ -26,4 +39,73 @@ class User(db.Model, UserMixin):
 
     def verify_password(self, password):
         """Checks if the provided password matches the stored hash."""
-        return bcrypt.check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return bcrypt.check_password_hash(self.password_hash, password)
+
+class ForecastResult(db.Model):
+    """A strategic forecast run, kept server-side so the session only holds its ID."""
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    month = db.Column(db.Integer, nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    last_accessed = db.Column(db.DateTime, nullable=False, index=True)
+    rows = db.relationship('ForecastRow', backref='result', cascade='all, delete-orphan', passive_deletes=True, lazy='dynamic')
+    summary = db.relationship('ForecastSummary', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+
+    def __repr__(self):
+        return f"ForecastResult('{self.id}', {self.month}/{self.year})"
+
+
+class ForecastRow(db.Model):
+    """One product line of a stored forecast."""
+    id = db.Column(db.Integer, primary_key=True)
+    result_id = db.Column(db.String(32), db.ForeignKey('forecast_result.id', ondelete='CASCADE'), nullable=False, index=True)
+    product = db.Column(db.String(200), nullable=False, index=True)
+    category = db.Column(db.String(100), index=True)
+    recommended_stock = db.Column(db.Integer, nullable=False)
+    predicted_waste = db.Column(db.Integer, nullable=False)
+
+
+class ForecastSummary(db.Model):
+    """Totals, per-category totals and top products of a forecast, computed once when it is stored."""
+    result_id = db.Column(db.String(32), db.ForeignKey('forecast_result.id', ondelete='CASCADE'), primary_key=True)
+    data = db.Column(db.JSON, nullable=False)
+
+class InventorySnapshot(db.Model):
+    """One uploaded inventory, scored; holds only the rows its parent chain could not supply, plus its actionable rows."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    taken_on = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+    model_key = db.Column(db.String(64), nullable=False)
+    parent_id = db.Column(db.Integer, db.ForeignKey('inventory_snapshot.id'), index=True)
+    rows_scored = db.Column(db.Integer, nullable=False, default=0)
+    rows_reused = db.Column(db.Integer, nullable=False, default=0)
+    summary = db.Column(db.JSON)
+    items = db.relationship('InventoryItem', backref='snapshot', cascade='all, delete-orphan', passive_deletes=True, lazy='dynamic')
+
+    def __repr__(self):
+        return f"InventorySnapshot({self.id}, {self.taken_on})"
+
+
+class InventoryItem(db.Model):
+    """One inventory row of a snapshot with the decision it was given."""
+    __table_args__ = (
+        db.Index('ix_inventory_item_lot', 'snapshot_id', 'product_id', 'expiry_date'),
+        db.Index('ix_inventory_item_action', 'snapshot_id', 'action'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    snapshot_id = db.Column(db.Integer, db.ForeignKey('inventory_snapshot.id', ondelete='CASCADE'), nullable=False)
+    store_id = db.Column(db.Integer)
+    product_id = db.Column(db.Integer, index=True)
+    product_name = db.Column(db.String(200), nullable=False)
+    category = db.Column(db.String(100))
+    # Uploaded cells may be blank; those rows are scored (with no discount) and stored as NULL.
+    expiry_date = db.Column(db.Date, index=True)
+    current_stock = db.Column(db.Integer)
+    avg_daily_sales = db.Column(db.Float)
+    price = db.Column(db.Float)
+    days_until_expiry = db.Column(db.Integer)
+    discount_rate = db.Column(db.Float, nullable=False)
+    recovered_revenue = db.Column(db.Float)
+    action = db.Column(db.String(20), nullable=False)
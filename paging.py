@@ -0,0 +1,40 @@
+from sqlalchemy import insert
+from models import db
+
+INSERT_BATCH_ROWS = 5000
+SUMMARY_TOP_N = 20
+MAX_PAGE_ROWS = 500
+
+def insert_rows(model, records):
+    """Bulk-inserts dicts into model's table, INSERT_BATCH_ROWS per statement. Does not commit."""
+    for start in range(0, len(records), INSERT_BATCH_ROWS):
+        db.session.execute(insert(model), records[start:start + INSERT_BATCH_ROWS])
+
+def insert_frame(model, df, **values):
+    """Bulk-inserts a DataFrame's rows like insert_rows, turning only INSERT_BATCH_ROWS of them into dicts at a time.
+
+    NaN and NA cells are stored as NULL; values sets columns that are the same in every row.
+    """
+    for start in range(0, len(df), INSERT_BATCH_ROWS):
+        batch = df.iloc[start:start + INSERT_BATCH_ROWS].astype(object)
+        db.session.execute(insert(model), batch.where(batch.notna(), None).assign(**values).to_dict('records'))
+
+def where_in(condition, column, values):
+    """Narrows condition to rows whose column is one of values; no values means no filter."""
+    return condition & column.in_(values) if values else condition
+
+def fetch_page(columns, condition, tiebreaker, page=1, per_page=50, sort=None, descending=True):
+    """Returns (rows, total) for one page of the rows matching condition, sorted and paged in SQL.
+
+    rows are dicts keyed by column name. sort names one of columns; ties (and
+    pages) are ordered by tiebreaker. Raises ValueError for an unknown sort column.
+    """
+    sortable = {column.key: column for column in columns}
+    if sort not in sortable:
+        raise ValueError(f"Cannot sort by '{sort}'.")
+    per_page = max(1, min(per_page, MAX_PAGE_ROWS))
+    total = db.session.scalar(db.select(db.func.count()).select_from(tiebreaker.class_).where(condition))
+    order = sortable[sort].desc() if descending else sortable[sort].asc()
+    query = (db.select(*columns).where(condition).order_by(order, tiebreaker)
+             .limit(per_page).offset((max(page, 1) - 1) * per_page))
+    return [row._asdict() for row in db.session.execute(query)], total
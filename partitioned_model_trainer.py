@@ -0,0 +1,23 @@
+import argparse
+import os
+
+import ai_core
+
+def main():
+    parser = argparse.ArgumentParser(description="Train one set of strategic or tactical models per store and/or category.")
+    parser.add_argument('kind', choices=sorted(ai_core.PARTITIONS))
+    parser.add_argument('--data', help="training data (default: the generated historical or tactical data)")
+    parser.add_argument('--by', nargs='+', default=['store_id'], help="partition columns, e.g. --by store_id category")
+    parser.add_argument('--workers', type=int, default=ai_core.PARTITION_WORKERS, help="training processes")
+    args = parser.parse_args()
+
+    default_files = {'strategic': 'historical_data.csv', 'tactical': 'tactical_training_data.csv'}
+    data_path = args.data or os.path.join(ai_core.DATA_DIR, default_files[args.kind])
+    ai_core.PARTITION_WORKERS = args.workers
+
+    print(f"--- Training Partitioned {args.kind.title()} Models ---")
+    success, message = ai_core.train_partitioned_models(args.kind, data_path, args.by)
+    print(f"✅ {message}" if success else f"❌ {message}")
+
+if __name__ == '__main__':
+    main()
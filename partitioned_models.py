@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from urllib.parse import quote
+
+from model_store import ModelStore, _file_stamp
+
+MANIFEST_FILE = 'manifest.json'
+
+def partition_name(partition_by, values):
+    """Directory name for one partition, e.g. "store_id=3,category=Dairy"."""
+    return ','.join(f"{col}={quote(str(value), safe='')}" for col, value in zip(partition_by, values))
+
+class PartitionedModels:
+    """One model set per partition (e.g. per store or category), loaded lazily.
+
+    Each training run writes its partitions under a new run directory and then
+    publishes a manifest naming the run, so readers switch to a complete set of
+    partitions at once. A partition's files are loaded on first use through its
+    own ModelStore; at most max_loaded partitions stay in memory and the least
+    recently used one is dropped when another is needed.
+    """
+
+    def __init__(self, root, files, max_loaded=32):
+        self.root = root
+        self.files = files  # {model name: file name inside a partition directory}
+        self.max_loaded = max_loaded
+        self._manifest = None
+        self._manifest_stamp = None
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def partition_by(self):
+        manifest = self._current_manifest()
+        return tuple(manifest['partition_by']) if manifest else ()
+
+    @property
+    def run(self):
+        """ID of the published training run, or None."""
+        manifest = self._current_manifest()
+        return manifest['run'] if manifest else None
+
+    def keys(self):
+        """The partition value tuples of the published run."""
+        manifest = self._current_manifest()
+        return [tuple(p['values']) for p in manifest['partitions'].values()] if manifest else []
+
+    def new_run(self):
+        """Returns (run_id, run_dir) for a training run to write its partitions into."""
+        run_id = uuid.uuid4().hex
+        return run_id, os.path.join(self.root, run_id)
+
+    def partition_dir(self, run_dir, partition_by, values):
+        return os.path.join(run_dir, partition_name(partition_by, values))
+
+    def publish(self, run_id, partition_by, partitions, **metadata):
+        """Makes a finished run current. partitions maps partition values to their info (e.g. row counts)."""
+        manifest = {
+            "run": run_id,
+            "partition_by": list(partition_by),
+            "partitions": {partition_name(partition_by, values): {"values": list(values), **info}
+                           for values, info in partitions.items()},
+            **metadata,
+        }
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self._manifest_path()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, default=str)
+        os.replace(tmp_path, self._manifest_path())
+        # Older runs are unreachable now; processes that still map their files keep them until closed.
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name != run_id and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def models(self, values, mmap_names=(), skip_names=()):
+        """Returns (snapshot, hit) for a partition; snapshot is None if the partition has no models."""
+        manifest = self._current_manifest()
+        if manifest is None:
+            return None, False
+        name = partition_name(manifest['partition_by'], values)
+        if name not in manifest['partitions']:
+            return None, False
+        cache_key = (manifest['run'], name)
+        with self._lock:
+            store = self._loaded.get(cache_key)
+            hit = store is not None
+            if hit:
+                self._loaded.move_to_end(cache_key)
+            else:
+                partition_dir = os.path.join(self.root, manifest['run'], name)
+                store = ModelStore({model: os.path.join(partition_dir, file) for model, file in self.files.items()})
+                self._loaded[cache_key] = store
+                while len(self._loaded) > self.max_loaded:
+                    self._loaded.popitem(last=False)
+        snapshot, _ = store.refresh(mmap_names, skip_names)
+        return snapshot, hit
+
+    def loaded(self):
+        """Names of the partitions currently held in memory, least recently used first."""
+        with self._lock:
+            return [name for _, name in self._loaded]
+
+    def _current_manifest(self):
+        stamp = _file_stamp(self._manifest_path())
+        with self._lock:
+            if stamp != self._manifest_stamp:
+                if stamp is None:
+                    self._manifest = None
+                else:
+                    with open(self._manifest_path()) as f:
+                        self._manifest = json.load(f)
+                self._manifest_stamp = stamp
+                # Partitions of a replaced run are never asked for again.
+                run = self._manifest and self._manifest['run']
+                for cache_key in [k for k in self._loaded if k[0] != run]:
+                    del self._loaded[cache_key]
+            return self._manifest
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST_FILE)
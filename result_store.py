@@ -0,0 +1,103 @@
+import uuid
+from datetime import datetime, timedelta
+
+from models import db, ForecastResult, ForecastRow, ForecastSummary
+import paging
+
+READ_BATCH_ROWS = 1000
+# Columns of a forecast row served by result pages, each of which they may sort by.
+PAGE_COLUMNS = [ForecastRow.product, ForecastRow.category, ForecastRow.recommended_stock, ForecastRow.predicted_waste]
+
+def save_forecast(predictions, month, year, user_id, ttl=timedelta(hours=24), max_per_user=10):
+    """Stores a strategic forecast frame and returns its result ID.
+
+    Expired results, and the least recently used ones beyond max_per_user,
+    are evicted first.
+    """
+    evict_forecasts(user_id, ttl, max_per_user - 1)
+    now = datetime.now()
+    result = ForecastResult(id=uuid.uuid4().hex, user_id=user_id, month=month, year=year, created_at=now, last_accessed=now)
+    db.session.add(result)
+    db.session.flush()
+
+    categories = predictions['Category'] if 'Category' in predictions.columns else [None] * len(predictions)
+    rows = [
+        {"result_id": result.id, "product": str(product), "category": _optional_str(category),
+         "recommended_stock": int(stock), "predicted_waste": int(waste)}
+        for product, category, stock, waste in zip(predictions['Product'], categories, predictions['Recommended Stock (Units)'], predictions['Predicted Waste (Units)'])
+    ]
+    paging.insert_rows(ForecastRow, rows)
+    db.session.add(ForecastSummary(result_id=result.id, data=summarize_forecast(rows)))
+    db.session.commit()
+    return result.id
+
+def summarize_forecast(rows, top_n=paging.SUMMARY_TOP_N):
+    """Totals, per-category totals (most waste first) and the top_n products by predicted waste."""
+    categories = {}
+    for row in rows:
+        totals = categories.setdefault(row['category'], {"category": row['category'], "products": 0, "recommended_stock": 0, "predicted_waste": 0})
+        totals['products'] += 1
+        totals['recommended_stock'] += row['recommended_stock']
+        totals['predicted_waste'] += row['predicted_waste']
+    top = sorted(rows, key=lambda row: row['predicted_waste'], reverse=True)[:top_n]
+    return {
+        "products": len(rows),
+        "recommended_stock": sum(totals['recommended_stock'] for totals in categories.values()),
+        "predicted_waste": sum(totals['predicted_waste'] for totals in categories.values()),
+        "categories": sorted(categories.values(), key=lambda totals: totals['predicted_waste'], reverse=True),
+        "top_waste": [{key: row[key] for key in ('product', 'category', 'recommended_stock', 'predicted_waste')} for row in top],
+    }
+
+def _optional_str(value):
+    # None and NaN (NaN != NaN) mean "no category"; avoids importing pandas here.
+    return None if value is None or value != value else str(value)
+
+def get_forecast(result_id, user_id):
+    """Returns the user's stored forecast, or None if it is missing or was evicted."""
+    if not result_id:
+        return None
+    result = db.session.get(ForecastResult, result_id)
+    if result is None or result.user_id != user_id:
+        return None
+    result.last_accessed = datetime.now()
+    db.session.commit()
+    return result
+
+def forecast_summary(result_id):
+    """The aggregates computed when the forecast was stored (see summarize_forecast)."""
+    summary = db.session.get(ForecastSummary, result_id)
+    return summary.data if summary is not None else None
+
+def iter_forecast_rows(result_id, products=None, categories=None):
+    """Yields (product, category, recommended_stock, predicted_waste) tuples without loading them all at once.
+
+    products and categories optionally restrict the rows, filtered in SQL.
+    """
+    condition = paging.where_in(paging.where_in(ForecastRow.result_id == result_id, ForecastRow.product, products),
+                                ForecastRow.category, categories)
+    query = db.select(*PAGE_COLUMNS).where(condition).order_by(ForecastRow.id).execution_options(yield_per=READ_BATCH_ROWS)
+    for row in db.session.execute(query):
+        yield tuple(row)
+
+def forecast_page(result_id, page=1, per_page=50, sort='predicted_waste', descending=True, products=None, categories=None):
+    """Returns (rows, total) for one page of a stored forecast (see paging.fetch_page).
+
+    rows are dicts with product, category, recommended_stock and predicted_waste.
+    """
+    condition = paging.where_in(paging.where_in(ForecastRow.result_id == result_id, ForecastRow.product, products),
+                                ForecastRow.category, categories)
+    return paging.fetch_page(PAGE_COLUMNS, condition, ForecastRow.id, page, per_page, sort, descending)
+
+def evict_forecasts(user_id, ttl, keep):
+    """Deletes expired results, then all but the user's `keep` most recently used."""
+    expired = db.select(ForecastResult.id).where(ForecastResult.last_accessed < datetime.now() - ttl)
+    stale_ids = set(db.session.scalars(expired))
+    recent = (db.select(ForecastResult.id)
+              .where(ForecastResult.user_id == user_id)
+              .order_by(ForecastResult.last_accessed.desc()))
+    stale_ids.update(list(db.session.scalars(recent))[max(keep, 0):])
+    if stale_ids:
+        db.session.execute(db.delete(ForecastRow).where(ForecastRow.result_id.in_(stale_ids)))
+        db.session.execute(db.delete(ForecastSummary).where(ForecastSummary.result_id.in_(stale_ids)))
+        db.session.execute(db.delete(ForecastResult).where(ForecastResult.id.in_(stale_ids)))
+        db.session.commit()
@@ -0,0 +1,78 @@
+// Paged, sortable results table filled from a /api/v1/results endpoint.
+// Only the page being viewed is fetched; sorting and paging happen on the server.
+//
+//   resultTable(document.getElementById('forecastTable'), '/api/v1/results/strategic/<id>', {
+//       columns: [{key: 'product', label: 'Product'}, ...],
+//       sort: 'predicted_waste', perPage: 50, params: {action: 'flash_sale'},
+//   });
+function resultTable(container, url, options) {
+    const state = {page: 1, sort: options.sort, order: 'desc', perPage: options.perPage || 50};
+    const table = document.createElement('table');
+    table.className = 'table table-hover text-center';
+    const head = table.createTHead().insertRow();
+    const body = table.createTBody();
+    const pager = document.createElement('div');
+    pager.className = 'd-flex justify-content-between align-items-center';
+    const previous = button('« Previous', () => load(state.page - 1));
+    const next = button('Next »', () => load(state.page + 1));
+    const position = document.createElement('span');
+    position.className = 'text-muted';
+    pager.append(previous, position, next);
+    container.append(table, pager);
+
+    const headers = options.columns.map(column => {
+        const th = document.createElement('th');
+        th.style.cursor = 'pointer';
+        th.addEventListener('click', () => {
+            state.order = state.sort === column.key && state.order === 'desc' ? 'asc' : 'desc';
+            state.sort = column.key;
+            load(1);
+        });
+        head.appendChild(th);
+        return th;
+    });
+
+    function button(label, onClick) {
+        const b = document.createElement('button');
+        b.className = 'btn btn-outline-secondary btn-sm';
+        b.textContent = label;
+        b.addEventListener('click', onClick);
+        return b;
+    }
+
+    function format(value, column) {
+        if (value === null || value === undefined) return '';
+        return column.format ? column.format(value) : value;
+    }
+
+    function load(page) {
+        const query = new URLSearchParams({...options.params, page: page, per_page: state.perPage, sort: state.sort, order: state.order});
+        fetch(`${url}?${query}`, {headers: {Accept: 'application/json'}})
+            .then(response => response.json().then(data => {
+                if (!response.ok) throw new Error(data.error || response.statusText);
+                return data;
+            }))
+            .then(data => {
+                state.page = data.page;
+                options.columns.forEach((column, i) => {
+                    headers[i].textContent = column.label + (column.key === data.sort ? (data.order === 'desc' ? ' ▼' : ' ▲') : '');
+                });
+                body.replaceChildren(...data.items.map(item => {
+                    const row = document.createElement('tr');
+                    options.columns.forEach(column => {
+                        row.insertCell().textContent = format(item[column.key], column);
+                    });
+                    return row;
+                }));
+                const pages = Math.max(1, Math.ceil(data.total / data.per_page));
+                position.textContent = `Page ${data.page} of ${pages} (${data.total.toLocaleString()} rows)`;
+                previous.disabled = data.page <= 1;
+                next.disabled = data.page >= pages;
+            })
+            .catch(error => {
+                position.textContent = `Could not load results: ${error.message}`;
+            });
+    }
+
+    load(1);
+}
@@ -1,7 +1,7 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 import joblib
 import os
+import data_store
 
 print("--- Training Tactical Model (Sell-Through Rate) ---")
 
@@ -16,7 +16,7 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 
 # 1. Load Data
 try:
-    df = pd.read_csv(DATA_FILE)
+    df = data_store.read_table(DATA_FILE, 'tactical', columns=['days_until_expiry', 'stock_to_sales_ratio', 'sell_through_rate'])
 except FileNotFoundError:
     print(f"Error: '{DATA_FILE}' not found. Please run generate_data.py first.")
     exit()
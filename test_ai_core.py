@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ai_core
+
+
+def random_inventory_inputs(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days_left = rng.integers(-2, 12, n_rows).astype(float)
+    stock = rng.integers(0, 400, n_rows).astype(float)
+    avg_sales = rng.integers(0, 120, n_rows).astype(float)
+    stock[::37] = np.nan
+    avg_sales[::41] = np.nan
+    return days_left, stock, avg_sales
+
+
+@pytest.fixture
+def models(workspace):
+    return ai_core.current_models()
+
+
+@pytest.fixture
+def forest_scoring(monkeypatch):
+    monkeypatch.setattr(ai_core, 'USE_SELL_THROUGH_GRID', False)
+
+
+def test_batched_discounts_match_per_row(models, forest_scoring):
+    days_left, stock, avg_sales = random_inventory_inputs(500)
+    expected = [ai_core.get_tactical_discount(*row, models=models) for row in zip(days_left, stock, avg_sales)]
+    np.testing.assert_array_equal(ai_core.get_tactical_discounts(days_left, stock, avg_sales, models=models), expected)
+
+
+def test_incremental_update_skips_rows_already_in_the_training_set(workspace, tmp_path):
+    history = pd.read_csv('data/historical_data.csv')
+    last_year = history[history['year'] == history['year'].max()]
+    new_year = last_year.assign(year=last_year['year'] + 1)
+    new_year.to_csv(tmp_path / 'new.csv', index=False)
+    pd.concat([new_year, new_year.assign(year=new_year['year'] + 1)]).to_csv(tmp_path / 'overlap.csv', index=False)
+    rows = ai_core.STRATEGIC_TRAINING_SET.manifest['rows']
+
+    updated, message = ai_core.update_strategic_models(str(tmp_path / 'new.csv'))
+    assert updated and 'skipped' not in message
+    updated, message = ai_core.update_strategic_models(str(tmp_path / 'new.csv'))
+    assert updated and message == f"All {len(new_year):,} rows are already in the training set; the models are unchanged."
+    updated, message = ai_core.update_strategic_models(str(tmp_path / 'overlap.csv'))
+    assert updated and message.endswith(f" {len(new_year):,} rows already in the training set were skipped.")
+    assert ai_core.STRATEGIC_TRAINING_SET.manifest['rows'] == rows + 2 * len(new_year)
+
+
+def test_sell_through_grid_reproduces_the_forest(models):
+    grid = models['sell_through_grid']
+    assert ai_core._is_step_grid(grid)
+    rng = np.random.default_rng(1)
+    # Split thresholds and their float32 neighbours are where an off-by-one cell would show.
+    edges = grid['ratio_edges'].astype(np.float32)
+    ratio_candidates = np.concatenate([rng.uniform(0, 20, 1000), edges, np.nextafter(edges, np.float32(np.inf)),
+                                       np.nextafter(edges, np.float32(-np.inf))])
+    days_left = rng.choice(np.concatenate([np.arange(0, 8), grid['days_edges']]), 5000).astype(float)
+    ratios = rng.choice(ratio_candidates, 5000).astype(float)
+    forest = ai_core._forest(models, 'sell_through', len(ratios))
+    np.testing.assert_array_equal(ai_core.lookup_sell_through(grid, days_left, ratios),
+                                  ai_core._predict_sell_through(forest, days_left, ratios))
+
+
+def test_grid_and_forest_give_the_same_discounts(models, monkeypatch):
+    days_left, stock, avg_sales = random_inventory_inputs(5000)
+    with_grid = ai_core.get_tactical_discounts(days_left, stock, avg_sales, models=models)
+    monkeypatch.setattr(ai_core, 'USE_SELL_THROUGH_GRID', False)
+    np.testing.assert_array_equal(with_grid, ai_core.get_tactical_discounts(days_left, stock, avg_sales, models=models))
+
+
+def test_retraining_unchanged_data_is_a_cache_hit(workspace):
+    assert ai_core.train_tactical_model('data/tactical_training_data.csv') == (True, "Tactical model restored from cache (cache hit).")
+    assert ai_core.train_strategic_models('data/historical_data.csv') == (True, "Strategic models restored from cache (cache hit).")
+
+
+def test_strategic_forests_do_not_depend_on_the_number_of_jobs(workspace):
+    history = pd.get_dummies(pd.read_csv('data/historical_data.csv').head(300), columns=['product_name'], drop_first=True)
+    X = history.drop(columns=['historical_stock', 'historical_waste', *ai_core.PARTITION_COLUMNS], errors='ignore')
+    fit = lambda **kwargs: ai_core.fit_strategic_models(X, history['historical_stock'], history['historical_waste'], **kwargs)
+
+    serial, parallel = fit(n_jobs=1), fit(n_jobs=2)
+    assert set(parallel) == {'stock', 'waste'} and parallel['stock'].n_jobs is None
+    for name in ('stock', 'waste'):
+        np.testing.assert_array_equal(serial[name].predict(X), parallel[name].predict(X))
+
+    multi_output = fit(multi_output=True, n_jobs=2)['strategic']
+    assert multi_output.predict(X).shape == (len(X), 2)
+
+
+def test_forecast_batch_covers_every_horizon_scenario_and_product(models):
+    products = ['Gallon Milk', 'Organic Bananas', 'Unknown Product']
+    horizons = [(11, 2026), (12, 2026)]
+    forecast = ai_core.run_strategic_forecast_batch(products, horizons, {'promotions': [0, 1]}, models=models)
+    assert len(forecast) == len(products) * len(horizons) * 2
+    assert forecast['product_name'].tolist()[:4] == products + products[:1]
+    assert forecast.groupby(['year', 'month', 'promotions']).size().tolist() == [3] * 4
+
+    single = ai_core.run_strategic_prediction(products, 12, 2026, models=models)
+    december = forecast[(forecast['month'] == 12) & (forecast['promotions'] == 0)]
+    assert december['recommended_stock'].tolist() == single['Recommended Stock (Units)'].tolist()
+    assert december['predicted_waste'].tolist() == single['Predicted Waste (Units)'].tolist()
+
+
+def test_flat_forests_are_memory_mapped_and_sklearn_forests_loaded_on_demand(models):
+    assert isinstance(models['sell_through_flat'].threshold, np.memmap)
+    assert models['sell_through'] is None and models.has('sell_through')
+    forest = ai_core._forest(models, 'sell_through', ai_core.FLAT_FOREST_MAX_ROWS + 1)
+    assert forest is models['sell_through_flat']
+    assert ai_core._load_forest(models, 'sell_through').n_features_in_ == 2
+
+
+def test_grown_forest_keeps_its_old_trees_and_accepts_new_columns():
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=['month', 'year', 'product_name_B'])
+    model = RandomForestRegressor(n_estimators=5, max_depth=4, random_state=0).fit(X, X['month'] * 2)
+    old_trees = list(model.estimators_)
+    before = np.column_stack([tree.predict(X.to_numpy()) for tree in old_trees])
+
+    wider = X.assign(product_name_C=rng.integers(0, 2, len(X)))
+    ai_core.grow_forest(model, wider, wider['month'] * 2 + wider['product_name_C'], n_trees=3, max_trees=6, random_state=1)
+    assert len(model.estimators_) == model.n_estimators == 6 and model.n_features_in_ == 4
+    assert model.estimators_[:3] == old_trees[2:] and not model.warm_start and model.n_jobs is None
+    # Old trees give the same answers on the widened rows and never split on the new column.
+    for tree, expected in zip(model.estimators_[:3], before.T[2:]):
+        np.testing.assert_array_equal(tree.predict(wider.to_numpy()), expected)
+        assert 3 not in tree.tree_.feature
+    assert model.predict(wider).shape == (len(X),)
+
+
+@pytest.fixture
+def strategic_partitions(workspace, tmp_path, monkeypatch):
+    """Partitioned strategic models in a scratch directory, so other tests keep scoring with the global ones."""
+    from partitioned_models import PartitionedModels
+
+    partitions = PartitionedModels(str(tmp_path), ai_core.PARTITIONS['strategic'].files)
+    monkeypatch.setitem(ai_core.PARTITIONS, 'strategic', partitions)
+    monkeypatch.setattr(ai_core, 'PARTITION_WORKERS', 2)
+    return partitions
+
+
+def test_partitioned_forecasts_route_rows_to_their_partition(models, strategic_partitions):
+    trained, message = ai_core.train_partitioned_models('strategic', 'data/historical_data.csv', ['category'])
+    assert trained, message
+    assert sorted(strategic_partitions.keys()) == [('Bakery',), ('Dairy',), ('Meat',), ('Produce',)]
+    dairy = ai_core.partition_models('strategic', ('Dairy',))
+    for snapshot in (dairy, models):
+        assert not set(ai_core.PARTITION_COLUMNS) & set(ai_core._load_forest(snapshot, 'stock').feature_names_in_)
+
+    requests = pd.DataFrame({'product_name': ['Gallon Milk', 'Gallon Milk'], 'month': 12, 'year': 2026, 'category': ['Dairy', 'Frozen']})
+    forecast = ai_core.run_partitioned_forecast(requests, models=models)
+    expected = [ai_core.run_strategic_forecast_batch(['Gallon Milk'], [(12, 2026)], models=snapshot)['recommended_stock'][0]
+                for snapshot in (dairy, models)]
+    assert forecast['recommended_stock'].tolist() == expected and expected[0] != expected[1]
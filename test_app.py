@@ -0,0 +1,251 @@
+import io
+import json
+import re
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import PASSWORD
+
+
+def inventory_csv(rows=None):
+    """The demo inventory (see generate_data.demo_inventory_chunks) as CSV bytes, with rows optionally replaced."""
+    today = date.today()
+    rows = rows or [
+        (105, 'Artisan Bread', 'Bakery', 40, 30, today + timedelta(days=1), 5.5),
+        (104, 'Bagged Salad', 'Produce', 60, 80, today + timedelta(days=2), 3.0),
+        (101, 'Chicken Breast', 'Meat', 25, 180, today + timedelta(days=3), 12.5),
+        (102, 'Organic Bananas', 'Produce', 50, 150, today + timedelta(days=5), 1.5),
+        (106, 'Greek Yogurt', 'Dairy', 70, 100, today + timedelta(days=6), 2.5),
+        (103, 'Gallon Milk', 'Dairy', 100, 120, today + timedelta(days=9), 4.25),
+    ]
+    lines = ['product_id,product_name,category,avg_daily_sales,current_stock,expiry_date,price']
+    lines += [','.join('' if value is None else str(value) for value in row) for row in rows]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+@pytest.fixture
+def submit_tactical(client, wait_for_job, workspace):
+    """Uploads the demo tactical training data and an inventory; returns the results URL once training is done."""
+    def submit(inventory):
+        with open('data/tactical_training_data.csv', 'rb') as training:
+            response = client.post('/', data={'run_tactical': '1', 'tactical_file': (training, 'tactical.csv'),
+                                              'inventory_file': (io.BytesIO(inventory), 'inventory.csv')},
+                                   content_type='multipart/form-data')
+        assert response.status_code == 302
+        assert wait_for_job(response.location)['status'] == 'done'
+        return response.location
+    return submit
+
+
+@pytest.fixture
+def run_tactical(client, submit_tactical):
+    """Like submit_tactical, but returns the results page response."""
+    return lambda inventory: client.get(submit_tactical(inventory))
+
+
+@pytest.fixture
+def submit_strategic(client, wait_for_job, workspace):
+    """Uploads the demo history for a forecast of the given month; returns the results URL once training is done."""
+    def submit(month=6, year=2027, path='data/historical_data.csv', incremental=False):
+        data = {'run_strategic': '1', 'month': str(month), 'year': str(year)}
+        if incremental:
+            data['incremental'] = '1'
+        with open(path, 'rb') as history:
+            response = client.post('/', data={**data, 'strategic_file': (history, 'history.csv')}, content_type='multipart/form-data')
+        assert response.status_code == 302
+        assert wait_for_job(response.location)['status'] == 'done'
+        return response.location
+    return submit
+
+
+def rows_url(page, kind):
+    return re.search(rf"'(/api/v1/results/{kind}/\w+)'", page.get_data(as_text=True)).group(1)
+
+
+def tactical_rows_url(page):
+    return rows_url(page, 'tactical')
+
+
+def test_tactical_results_with_blank_cells(client, run_tactical):
+    today = date.today()
+    response = run_tactical(inventory_csv([
+        (105, 'Artisan Bread', 'Bakery', 40, None, today + timedelta(days=1), 5.5),
+        (101, 'Chicken Breast', 'Meat', 25, 180, today + timedelta(days=3), None),
+        (106, 'Greek Yogurt', 'Dairy', 70, 100, today + timedelta(days=6), 2.5),
+    ]))
+    assert response.status_code == 200
+    assert b'75% OFF' in response.data
+
+    items = client.get(tactical_rows_url(response) + '?per_page=10').get_json()['items']
+    by_product = {item['product_name']: item for item in items}
+    assert by_product['Chicken Breast']['price'] is None
+    assert by_product['Chicken Breast']['discount_rate'] == 0.75
+    assert by_product['Artisan Bread']['action'] == 'donate'
+    assert by_product['Artisan Bread']['current_stock'] is None
+
+
+@pytest.mark.parametrize('expiry_date', ['20261021', '2026-W42-1', '2026-10-21T00:00', 20261021])
+def test_tactical_score_api_rejects_dates_that_are_not_yyyy_mm_dd(client, expiry_date):
+    valid = {'expiry_date': (date.today() + timedelta(days=3)).isoformat(), 'current_stock': 180, 'avg_daily_sales': 25, 'price': 12.5}
+    response = client.post('/api/v1/tactical/score', json=[{**valid, 'expiry_date': expiry_date}, valid])
+    assert response.status_code == 200
+    invalid, scored = response.get_json()
+    assert invalid == {'line': 1, 'error': "'expiry_date' must be a YYYY-MM-DD date."}
+    assert scored['discount_rate'] == 0.75
+
+
+def test_reloading_tactical_results_serves_the_stored_snapshot(app, client, submit_tactical):
+    from models import InventorySnapshot
+
+    results_url = submit_tactical(inventory_csv())
+    first, second = client.get(results_url), client.get(results_url)
+    assert first.status_code == second.status_code == 200
+    assert tactical_rows_url(first) == tactical_rows_url(second)
+    assert b'75% OFF' in second.data
+    with app.app_context():
+        assert InventorySnapshot.query.count() == 1
+
+
+def test_reloading_strategic_results_serves_the_stored_forecast(app, client, submit_strategic):
+    from models import ForecastResult
+
+    results_url = submit_strategic()
+    first, second = client.get(results_url), client.get(results_url)
+    assert first.status_code == second.status_code == 200
+    assert rows_url(first, 'strategic') == rows_url(second, 'strategic')
+    with app.app_context():
+        assert ForecastResult.query.count() == 1
+
+
+def test_tactical_upload_accepts_what_read_csv_accepted(client, run_tactical):
+    expiry = date.today() + timedelta(days=3)
+    response = run_tactical(inventory_csv([
+        (101, 'Chicken Breast', 'Meat', 25, '180.0', expiry.strftime('%m/%d/%Y'), 12.5),
+        (106, 'Greek Yogurt', 'Dairy', 70, 100, (expiry + timedelta(days=3)).strftime('%m/%d/%Y'), 2.5),
+    ]))
+    assert response.status_code == 200
+    assert b'75% OFF' in response.data
+
+
+def test_tactical_upload_with_unreadable_value_explains_it(client, submit_tactical):
+    results_url = submit_tactical(inventory_csv([
+        (101, 'Chicken Breast', 'Meat', 25, 'ten', date.today().isoformat(), 12.5),
+    ]))
+    response = client.get(results_url, follow_redirects=True)
+    assert response.request.path == '/'
+    assert 'The file has a value that cannot be read' in response.get_data(as_text=True)
+    assert "invalid value &#39;ten&#39;" in response.get_data(as_text=True)
+
+
+@pytest.fixture
+def forecast_page(client, submit_strategic):
+    """The results page of a stored strategic forecast, which also makes it the session's purchase order."""
+    response = client.get(submit_strategic())
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize('export_format', ['csv', 'csv.gz', 'parquet'])
+def test_purchase_order_downloads_in_every_format(client, forecast_page, export_format):
+    import pandas as pd
+
+    response = client.get(f'/download_po?format={export_format}')
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == f'attachment; filename=purchase_order_6_2027.{export_format}'
+    if export_format == 'parquet':
+        order = pd.read_parquet(io.BytesIO(response.data))
+    else:
+        order = pd.read_csv(io.BytesIO(response.data), compression='gzip' if export_format == 'csv.gz' else None)
+    assert order.columns.tolist() == ['Product', 'Recommended Stock (Units)']
+    assert len(order) == 5 and order['Recommended Stock (Units)'].dtype.kind == 'i'
+
+
+def test_purchase_order_filters_by_product(client, forecast_page):
+    response = client.get('/download_po?product=Gallon+Milk&product=Artisan+Bread')
+    assert response.get_data(as_text=True).splitlines()[1:] == [
+        line for line in client.get('/download_po').get_data(as_text=True).splitlines()
+        if line.startswith(('Gallon Milk,', 'Artisan Bread,'))]
+    assert len(response.get_data(as_text=True).splitlines()) == 3
+
+
+def test_purchase_order_rejects_unknown_formats(client, forecast_page):
+    response = client.get('/download_po?format=xlsx', follow_redirects=True)
+    assert response.request.path == '/'
+    assert "Unknown purchase order format &#39;xlsx&#39;." in response.get_data(as_text=True)
+
+
+def test_scoring_api_speaks_ndjson(client):
+    items = [{'expiry_date': (date.today() + timedelta(days=3)).isoformat(), 'current_stock': 180, 'avg_daily_sales': 25, 'price': 12.5, 'sku': 'A'},
+             {'expiry_date': date.today().isoformat(), 'current_stock': 30, 'avg_daily_sales': 40, 'price': 5.5, 'sku': 'B'}]
+    response = client.post('/api/v1/tactical/score', data='\n'.join(json.dumps(item) for item in items) + '\n',
+                           content_type='application/x-ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    sale, donation = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert (sale['sku'], sale['action'], sale['discount_rate']) == ('A', 'flash_sale', 0.75)
+    assert (donation['sku'], donation['action']) == ('B', 'donate')
+
+
+def test_forecast_api_items_and_grid_agree(client, workspace):
+    items = [{'product_name': 'Gallon Milk', 'month': 12, 'year': 2026}, {'product_name': 'Gallon Milk', 'month': 13, 'year': 2026}]
+    forecast, invalid = client.post('/api/v1/strategic/forecast', json=items).get_json()
+    assert invalid == {'line': 2, 'error': "'month' must be an integer from 1 to 12."}
+    grid = client.post('/api/v1/strategic/forecast', json={'products': ['Gallon Milk', 'Artisan Bread'], 'horizons': [[12, 2026]],
+                                                           'scenarios': {'promotions': [0, 1]}}).get_json()
+    assert len(grid) == 4
+    assert (grid[0]['product_name'], grid[0]['promotions'], grid[0]['recommended_stock']) == ('Gallon Milk', 0, forecast['recommended_stock'])
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'products': []}, '"products" must be a non-empty list of product names.'),
+    ({'products': ['Milk'], 'horizons': [{'month': 0, 'year': 2026}]}, 'Each horizon needs an integer "month" from 1 to 12 and an integer "year".'),
+    ({'products': ['Milk'], 'horizons': [[6, 2027]], 'scenarios': {'weather': [1]}}, "Unknown scenario 'weather'; expected any of promotions, local_event, seasonality_indicator."),
+])
+def test_forecast_api_rejects_bad_grids(client, workspace, body, error):
+    response = client.post('/api/v1/strategic/forecast', json=body)
+    assert response.status_code == 400 and response.get_json() == {'error': error}
+
+
+def test_scoring_api_answers_401_without_login(app):
+    response = app.test_client().post('/api/v1/tactical/score', json=[])
+    assert response.status_code == 401 and response.is_json
+
+
+@pytest.fixture
+def stored_forecast(app, user):
+    """The ID of a stored five-product forecast owned by the logged-in user."""
+    import pandas as pd
+    import result_store
+
+    with app.app_context():
+        return result_store.save_forecast(pd.DataFrame({
+            'Product': ['Milk', 'Bread', 'Eggs', 'Salad', 'Yogurt'],
+            'Category': ['Dairy', 'Bakery', 'Dairy', 'Produce', 'Dairy'],
+            'Recommended Stock (Units)': [100, 80, 60, 40, 20],
+            'Predicted Waste (Units)': [5, 9, 1, 7, 3],
+        }), 6, 2027, user)
+
+
+def test_results_api_sorts_filters_and_pages_in_sql(client, stored_forecast):
+    url = f'/api/v1/results/strategic/{stored_forecast}'
+    first = client.get(url + '?per_page=2').get_json()
+    assert [item['product'] for item in first['items']] == ['Bread', 'Salad']
+    assert (first['total'], first['page'], first['sort'], first['order']) == (5, 1, 'predicted_waste', 'desc')
+    last = client.get(url + '?per_page=2&page=3&sort=product&order=asc').get_json()
+    assert [item['product'] for item in last['items']] == ['Yogurt']
+    dairy = client.get(url + '?category=Dairy&sort=recommended_stock&order=asc').get_json()
+    assert [item['product'] for item in dairy['items']] == ['Yogurt', 'Eggs', 'Milk'] and dairy['total'] == 3
+
+
+def test_results_api_rejects_unknown_sorts_and_other_users_results(app, client, stored_forecast):
+    url = f'/api/v1/results/strategic/{stored_forecast}'
+    response = client.get(url + '?sort=password_hash')
+    assert response.status_code == 400 and response.get_json() == {'error': "Cannot sort by 'password_hash'."}
+    assert client.get('/api/v1/results/strategic/missing').status_code == 404
+    assert client.get('/api/v1/results/tactical/1').status_code == 404
+
+    from models import db, User
+    with app.app_context():
+        db.session.add(User(username='other', password=PASSWORD))
+        db.session.commit()
+    assert app.test_client().get(url, auth=('other', PASSWORD)).status_code == 404
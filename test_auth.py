@@ -0,0 +1,48 @@
+import flask_bcrypt
+
+import auth
+from conftest import PASSWORD
+from models import db, User
+
+
+def stored_hash(app, user_id):
+    with app.app_context():
+        return db.session.get(User, user_id).password_hash
+
+
+def test_login_rehashes_passwords_made_with_another_work_factor(app, user):
+    with app.app_context():
+        db.session.get(User, user).password_hash = flask_bcrypt.generate_password_hash(PASSWORD, 5).decode('utf-8')
+        db.session.commit()
+    client = app.test_client()
+    assert client.post('/login', data={'username': 'manager', 'password': 'wrong'}).status_code == 200
+    assert auth.hash_rounds(stored_hash(app, user)) == 5
+
+    assert client.post('/login', data={'username': 'manager', 'password': PASSWORD}).status_code == 302
+    assert auth.hash_rounds(stored_hash(app, user)) == app.config['BCRYPT_LOG_ROUNDS'] == 4
+    assert app.test_client().post('/login', data={'username': 'manager', 'password': PASSWORD}).status_code == 302
+
+
+def test_api_basic_auth_checks_the_password_once(app, user, monkeypatch):
+    checks = []
+    check = auth.bcrypt.check_password_hash
+    monkeypatch.setattr(auth.bcrypt, 'check_password_hash', lambda *args: checks.append(args) or check(*args))
+    auth.password_verifier.forget()
+    client = app.test_client()
+
+    for _ in range(3):
+        assert client.post('/api/v1/tactical/score', json=[], auth=('manager', PASSWORD)).status_code == 200
+    assert len(checks) == 1
+    assert client.post('/api/v1/tactical/score', json=[], auth=('manager', 'wrong')).status_code == 401
+    assert client.post('/api/v1/tactical/score', json=[], auth=('nobody', PASSWORD)).status_code == 401
+
+
+def test_user_cache_drops_users_when_invalidated(app, user):
+    with app.app_context():
+        cached = auth.user_cache.get_by_username('manager')
+        assert auth.user_cache.get(user) is cached
+        User.query.filter_by(id=user).delete()
+        db.session.commit()
+        assert auth.user_cache.get(user) is cached
+        auth.user_cache.invalidate()
+        assert auth.user_cache.get(user) is None
@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+import pytest
+
+import data_store
+
+HISTORY = """product_name,category,month,year,promotions,local_event,seasonality_indicator,historical_stock,historical_waste
+Milk,Dairy,1,2026,0,0,1.1,120,8
+Bread,Bakery,1,2026,1,0,1.1,80,12
+Milk,Dairy,2,2026,0,1,1.0,130,5
+"""
+
+
+def test_csv_is_converted_to_typed_parquet_once(tmp_path):
+    path = tmp_path / 'history.csv'
+    path.write_text(HISTORY)
+    parquet_path = data_store.to_columnar(str(path), 'historical')
+    assert parquet_path == str(tmp_path / 'history.parquet')
+    assert data_store.to_columnar(parquet_path, 'historical') == parquet_path
+    stamp = os.path.getmtime(parquet_path)
+    assert data_store.to_columnar(str(path), 'historical') == parquet_path and os.path.getmtime(parquet_path) == stamp
+
+    df = data_store.read_table(str(path), 'historical')
+    assert df[['month', 'year', 'seasonality_indicator']].dtypes.astype(str).tolist() == ['int8', 'int16', 'float32']
+    assert df['historical_stock'].tolist() == [120, 80, 130] and df['product_name'].tolist() == ['Milk', 'Bread', 'Milk']
+    assert df['product_name'].cat.categories.tolist() == ['Bread', 'Milk']
+    assert data_store.read_table(str(path), 'historical', columns=['month', 'store_id']).columns.tolist() == ['month']
+    assert len(data_store.read_table(str(path), 'historical', filters=[('month', '=', 1)])) == 2
+    assert [len(batch) for batch in data_store.iter_batches(str(path), 'historical', 2)] == [2, 1]
+
+
+def test_missing_required_columns_are_named(tmp_path):
+    path = tmp_path / 'history.csv'
+    path.write_text('product_name,month\nMilk,1\n')
+    with pytest.raises(ValueError, match='missing required columns: historical_stock, historical_waste, local_event'):
+        data_store.check_columns(str(path), 'historical')
+    with pytest.raises(ValueError, match='missing required columns'):
+        data_store.to_columnar(str(path), 'historical')
+    assert not os.path.exists(tmp_path / 'history.parquet')
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from flat_forest import FlatForest
+
+
+@pytest.mark.parametrize('n_outputs', [1, 2])
+def test_flat_forest_predicts_exactly_like_sklearn(n_outputs):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 4))
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=500)
+    y = np.column_stack([y, -y]) if n_outputs == 2 else y
+    model = RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(model)
+
+    # Split thresholds are where float32 rounding would show up.
+    thresholds = model.estimators_[0].tree_.threshold[model.estimators_[0].tree_.feature >= 0]
+    probes = np.concatenate([rng.normal(size=(2000, 4)), np.tile(thresholds[:, None], (1, 4))])
+    np.testing.assert_array_equal(flat.predict(probes), model.predict(probes))
+    np.testing.assert_array_equal(flat.predict(probes[0]), model.predict(probes[:1]))
+    assert flat.predict(probes[:0]).shape == (0, *model.predict(probes).shape[1:])
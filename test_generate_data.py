@@ -0,0 +1,33 @@
+import numpy as np
+import pyarrow as pa
+
+import data_store
+import generate_data
+
+
+def history(seed=42, chunk_rows=25):
+    return pa.concat_tables(generate_data.historical_chunks(3, 7, 4, seed, chunk_rows))
+
+
+def test_history_is_seeded_and_ordered_by_month_store_product():
+    table = history()
+    assert table.num_rows == 4 * 3 * 7
+    assert table.equals(history())
+    assert not table.equals(history(seed=7))
+    df = table.to_pandas()
+    assert df['store_id'].tolist()[:8] == [1] * 7 + [2]
+    assert df['product_name'].astype(str).tolist()[:6] == generate_data.PRODUCTS + ['Product 00005']
+    assert (df['historical_waste'] < df['historical_stock']).all()
+
+
+def test_generated_files_load_with_the_data_store_schemas(tmp_path):
+    today = np.datetime64('2026-10-17')
+    outputs = [('historical', history()), ('tactical', generate_data.tactical_chunks(4, 42, by_category=True)),
+               ('inventory', generate_data.inventory_chunks(50, 2, 7, today, 42, chunk_rows=20))]
+    for kind, chunks in outputs:
+        path = str(tmp_path / f'{kind}.csv')
+        n_rows = generate_data.write_csv(path, [chunks] if isinstance(chunks, pa.Table) else chunks)
+        assert len(data_store.read_table(path, kind)) == n_rows
+    inventory = data_store.read_table(str(tmp_path / 'inventory.csv'), 'inventory')
+    assert len(inventory) == 50 and inventory['store_id'].between(1, 2).all()
+    assert inventory['expiry_date'].between('2026-10-17', '2026-10-31').all()
@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ai_core
+import inventory_store
+import paging
+from models import db, InventoryItem
+
+
+def scored_inventory(n_rows, today):
+    """n_rows scored rows, alternately flash-sale and donation, some with blank cells."""
+    df = pd.DataFrame({
+        'store_id': 1,
+        'product_id': np.arange(n_rows) + 100,
+        'product_name': [f"Product {i}" for i in range(n_rows)],
+        'category': 'Dairy',
+        'avg_daily_sales': 25.0,
+        'current_stock': 180.0,
+        'expiry_date': [today + pd.Timedelta(days=1 if i % 2 else 3) for i in range(n_rows)],
+        'price': 12.5,
+    })
+    df.loc[::3, 'price'] = np.nan
+    df.loc[1::4, 'current_stock'] = np.nan
+    return ai_core.score_inventory(df, today=today)
+
+
+@pytest.fixture
+def recorder(app, user):
+    with app.app_context():
+        yield inventory_store.SnapshotRecorder(user, 'model-key')
+
+
+def test_finish_inserts_buffered_rows_in_batches(app, recorder, monkeypatch):
+    statements = []
+    insert_rows = db.session.execute
+    monkeypatch.setattr(paging, 'INSERT_BATCH_ROWS', 4)
+    monkeypatch.setattr(db.session, 'execute', lambda *args, **kwargs: statements.append(args) or insert_rows(*args, **kwargs))
+    today = pd.Timestamp(date.today())
+    scored = scored_inventory(10, today)
+    recorder.add(scored, np.zeros(len(scored), dtype=bool))
+    recorder.finish(rows_reused=0, keep=14)
+
+    batches = [len(args[1]) for args in statements if len(args) > 1 and isinstance(args[1], list)]
+    assert batches == [4, 4, 2]
+    items = InventoryItem.query.filter_by(snapshot_id=recorder.snapshot.id).order_by(InventoryItem.product_id).all()
+    assert len(items) == 10
+    assert items[0].price is None and items[1].current_stock is None
+    assert items[2].current_stock == 180 and items[2].expiry_date == (today + timedelta(days=3)).date()
+
+
+def upload(path, models, user_id, model_key='model-key'):
+    """Scores an inventory file into a new snapshot like the tactical results page; returns (recorder, totals)."""
+    history = inventory_store.SnapshotRecorder(user_id, model_key)
+    _, _, totals = ai_core.run_tactical_analysis_streaming(path, models=models, history=history, keep_items=False)
+    history.finish(totals['rows_reused'], keep=14)
+    return history, totals
+
+
+def test_unchanged_lots_reuse_decisions_along_the_parent_chain(app, user, workspace, tmp_path):
+    today = date.today()
+    inventory = pd.DataFrame({
+        'store_id': [1, 1, 2, 2, 2],
+        'product_id': [101, 101, 101, 102, 103],  # the first lot appears twice
+        'product_name': 'Product', 'category': 'Dairy',
+        'avg_daily_sales': [25, 25, 25, 50, 100],
+        'current_stock': [180, 180, 180, 150, 120],
+        'expiry_date': [str(today + timedelta(days=days)) for days in (3, 3, 3, 5, 9)],
+        'price': 2.5,
+    })
+    paths = [str(tmp_path / f'day{day}.csv') for day in (1, 2)]
+    inventory.to_csv(paths[0], index=False)
+    inventory.assign(current_stock=[180, 180, 180, 10, 120]).to_csv(paths[1], index=False)
+    models = ai_core.current_models()
+
+    with app.app_context():
+        first, totals = upload(paths[0], models, user)
+        assert totals['rows_reused'] == 0 and first.snapshot.parent_id is None
+        second, totals = upload(paths[1], models, user)
+        assert totals['rows_reused'] == 4 and second.snapshot.parent_id == first.snapshot.id
+        assert second.snapshot.items.count() == 4  # the three flash-sale rows and the restocked lot
+        # The kept lot was only stored in the first snapshot, and is still found through the chain.
+        third, totals = upload(paths[0], models, user)
+        assert totals['rows_reused'] == 5 and third.snapshot.parent_id == second.snapshot.id
+        assert sorted(item.discount_rate for item in third.snapshot.items) == \
+            sorted(item.discount_rate for item in first.snapshot.items if item.action != 'keep')
+        _, totals = upload(paths[0], models, user, model_key='retrained')
+        assert totals['rows_reused'] == 0
@@ -0,0 +1,72 @@
+import io
+import os
+import threading
+import time
+from datetime import timedelta
+
+import jobs
+
+
+class Upload:
+    """Stands in for werkzeug's FileStorage."""
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+
+def wait(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_save_upload_names_files_by_content(tmp_path):
+    first, key = jobs.save_upload(Upload(b'a,b\n1,2\n'), str(tmp_path), 'inventory')
+    second, same_key = jobs.save_upload(Upload(b'a,b\n1,2\n'), str(tmp_path), 'inventory')
+    assert first == second and key == same_key
+    assert os.listdir(tmp_path) == [f"inventory_{key}.csv"]
+
+
+def test_queue_runs_a_dataset_once_while_it_is_training():
+    release = threading.Event()
+    calls = []
+
+    def train(path):
+        calls.append(path)
+        release.wait(5)
+        return True, 'trained'
+
+    queue = jobs.TrainingJobQueue(max_workers=2)
+    job, created = queue.submit('strategic', 'data.csv', 'key', train)
+    again, created_again = queue.submit('strategic', 'data.csv', 'key', train)
+    release.set()
+    assert created and not created_again and again is job
+    assert wait(job).status == jobs.DONE and job.message == 'trained'
+    assert calls == ['data.csv']
+    assert queue.submit('strategic', 'data.csv', 'key', train)[1]
+
+
+def test_queue_reports_a_failing_job():
+    def train(path):
+        raise RuntimeError('bad data')
+
+    job, _ = jobs.TrainingJobQueue().submit('tactical', 'data.csv', 'key', train)
+    assert wait(job).status == jobs.FAILED and job.message == 'bad data'
+    assert job.to_dict()['finished_at'] is not None
+
+
+def test_prune_uploads_keeps_recent_and_in_use_files(tmp_path):
+    now = time.time()
+    for age_hours in range(5):
+        path = tmp_path / f"inventory_{age_hours}.csv"
+        path.write_text('x')
+        (tmp_path / f"inventory_{age_hours}.parquet").write_text('x')
+        os.utime(path, (now - age_hours * 3600,) * 2)
+    (tmp_path / '.inventory_partial.tmp').write_text('x')
+
+    deleted = jobs.prune_uploads(str(tmp_path), timedelta(hours=2.5), keep=3, in_use=[str(tmp_path / 'inventory_4.csv')])
+    assert deleted == 1
+    assert sorted(os.listdir(tmp_path)) == ['.inventory_partial.tmp'] + [
+        f"inventory_{age}.{ext}" for age in (0, 1, 2, 4) for ext in ('csv', 'parquet')]
+    assert jobs.prune_uploads(str(tmp_path / 'missing'), timedelta(hours=1), keep=1) == 0
@@ -0,0 +1,45 @@
+import json
+
+import auth
+import manage_users
+from models import db, User
+
+
+def usernames(app):
+    with app.app_context():
+        return sorted(db.session.scalars(db.select(User.username)))
+
+
+def test_import_skips_existing_duplicate_and_invalid_rows(app, user, tmp_path, capsys):
+    path = tmp_path / 'users.csv'
+    path.write_text('username,password\nmanager,secret-password\nalice,alice-password\nbob,bob-password\n'
+                    'alice,other-password\ncarol,short\n')
+
+    assert not manage_users.import_users(str(path), dry_run=True, workers=1)
+    output = capsys.readouterr().out
+    assert '5 rows: 2 new (2 passwords to hash), 1 already exist, 2 invalid.' in output
+    assert 'Row 4 (alice): username appears more than once in the file' in output
+    assert 'Row 5 (carol): password must be at least 6 characters' in output
+    assert usernames(app) == ['manager']
+
+    assert not manage_users.import_users(str(path), workers=1, batch_size=1)
+    assert usernames(app) == ['alice', 'bob', 'manager']
+    with app.app_context():
+        alice = auth.user_cache.get_by_username('alice')
+        assert auth.hash_rounds(alice.password_hash) == app.config['BCRYPT_LOG_ROUNDS']
+        assert alice.verify_password('alice-password')
+
+
+def test_exported_users_import_with_their_hashes(app, user, tmp_path):
+    path = str(tmp_path / 'users.json')
+    manage_users.export_users(path)
+    with open(path) as f:
+        exported = json.load(f)
+    assert [row['username'] for row in exported] == ['manager']
+
+    with app.app_context():
+        db.session.execute(db.delete(User))
+        db.session.commit()
+    assert manage_users.import_users(path)
+    with app.app_context():
+        assert User.query.one().password_hash == exported[0]['password_hash']
@@ -0,0 +1,41 @@
+import metrics
+
+
+def test_registry_renders_prometheus_text():
+    registry = metrics.MetricsRegistry()
+    rows = registry.counter('rows_total', 'Rows.', ('stage',))
+    seconds = registry.histogram('stage_seconds', 'Stage time.', ('stage',), buckets=(0.1, 1))
+    rows.inc(3, stage='score "fast"')
+    rows.inc(2, stage='score "fast"')
+    for value in (0.05, 0.1, 5):
+        seconds.observe(value, stage='train')
+    assert registry.render().splitlines() == [
+        '# HELP rows_total Rows.',
+        '# TYPE rows_total counter',
+        'rows_total{stage="score \\"fast\\""} 5',
+        '# HELP stage_seconds Stage time.',
+        '# TYPE stage_seconds histogram',
+        'stage_seconds_bucket{stage="train",le="0.1"} 2',
+        'stage_seconds_bucket{stage="train",le="1.0"} 2',
+        'stage_seconds_bucket{stage="train",le="+Inf"} 3',
+        'stage_seconds_sum{stage="train"} 5.15',
+        'stage_seconds_count{stage="train"} 3',
+    ]
+
+
+def test_metrics_endpoint_counts_requests(app):
+    client = app.test_client()
+    assert client.get('/login').status_code == 200
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert 'freshfuture_request_seconds_count{endpoint="login",method="GET"}' in response.get_data(as_text=True)
+
+
+def test_disabled_metrics_are_not_recorded(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', False)
+    before = metrics.STAGE_ROWS.samples()
+    metrics.count_rows('test.disabled', 10)
+    with metrics.timed('test.disabled'):
+        pass
+    assert metrics.STAGE_ROWS.samples() == before
+    assert 'test.disabled' not in metrics.REGISTRY.render()
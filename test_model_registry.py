@@ -0,0 +1,43 @@
+import os
+
+from model_registry import ModelRegistry
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_unchanged_data_restores_the_stored_models(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    data = write(tmp_path / 'data.csv', 'a,b\n1,2\n')
+    target = write(tmp_path / 'model.joblib', 'trained')
+    key = registry.key('strategic', data, {'n_estimators': 10})
+
+    assert not registry.restore('strategic', key, {'model': target})
+    registry.store('strategic', key, {'model': target})
+    write(tmp_path / 'model.joblib', 'overwritten')
+    assert registry.restore('strategic', key, {'model': target})
+    assert (tmp_path / 'model.joblib').read_text() == 'trained'
+    assert registry.stats() == {'hits': 1, 'misses': 1}
+
+
+def test_key_changes_with_the_data_and_the_params(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    data = write(tmp_path / 'data.csv', 'a,b\n1,2\n')
+    key = registry.key('strategic', data, {'n_estimators': 10})
+    assert key == registry.key('strategic', data, {'n_estimators': 10})
+    assert key != registry.key('tactical', data, {'n_estimators': 10})
+    assert key != registry.key('strategic', data, {'n_estimators': 20})
+    write(tmp_path / 'data.csv', 'a,b\n1,3\n')
+    assert key != registry.key('strategic', data, {'n_estimators': 10})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'), max_entries=2)
+    target = write(tmp_path / 'model.joblib', 'trained')
+    for key in ('a', 'b'):
+        registry.store('tactical', key, {'model': target})
+    os.utime(tmp_path / 'registry' / 'tactical-a', (0, 0))
+    registry.store('tactical', 'c', {'model': target})
+    assert sorted(os.listdir(tmp_path / 'registry')) == ['tactical-b', 'tactical-c']
@@ -0,0 +1,39 @@
+import os
+
+import joblib
+import numpy as np
+
+from model_store import ModelStore
+
+
+def test_refresh_publishes_a_new_version_only_when_a_file_changes(tmp_path):
+    path = str(tmp_path / 'model.joblib')
+    store = ModelStore({'model': path, 'missing': str(tmp_path / 'missing.joblib')})
+    joblib.dump({'trees': 1}, path)
+
+    first, changed = store.refresh()
+    assert changed == ['model'] and first.version == 1 and first['model'] == {'trees': 1}
+    assert first.has('model') and not first.has('missing')
+    assert store.refresh() == (first, [])
+
+    joblib.dump({'trees': 2}, path)
+    os.utime(path, ns=(first.stamps['model'][0] + 1_000_000,) * 2)
+    second, changed = store.refresh()
+    assert changed == ['model'] and second.version == 2 and second['model'] == {'trees': 2}
+    assert first['model'] == {'trees': 1}, "snapshots already handed out never change"
+
+    os.remove(path)
+    third, _ = store.refresh()
+    assert third['model'] is None and not third.has('model')
+    assert store.snapshot() is third
+
+
+def test_mmap_files_are_mapped_and_skipped_files_only_tracked(tmp_path):
+    files = {'flat': str(tmp_path / 'flat.joblib'), 'forest': str(tmp_path / 'forest.joblib')}
+    joblib.dump({'threshold': np.arange(1000.0)}, files['flat'])
+    joblib.dump({'trees': 1}, files['forest'])
+
+    snapshot, _ = ModelStore(files).refresh(mmap_names=('flat',), skip_names=('forest',))
+    assert isinstance(snapshot['flat']['threshold'], np.memmap)
+    assert not snapshot['flat']['threshold'].flags.writeable
+    assert snapshot['forest'] is None and snapshot.has('forest')
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+import result_store
+
+
+def forecast(products):
+    return pd.DataFrame({
+        'Product': products,
+        'Category': ['Dairy'] + [None] * (len(products) - 1),
+        'Recommended Stock (Units)': [100 + i for i in range(len(products))],
+        'Predicted Waste (Units)': [10 * i for i in range(len(products))],
+    })
+
+
+@pytest.fixture
+def store(app, user):
+    with app.app_context():
+        yield user
+
+
+def test_saved_forecast_is_only_visible_to_its_owner(store):
+    result_id = result_store.save_forecast(forecast(['Milk', 'Bread', 'Eggs']), 6, 2027, store)
+    result = result_store.get_forecast(result_id, store)
+    assert (result.month, result.year) == (6, 2027)
+    assert result_store.get_forecast(result_id, store + 1) is None
+    assert result_store.get_forecast(None, store) is None
+
+    assert list(result_store.iter_forecast_rows(result_id)) == [('Milk', 'Dairy', 100, 0), ('Bread', None, 101, 10), ('Eggs', None, 102, 20)]
+    summary = result_store.forecast_summary(result_id)
+    assert (summary['products'], summary['recommended_stock'], summary['predicted_waste']) == (3, 303, 30)
+    assert summary['top_waste'][0]['product'] == 'Eggs'
+
+
+def test_least_recently_used_forecasts_are_evicted(store):
+    first, second = (result_store.save_forecast(forecast(['Milk']), 6, 2027, store, max_per_user=2) for _ in range(2))
+    result_store.get_forecast(first, store)
+    third = result_store.save_forecast(forecast(['Milk']), 6, 2027, store, max_per_user=2)
+    assert result_store.get_forecast(second, store) is None
+    assert result_store.get_forecast(first, store) and result_store.get_forecast(third, store)
+    assert list(result_store.iter_forecast_rows(second)) == []
+
+
+def test_expired_forecasts_are_evicted(store):
+    old = result_store.save_forecast(forecast(['Milk']), 6, 2027, store)
+    result_store.save_forecast(forecast(['Milk']), 6, 2027, store, ttl=timedelta(0))
+    assert result_store.get_forecast(old, store) is None
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+
+HEAVY_MODULES = ('ai_core', 'pandas', 'numpy', 'sklearn', 'joblib', 'pyarrow')
+
+
+@pytest.mark.parametrize('module', ['app', 'manage_users'])
+def test_importing_the_web_app_skips_the_ml_stack(module, tmp_path):
+    probe = f"import sys, {module}; print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', probe], cwd=tmp_path, capture_output=True, text=True, check=True,
+                            env={**os.environ, 'PYTHONPATH': REPO_ROOT}).stdout
+    assert output.split() == []
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import uuid
+
+MANIFEST_FILE = 'manifest.json'
+
+class TrainingSet:
+    """Append-only training data stored as Parquet parts plus a JSON manifest.
+
+    Each append writes one new part file, so adding a month of rows never
+    rewrites the history. Text columns are dictionary-encoded and every part is
+    cast to the first part's schema. The manifest lists the committed parts and
+    any metadata callers attach; it is replaced atomically, so readers never see
+    a half-written append.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self._manifest_path())
+
+    @property
+    def manifest(self):
+        with open(self._manifest_path()) as f:
+            return json.load(f)
+
+    def replace(self, df, **metadata):
+        """Starts a new set holding only df's rows."""
+        with self._lock:
+            old_parts = self.manifest['parts'] if self.exists() else []
+            part = self._write_part(df, schema=None)
+            self._write_manifest({"parts": [part], "rows": len(df), "columns": list(df.columns), **metadata})
+            for old_part in old_parts:
+                os.remove(os.path.join(self.root, old_part))
+
+    def append(self, df):
+        """Adds df's rows as a new part. Extra columns are dropped; missing ones raise ValueError."""
+        import pyarrow.parquet as pq
+
+        with self._lock:
+            manifest = self.manifest
+            missing = [col for col in manifest['columns'] if col not in df.columns]
+            if missing:
+                raise ValueError(f"New rows are missing columns: {', '.join(missing)}")
+            schema = pq.read_schema(os.path.join(self.root, manifest['parts'][0]))
+            manifest['parts'].append(self._write_part(df[manifest['columns']], schema))
+            manifest['rows'] += len(df)
+            self._write_manifest(manifest)
+
+    def read(self, columns=None, where=None):
+        """Returns the set as a DataFrame. where is an optional pyarrow.dataset filter expression."""
+        import pyarrow.dataset as ds
+
+        with self._lock:
+            paths = [os.path.join(self.root, part) for part in self.manifest['parts']]
+            return ds.dataset(paths, format='parquet').to_table(columns=columns, filter=where).to_pandas()
+
+    def update_manifest(self, **metadata):
+        with self._lock:
+            self._write_manifest({**self.manifest, **metadata})
+
+    def _write_part(self, df, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if schema is None:
+            text = pa.dictionary(pa.int32(), pa.string())
+            schema = pa.schema([(f.name, text if pa.types.is_string(f.type) or pa.types.is_large_string(f.type) else f.type)
+                                for f in table.schema])
+        os.makedirs(self.root, exist_ok=True)
+        part = f"part-{uuid.uuid4().hex}.parquet"
+        tmp_path = os.path.join(self.root, f".{part}.tmp")
+        pq.write_table(table.cast(schema), tmp_path)
+        os.replace(tmp_path, os.path.join(self.root, part))
+        return part
+
+    def _write_manifest(self, manifest):
+        tmp_path = f"{self._manifest_path()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST_FILE)
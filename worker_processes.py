@@ -0,0 +1,8 @@
+import multiprocessing
+
+# Worker pools start from a clean process rather than a fork of a threaded server.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+def pool_context():
+    """The multiprocessing context for ProcessPoolExecutor workers (see START_METHOD)."""
+    return multiprocessing.get_context(START_METHOD)